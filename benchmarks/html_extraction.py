@@ -0,0 +1,113 @@
+"""
+Сравнение разбора страниц Promt и Oxford через BeautifulSoup
+(parse_promt, parse_oxford) и через lxml XPath
+(extract_promt, extract_oxford).
+
+Страницы берутся из tests/fixtures. Чтобы приблизить их объем
+к настоящим страницам словарей, в конец страницы добавляется
+--padding блоков разметки, не относящихся к результату.
+
+Запуск:
+    python -m benchmarks.html_extraction --pages 200 --padding 500
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from tgbot.parsing import Parsing
+
+FIXTURES_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'fixtures'
+)
+
+PADDING_BLOCK = (
+    '<div class="related-entry"><a href="/definition/english/item">item</a>'
+    '<span class="pos">noun</span><p class="def">Lorem ipsum dolor sit '
+    'amet, consectetur adipiscing elit.</p></div>\n'
+)
+
+
+def load_page(file_name: str, padding: int) -> bytes:
+    with open(os.path.join(FIXTURES_FOLDER, file_name), 'rb') as file:
+        content = file.read()
+    return content.replace(
+        b'</body>',
+        (PADDING_BLOCK * padding).encode() + b'</body>'
+    )
+
+
+def measure(func, content: bytes, pages: int) -> dict:
+
+    """
+    Выводит скорость и пиковый объем памяти разбора страницы.
+
+    Вводные параметры:
+    - func: функция разбора, принимающая содержимое страницы
+    - content: содержимое страницы
+    - pages: кол-во повторений
+
+    Выводной параметр:
+    - словарь с показателями:
+        -- pages_per_second: кол-во страниц в секунду
+        -- peak_kb: пиковый объем памяти при разборе одной страницы в КБ
+                    (по данным tracemalloc: память Python-объектов,
+                    без внутренних буферов libxml2)
+    """
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        func(content)
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages_per_second': pages / duration,
+        'peak_kb': peak / 1024
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Сравнение разбора страниц через BeautifulSoup и lxml'
+    )
+    parser.add_argument('--pages', type=int, default=200,
+                        help='кол-во разборов каждой страницы')
+    parser.add_argument('--padding', type=int, default=500,
+                        help='кол-во дополнительных блоков на странице')
+    args = parser.parse_args()
+
+    parsing = Parsing()
+    cases = {
+        'promt_test.html': (
+            lambda content: parsing.parse_promt(
+                BeautifulSoup(markup=content, features="lxml")
+            ),
+            parsing.extract_promt
+        ),
+        'oxford_test.html': (
+            lambda content: parsing.parse_oxford(
+                BeautifulSoup(markup=content, features="lxml")
+            ),
+            parsing.extract_oxford
+        )
+    }
+
+    for file_name, (soup_func, lxml_func) in cases.items():
+        content = load_page(file_name, args.padding)
+        assert soup_func(content) == lxml_func(content)
+
+        print(f'{file_name} ({len(content) / 1024:.0f} КБ):')
+        for name, func in (('BeautifulSoup', soup_func),
+                           ('lxml XPath', lxml_func)):
+            result = measure(func, content, args.pages)
+            print(f'  {name}: {result["pages_per_second"]:.1f} стр/с, '
+                  f'пик памяти {result["peak_kb"]:.0f} КБ')
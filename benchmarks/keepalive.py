@@ -0,0 +1,122 @@
+"""
+Сравнение времени добавления слова без переиспользования
+соединений (как до перехода на HTTP-сессии) и с ним.
+
+Для каждого слова выполняются те же запросы, что и при добавлении
+слова пользователем: страница Promt, страница Oxford и MP3-файл.
+Запросы отправляются на локальный сервер benchmarks/stub_server.py.
+
+Запуск:
+    python -m benchmarks.keepalive --words 200 --handshake-ms 30
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import requests
+from fake_headers import Headers
+
+from benchmarks.stub_server import OXFORD_PATH, PROMT_PATH, start_stub_server
+from tgbot.parsing import Parsing
+
+
+class LegacyParsing(Parsing):
+
+    """
+    Parsing с новым соединением и новыми заголовками на каждый запрос.
+    """
+
+    def get_session(self, url: str):
+        return requests
+
+    def get_headers(self, os_: str, browser: str) -> dict:
+        return Headers(os=os_, browser=browser).generate()
+
+
+def add_word(parsing: Parsing, en_word: str, folder_path: str) -> float:
+
+    """
+    Выполняет запросы добавления слова.
+
+    Вводные параметры:
+    - parsing: экземпляр класса Parsing
+    - en_word: английское слово
+    - folder_path: папка для MP3-файлов
+
+    Выводной параметр:
+    - время добавления слова в секундах
+    """
+
+    start = time.perf_counter()
+
+    parsing.receive_promt_data(
+        en_word=en_word,
+        pos_list=['noun'],
+        os_='win',
+        browser='chrome'
+    )
+    oxford_data = parsing.receive_oxford_data(
+        en_word=en_word,
+        os_='win',
+        browser='chrome'
+    )
+    parsing.write_mp3(
+        url=oxford_data.get('mp_3_url'),
+        file_path=os.path.join(folder_path, f'{en_word}.mp3'),
+        os_='win',
+        browser='chrome',
+        attempts=1,
+        error_timeout=0
+    )
+
+    return time.perf_counter() - start
+
+
+def run(parsing: Parsing, words: int, folder_path: str) -> dict:
+    timings = [
+        add_word(parsing, f'word{idx}', folder_path)
+        for idx in range(words)
+    ]
+    parsing.close()
+
+    timings.sort()
+    return {
+        'mean': statistics.mean(timings) * 1000,
+        'p50': timings[len(timings) // 2] * 1000,
+        'p95': timings[int(len(timings) * 0.95)] * 1000
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Сравнение времени добавления слова с HTTP-сессиями и без'
+    )
+    parser.add_argument('--words', type=int, default=200,
+                        help='кол-во добавляемых слов')
+    parser.add_argument('--handshake-ms', type=float, default=30.0,
+                        help='задержка установки нового соединения в мс')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.handshake_ms / 1000)
+    parsing_kwargs = {
+        'promt_url': base_url + PROMT_PATH,
+        'oxford_url': base_url + OXFORD_PATH
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_folder:
+        results = {
+            'без сессий': run(LegacyParsing(**parsing_kwargs),
+                              args.words, tmp_folder),
+            'с сессиями': run(Parsing(**parsing_kwargs),
+                              args.words, tmp_folder)
+        }
+
+    server.shutdown()
+
+    print(f'Слов: {args.words}, задержка соединения: {args.handshake_ms} мс')
+    for name, result in results.items():
+        print(f'{name}: среднее {result["mean"]:.1f} мс, '
+              f'p50 {result["p50"]:.1f} мс, p95 {result["p95"]:.1f} мс')
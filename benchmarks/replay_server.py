@@ -0,0 +1,443 @@
+"""
+Локальный HTTP-сервер, воспроизводящий сохраненные страницы
+онлайн-словарей Promt и Oxford и MP3-файлы.
+
+Страницы слов test и qwertyuiop (нет перевода) и MP3-файл
+test__gb_1.mp3 берутся из tests/fixtures - тех же файлов, что
+используют тесты (см. SHARED_FIXTURES). Ответы, сохраненные
+через --record, лежат в папке benchmarks/fixtures:
+- promt/<слово>.html - страница перевода Promt
+- oxford/<слово>.html - страница слова Oxford (<слово>_1.html и т.д. -
+  варианты страницы)
+- media/<название>.mp3 - MP3-файл с произношением
+
+Ссылки на MP3-файлы Oxford в сохраненных страницах подменяются
+ссылками на сервер. Для слов без сохраненных страниц сервер отдает
+шаблонные страницы из benchmarks/stub_server.py (если synthetic=True),
+поэтому нагрузку можно создавать на любом кол-ве слов.
+
+Сервер умеет имитировать медленный и нестабильный сайт:
+- latency, jitter: задержка каждого ответа
+- error_rate: доля ответов 503
+- rate_limit, burst: ограничение частоты запросов; запросы сверх
+  ограничения получают ответ 429 с заголовком Retry-After
+
+Запуск:
+    python -m benchmarks.replay_server --port 8080 --latency-ms 50
+    python -m benchmarks.replay_server --record test serendipity
+"""
+
+import argparse
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+from benchmarks.stub_server import MEDIA_PATH, MP3_CONTENT, OXFORD_PAGE, \
+    OXFORD_PATH, PROMT_PAGE, PROMT_PATH
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(__file__), 'fixtures')
+TESTS_FIXTURES_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'fixtures'
+)
+# {(подпапка, название файла без расширения): файл из tests/fixtures}
+SHARED_FIXTURES = {
+    ('promt', 'test'): 'promt_test.html',
+    ('promt', 'qwertyuiop'): 'promt_missing.html',
+    ('oxford', 'test'): 'oxford_test.html',
+    ('media', 'test__gb_1'): 'test__gb_1.mp3'
+}
+OXFORD_MEDIA_URL = re.compile(
+    rb'https?://www\.oxfordlearnersdictionaries\.com/media/[^"\']*/'
+)
+
+
+def load_shared_fixtures(folder_path: str = TESTS_FIXTURES_FOLDER) -> dict:
+
+    """
+    Читает в память ответы из файлов тестов (см. SHARED_FIXTURES).
+
+    Вводный параметр:
+    - folder_path: папка с файлами тестов (по умолчанию tests/fixtures)
+
+    Выводной параметр:
+    - словарь {(подпапка, название файла без расширения): содержимое}
+    """
+
+    fixtures = {}
+    for fixture_key, file_name in SHARED_FIXTURES.items():
+        file_path = os.path.join(folder_path, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as f:
+                fixtures[fixture_key] = f.read()
+
+    return fixtures
+
+
+def load_fixtures(folder_path: str) -> dict:
+
+    """
+    Читает сохраненные ответы в память.
+
+    Вводный параметр:
+    - folder_path: папка с подпапками promt, oxford и media
+
+    Выводной параметр:
+    - словарь {(подпапка, название файла без расширения): содержимое}
+    """
+
+    fixtures = {}
+    for kind in ('promt', 'oxford', 'media'):
+        kind_folder = os.path.join(folder_path, kind)
+        if not os.path.isdir(kind_folder):
+            continue
+
+        for file_name in os.listdir(kind_folder):
+            with open(os.path.join(kind_folder, file_name), 'rb') as f:
+                fixtures[(kind, os.path.splitext(file_name)[0])] = f.read()
+
+    return fixtures
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        path = unquote(urlsplit(self.path).path)
+        status = self.server.get_fault_status(path)
+
+        if status == 429:
+            self.send_content(b'Too Many Requests', 'text/plain', status,
+                              {'Retry-After': str(self.server.retry_after)})
+        elif status is not None:
+            self.send_content(b'Service Unavailable', 'text/plain', status)
+        else:
+            self.send_content(*self.server.get_response(
+                path=path,
+                host=f'http://{self.headers.get("Host")}'
+            ))
+
+    def send_content(self, content: bytes, content_type: str,
+                     status: int = 200,
+                     headers: Optional[dict] = None) -> None:
+        self.server.count_response(status)
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, fixtures_folder: Optional[str] = FIXTURES_FOLDER,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None,
+                 burst: Optional[float] = None,
+                 retry_after: int = 1, synthetic: bool = True,
+                 seed: Optional[int] = None,
+                 address: tuple = ('127.0.0.1', 0)) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - fixtures_folder: папка с ответами, сохраненными через --record,
+                           дополняющими ответы из tests/fixtures
+                           (по умолчанию benchmarks/fixtures;
+                           None - без сохраненных ответов)
+        - latency: задержка каждого ответа в секундах (по умолчанию 0.0)
+        - jitter: случайная добавка к задержке от 0 до jitter секунд
+                  (по умолчанию 0.0)
+        - error_rate: доля ответов 503 (по умолчанию 0.0)
+        - rate_limit: кол-во запросов в секунду, после которого сервер
+                      отвечает 429 (по умолчанию None - без ограничения)
+        - burst: допустимый всплеск запросов (по умолчанию max(1, rate_limit))
+        - retry_after: значение заголовка Retry-After в секундах
+                       (по умолчанию 1)
+        - synthetic: True - отдавать шаблонные страницы для слов
+                     без сохраненных ответов (по умолчанию True)
+        - seed: начальное значение генератора случайных чисел
+        - address: адрес сервера (по умолчанию свободный порт 127.0.0.1)
+        """
+
+        super().__init__(address, ReplayHandler)
+
+        self.fixtures = load_shared_fixtures()
+        if fixtures_folder:
+            self.fixtures.update(load_fixtures(fixtures_folder))
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = max(1.0, rate_limit or 0) if burst is None else burst
+        self.retry_after = retry_after
+        self.synthetic = synthetic
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self.path_counts: Counter = Counter()
+        self.status_counts: Counter = Counter()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.server_address[0]}:{self.server_port}'
+
+    def start(self) -> str:
+
+        """
+        Запускает сервер в фоновом потоке.
+
+        Выводной параметр:
+        - адрес сервера вида http://127.0.0.1:<порт>
+        """
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def get_fault_status(self, path: str) -> Optional[int]:
+
+        """
+        Учитывает запрос, выдерживает задержку ответа и решает,
+        нужно ли ответить ошибкой.
+
+        Вводный параметр:
+        - path: путь запроса
+
+        Выводной параметр:
+        - код ошибки (429 или 503; None - ответить сохраненной страницей)
+        """
+
+        with self._lock:
+            self.path_counts[path] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            is_error = self._random.random() < self.error_rate
+
+            is_throttled = False
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated_at) * self.rate_limit
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                else:
+                    is_throttled = True
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if is_throttled:
+            return 429
+        if is_error:
+            return 503
+        return None
+
+    def get_response(self, path: str, host: str) -> tuple:
+
+        """
+        Выводит ответ на запрос: сохраненный, шаблонный или 404.
+
+        Вводные параметры:
+        - path: путь запроса
+        - host: адрес сервера для ссылок на MP3-файлы
+
+        Выводной параметр:
+        - кортеж (содержимое, Content-Type, код ответа)
+        """
+
+        html_type = 'text/html; charset=utf-8'
+        name = path.rsplit('/', 1)[-1]
+
+        if path.startswith(PROMT_PATH):
+            content = self.fixtures.get(('promt', name))
+            if content is not None:
+                return content, html_type, 200
+            if self.synthetic:
+                return PROMT_PAGE.format(word=name).encode(), html_type, 200
+
+        elif path.startswith(OXFORD_PATH):
+            content = self.fixtures.get(('oxford', name))
+            if content is not None:
+                return OXFORD_MEDIA_URL.sub(
+                    f'{host}{MEDIA_PATH}'.encode(), content
+                ), html_type, 200
+            if self.synthetic and not re.search(r'_\d+$', name):
+                return OXFORD_PAGE.format(
+                    host=host,
+                    media_path=MEDIA_PATH,
+                    word=name
+                ).encode(), html_type, 200
+
+        elif path.startswith(MEDIA_PATH) and path.endswith('.mp3'):
+            content = self.fixtures.get(('media', os.path.splitext(name)[0]))
+            if content is not None:
+                return content, 'audio/mpeg', 200
+            if self.synthetic:
+                return MP3_CONTENT, 'audio/mpeg', 200
+
+        return b'Not Found', 'text/plain', 404
+
+    def count_response(self, status: int) -> None:
+        with self._lock:
+            self.status_counts[status] += 1
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели сервера.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- requests: кол-во запросов
+            -- repeated: кол-во повторных запросов тех же путей
+            -- throttled: кол-во ответов 429
+            -- errors: кол-во ответов 5xx
+            -- not_found: кол-во ответов 404
+        """
+
+        with self._lock:
+            return {
+                'requests': sum(self.path_counts.values()),
+                'repeated': sum(self.path_counts.values()) -
+                len(self.path_counts),
+                'throttled': self.status_counts[429],
+                'errors': sum(count for status, count
+                              in self.status_counts.items()
+                              if status >= 500),
+                'not_found': self.status_counts[404]
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.path_counts.clear()
+            self.status_counts.clear()
+
+
+def record_fixtures(words: list[str], folder_path: str = FIXTURES_FOLDER,
+                    os_: str = 'win', browser: str = 'chrome') -> int:
+
+    """
+    Сохраняет страницы Promt и Oxford и MP3-файлы слов
+    с настоящих сайтов для последующего воспроизведения.
+
+    Вводные параметры:
+    - words: список английских слов
+    - folder_path: папка для сохраненных ответов
+                   (по умолчанию benchmarks/fixtures)
+    - os_: сокращенное название операционной системы
+    - browser: название браузера
+
+    Выводной параметр:
+    - кол-во сохраненных файлов
+    """
+
+    from tgbot.parsing import Parsing
+
+    parsing = Parsing()
+    saved_count = 0
+
+    def save(kind: str, file_name: str, content: bytes) -> None:
+        nonlocal saved_count
+        os.makedirs(os.path.join(folder_path, kind), exist_ok=True)
+        with open(os.path.join(folder_path, kind, file_name), 'wb') as f:
+            f.write(content)
+        saved_count += 1
+
+    try:
+        for en_word in words:
+            content = parsing.get_promt_page(
+                promt_url=parsing.promt_url,
+                en_word=en_word,
+                os_=os_,
+                browser=browser,
+                attempts=3,
+                error_timeout=5
+            )
+            if content is not None:
+                save('promt', f'{en_word}.html', content)
+
+            for url in parsing.get_oxford_url_list(en_word):
+                resp = parsing.get_session(url).get(
+                    url,
+                    headers=parsing.get_headers(os_, browser),
+                    timeout=10
+                )
+                if resp.status_code != 200:
+                    continue
+
+                page_name = url.rsplit('/', 1)[-1]
+                save('oxford', f'{page_name}.html', resp.content)
+
+                mp_3_url = parsing.extract_oxford(resp.content)
+                if mp_3_url:
+                    mp3_name = mp_3_url.rsplit('/', 1)[-1]
+                    mp3_path = os.path.join(folder_path, 'media', mp3_name)
+                    os.makedirs(os.path.dirname(mp3_path), exist_ok=True)
+                    if parsing.write_mp3(url=mp_3_url, file_path=mp3_path,
+                                         os_=os_, browser=browser,
+                                         attempts=3, error_timeout=5):
+                        saved_count += 1
+    finally:
+        parsing.close()
+
+    return saved_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Воспроизведение сохраненных страниц Promt и Oxford'
+    )
+    parser.add_argument('--record', nargs='+', default=None,
+                        metavar='WORD',
+                        help='сохранить ответы настоящих сайтов для слов')
+    parser.add_argument('--fixtures', default=FIXTURES_FOLDER,
+                        help='папка с сохраненными ответами')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='порт сервера')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='задержка ответа в мс')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='случайная добавка к задержке в мс')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='доля ответов 503')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='кол-во запросов в секунду до ответов 429')
+    args = parser.parse_args()
+
+    if args.record:
+        print(f'СОХРАНЕНО ФАЙЛОВ: {record_fixtures(args.record, args.fixtures)}')
+    else:
+        server = ReplayServer(
+            fixtures_folder=args.fixtures,
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            address=('127.0.0.1', args.port)
+        )
+        print(f'Promt: {server.base_url}{PROMT_PATH}')
+        print(f'Oxford: {server.base_url}{OXFORD_PATH}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
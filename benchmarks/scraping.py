@@ -0,0 +1,209 @@
+"""
+Нагрузочный тест поиска слов через Parsing.get_word_info.
+
+Запросы отправляются на локальный сервер benchmarks/replay_server.py,
+который воспроизводит сохраненные страницы Promt и Oxford с заданной
+задержкой, долей ошибок 503 и ограничением частоты (ответы 429).
+Слова ищутся в threads потоках; для каждого уровня параллельности
+создается новый экземпляр Parsing без кэша. Слово, перевод которого
+не получен из-за ошибки сайта, повторяется с паузой, как в очереди
+WordJobWorker.
+
+Результат для каждого уровня параллельности: слов в секунду,
+p50/p99 времени поиска слова, кол-во повторов слов и ответы сервера.
+
+Запуск:
+    python -m benchmarks.scraping --words 200 --threads 1 4 8 16 \
+        --latency-ms 50 --error-rate 0.02 --rate-limit 100
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import tgbot.parsing
+from benchmarks.replay_server import ReplayServer
+from benchmarks.stub_server import OXFORD_PATH, PROMT_PATH
+from cache import MISSING
+from tgbot.audio import AudioIndex
+from tgbot.parsing import Parsing
+from tgbot.ratelimit import RateLimiter, get_backoff_delay
+
+POS_LIST = ['noun', 'verb', 'adjective']
+
+
+def get_percentile(timings: list[float], percentile: float) -> float:
+
+    """
+    Выводит перцентиль отсортированного списка (ближайший ранг).
+
+    Вводные параметры:
+    - timings: отсортированный список значений
+    - percentile: перцентиль от 0 до 100
+
+    Выводной параметр:
+    - значение перцентиля
+    """
+
+    idx = max(0, int(round(percentile / 100 * len(timings))) - 1)
+    return timings[min(idx, len(timings) - 1)]
+
+
+def look_up_word(parsing: Parsing, en_word: str, attempts: int,
+                 backoff_base: float) -> tuple:
+
+    """
+    Ищет слово, повторяя поиск после ошибки сайта.
+
+    Вводные параметры:
+    - parsing: экземпляр класса Parsing
+    - en_word: английское слово
+    - attempts: кол-во попыток
+    - backoff_base: пауза после первой неудачной попытки в секундах
+
+    Выводной параметр:
+    - кортеж (время поиска в секундах, кол-во повторов,
+      True - перевод получен)
+    """
+
+    start = time.perf_counter()
+
+    for attempt in range(attempts):
+        word_list = parsing.get_word_info(
+            en_word=en_word,
+            pos_list=POS_LIST,
+            os_='win',
+            browser='chrome'
+        )
+
+        if word_list[0].get('ru_word') is not None or \
+                parsing.get_cached_promt_data(en_word, POS_LIST) \
+                is not MISSING:
+            return time.perf_counter() - start, attempt, True
+
+        if attempt + 1 < attempts:
+            time.sleep(get_backoff_delay(attempt, base=backoff_base))
+
+    return time.perf_counter() - start, attempts - 1, False
+
+
+def run(server: ReplayServer, words: int, threads: int, attempts: int,
+        backoff_base: float, rate: Optional[float]) -> dict:
+
+    """
+    Ищет words слов в threads потоках.
+
+    Вводные параметры:
+    - server: запущенный ReplayServer
+    - words: кол-во слов
+    - threads: кол-во потоков
+    - attempts: кол-во попыток поиска слова
+    - backoff_base: пауза после первой неудачной попытки в секундах
+    - rate: ограничение частоты запросов Parsing к одному сайту
+            (None - без ограничения)
+
+    Выводной параметр:
+    - словарь с показателями прогона
+    """
+
+    parsing = Parsing(
+        cache_path=None,
+        promt_url=server.base_url + PROMT_PATH,
+        oxford_url=server.base_url + OXFORD_PATH,
+        pool_size=max(10, threads * 4),
+        max_workers=max(8, threads * 4),
+        limiter=RateLimiter(rate=rate, capacity=rate) if rate else None
+    )
+    server.reset_stats()
+
+    with tempfile.TemporaryDirectory() as tmp_folder:
+        tgbot.parsing.audio_index = AudioIndex(folder_path=tmp_folder)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(
+                lambda idx: look_up_word(parsing, f'word{idx}',
+                                         attempts, backoff_base),
+                range(words)
+            ))
+        duration = time.perf_counter() - start
+
+    parsing.close()
+
+    timings = sorted(result[0] for result in results)
+    return {
+        'words_per_sec': words / duration,
+        'mean': statistics.mean(timings) * 1000,
+        'p50': get_percentile(timings, 50) * 1000,
+        'p99': get_percentile(timings, 99) * 1000,
+        'retries': sum(result[1] for result in results),
+        'failed': sum(not result[2] for result in results),
+        **server.get_stats()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный тест Parsing.get_word_info'
+    )
+    parser.add_argument('--words', type=int, default=200,
+                        help='кол-во слов на каждый уровень параллельности')
+    parser.add_argument('--threads', type=int, nargs='+',
+                        default=[1, 4, 8, 16],
+                        help='уровни параллельности')
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help='задержка ответа сервера в мс')
+    parser.add_argument('--jitter-ms', type=float, default=20.0,
+                        help='случайная добавка к задержке в мс')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='доля ответов 503')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='кол-во запросов в секунду до ответов 429')
+    parser.add_argument('--client-rate', type=float, default=None,
+                        help='ограничение частоты запросов Parsing к сайту')
+    parser.add_argument('--attempts', type=int, default=3,
+                        help='кол-во попыток поиска слова')
+    parser.add_argument('--backoff-ms', type=float, default=100.0,
+                        help='пауза после первой неудачной попытки в мс')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='начальное значение генератора ошибок')
+    args = parser.parse_args()
+
+    replay_server = ReplayServer(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    replay_server.start()
+
+    print(f'Слов: {args.words}, задержка: {args.latency_ms} мс '
+          f'(+0..{args.jitter_ms} мс), ошибки 503: {args.error_rate:.0%}, '
+          f'ограничение сервера: {args.rate_limit or "нет"} запр/с')
+    for thread_count in args.threads:
+        # Сообщения Parsing о каждом запросе не выводятся
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(
+                server=replay_server,
+                words=args.words,
+                threads=thread_count,
+                attempts=args.attempts,
+                backoff_base=args.backoff_ms / 1000,
+                rate=args.client_rate
+            )
+        print(f'потоков {thread_count:>3}: '
+              f'{result["words_per_sec"]:7.1f} слов/с, '
+              f'p50 {result["p50"]:7.1f} мс, p99 {result["p99"]:7.1f} мс, '
+              f'повторов {result["retries"]}, '
+              f'не найдено {result["failed"]}, '
+              f'запросов {result["requests"]} '
+              f'(повторных {result["repeated"]}, '
+              f'429: {result["throttled"]}, 5xx: {result["errors"]})')
+
+    replay_server.shutdown()
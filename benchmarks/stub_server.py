@@ -0,0 +1,113 @@
+"""
+Локальный HTTP-сервер, имитирующий онлайн-словари Promt и Oxford.
+
+Сервер отвечает на те же пути, что и настоящие сайты:
+- /translation/english-russian/<слово> - страница перевода Promt
+- /definition/english/<слово> - страница слова Oxford
+- /media/<слово>.mp3 - MP3-файл с произношением
+
+Новое соединение принимается с задержкой handshake_delay,
+которая имитирует установку TCP- и TLS-соединения с сайтом.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+PROMT_PATH = '/translation/english-russian/'
+OXFORD_PATH = '/definition/english/'
+MEDIA_PATH = '/media/'
+
+PROMT_PAGE = '''<html><body>
+<div class="cforms_result">
+<span class="ref_psp">noun</span>
+<span class="transcription">[{word}]</span>
+<div class="translation-item">
+<span class="result_only sayWord">{word}-перевод</span>
+<div class="samSource">This is {word}.</div>
+<div class="samTranslation">Это {word}.</div>
+</div>
+</div>
+</body></html>'''
+
+OXFORD_PAGE = '''<html><body>
+<div class="webtop">
+<div class="sound audio_play_button pron-uk icon-audio"
+ data-src-mp3="{host}{media_path}{word}.mp3" title="{word} pronunciation">
+</div>
+</div>
+</body></html>'''
+
+MP3_CONTENT = b'ID3' + bytes(20 * 1024)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    handshake_delay = 0.0
+
+    def setup(self) -> None:
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_GET(self) -> None:
+        path = unquote(self.path)
+        host = f'http://{self.headers.get("Host")}'
+
+        if path.startswith(PROMT_PATH):
+            word = path[len(PROMT_PATH):]
+            self.send_content(PROMT_PAGE.format(word=word).encode(),
+                              'text/html; charset=utf-8')
+        elif path.startswith(OXFORD_PATH):
+            word = path[len(OXFORD_PATH):]
+            self.send_content(
+                OXFORD_PAGE.format(
+                    host=host,
+                    media_path=MEDIA_PATH,
+                    word=word
+                ).encode(),
+                'text/html; charset=utf-8'
+            )
+        elif path.startswith(MEDIA_PATH) and path.endswith('.mp3'):
+            self.send_content(MP3_CONTENT, 'audio/mpeg')
+        else:
+            self.send_content(b'Not Found', 'text/plain', status=404)
+
+    def send_content(self, content: bytes, content_type: str,
+                     status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_stub_server(handshake_delay: float = 0.0) -> tuple:
+
+    """
+    Запускает сервер в фоновом потоке на свободном порту.
+
+    Вводный параметр:
+    - handshake_delay: задержка приема нового соединения
+                       в секундах (по умолчанию 0.0)
+
+    Выводной параметр:
+    - кортеж (сервер, адрес сервера вида http://127.0.0.1:<порт>)
+    """
+
+    handler = type(
+        'Handler',
+        (StubHandler,),
+        {'handshake_delay': handshake_delay}
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, f'http://127.0.0.1:{server.server_port}'
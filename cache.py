@@ -0,0 +1,365 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+
+    """
+    Оценивает объем памяти, занимаемый значением, с учетом
+    вложенных списков, кортежей, множеств и словарей.
+
+    Вводный параметр:
+    - value: значение, объем которого хотим оценить
+
+    Выводной параметр:
+    - объем значения в байтах
+    """
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item)
+
+    return size
+
+
+class LRUCache:
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 600,
+                 max_bytes: Optional[int] = None,
+                 size_func: Callable[[Any], int] = estimate_size,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - max_entries: максимальное кол-во записей (по умолчанию 1024)
+        - ttl: время жизни записи в секундах (None - без ограничения,
+               по умолчанию 600)
+        - max_bytes: ограничение объема записей в байтах
+                     (None - без ограничения, по умолчанию None)
+        - size_func: функция оценки объема значения (по умолчанию estimate_size)
+        - clock: источник времени (по умолчанию time.monotonic)
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_func = size_func
+        self.clock = clock
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+
+        """
+        Выводит значение по ключу и отмечает запись как последнюю
+        использованную. Просроченная запись удаляется.
+
+        Вводные параметры:
+        - key: ключ записи
+        - default: значение при отсутствии записи (по умолчанию MISSING)
+
+        Выводной параметр:
+        - значение записи или default
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] is not None and \
+                    entry[1] <= self.clock():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+
+        """
+        Сохраняет значение по ключу, вытесняя давно
+        не использованные записи сверх ограничений.
+
+        Вводные параметры:
+        - key: ключ записи
+        - value: значение записи
+        """
+
+        size = self.size_func(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and
+                     self._bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+
+        """
+        Удаляет запись по ключу (при ее наличии).
+
+        Вводный параметр:
+        - key: ключ записи
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+
+        """
+        Удаляет все записи. Счетчики обращений сохраняются.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели кэша.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- hits: кол-во попаданий
+            -- misses: кол-во промахов
+            -- evictions: кол-во вытесненных записей
+            -- entries: кол-во записей
+            -- bytes: оценка объема записей в байтах
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class DiskCache:
+
+    def __init__(self, file_path: str,
+                 ttl: Optional[float] = 30 * 24 * 60 * 60,
+                 max_entries: Optional[int] = 100_000,
+                 prune_interval: int = 100,
+                 clock: Callable[[], float] = time.time) -> None:
+
+        """
+        Кэш в файле SQLite. Каждая запись сохраняется отдельной
+        строкой таблицы, поэтому запись одного ключа не переписывает
+        файл целиком, а несколько процессов могут работать с одним
+        файлом одновременно.
+
+        Инициируемые параметры класса:
+        - file_path: путь к файлу SQLite
+        - ttl: время жизни записи в секундах (None - без ограничения,
+               по умолчанию 30 суток)
+        - max_entries: максимальное кол-во записей (None - без ограничения,
+                       по умолчанию 100 000). Просроченные и самые старые
+                       записи удаляются раз в prune_interval сохранений
+        - prune_interval: кол-во сохранений между очистками (по умолчанию 100)
+        - clock: источник времени (по умолчанию time.time)
+        """
+
+        self.file_path = file_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self.clock = clock
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+
+        """
+        Выводит значение по ключу. Просроченная запись не выводится.
+
+        Вводные параметры:
+        - key: ключ записи
+        - default: значение при отсутствии записи (по умолчанию MISSING)
+
+        Выводной параметр:
+        - значение записи или default
+        """
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?',
+                (key,)
+            ).fetchone() if connection is not None else None
+
+            if row is None or (row[1] is not None and row[1] <= self.clock()):
+                self.misses += 1
+                return default
+
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = MISSING) -> None:
+
+        """
+        Сохраняет значение по ключу на диск.
+
+        Вводные параметры:
+        - key: ключ записи
+        - value: значение записи (должно сериализоваться в JSON)
+        - ttl: время жизни записи в секундах (по умолчанию self.ttl)
+        """
+
+        if ttl is MISSING:
+            ttl = self.ttl
+
+        now = self.clock()
+        json_value = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO cache '
+                    '(key, value, expires_at, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (key, json_value,
+                     None if ttl is None else now + ttl, now)
+                )
+
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self._prune(connection)
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели кэша.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- hits: кол-во попаданий
+            -- misses: кол-во промахов
+            -- entries: кол-во записей
+        """
+
+        with self._lock:
+            connection = self._connect()
+            entries = connection.execute(
+                'SELECT COUNT(*) FROM cache'
+            ).fetchone()[0] if connection is not None else 0
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries
+            }
+
+    def close(self) -> None:
+
+        """
+        Закрывает соединение с файлом кэша.
+        """
+
+        with self._lock:
+            connection, self._connection = self._connection, None
+
+        if connection is not None:
+            connection.close()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._connection is None and not self._disabled:
+            folder_path = os.path.dirname(os.path.abspath(self.file_path))
+            os.makedirs(folder_path, exist_ok=True)
+
+            try:
+                connection = sqlite3.connect(
+                    self.file_path,
+                    timeout=30,
+                    check_same_thread=False
+                )
+                with connection:
+                    connection.execute(
+                        'CREATE TABLE IF NOT EXISTS cache ('
+                        'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                        'expires_at REAL, updated_at REAL NOT NULL)'
+                    )
+                    connection.execute(
+                        'CREATE INDEX IF NOT EXISTS ix_cache_updated_at '
+                        'ON cache (updated_at)'
+                    )
+            except sqlite3.DatabaseError as e:
+                print(f'Кэш {self.file_path} недоступен: {e}')
+                self._disabled = True
+            else:
+                self._connection = connection
+                self._prune(connection)
+
+        return self._connection
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute(
+                'DELETE FROM cache WHERE expires_at <= ?',
+                (self.clock(),)
+            )
+            if self.max_entries is not None:
+                connection.execute(
+                    'DELETE FROM cache WHERE key IN ('
+                    'SELECT key FROM cache ORDER BY updated_at DESC '
+                    'LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
@@ -0,0 +1,940 @@
+import datetime
+from typing import Callable, Optional
+
+import sqlalchemy as sq
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import queries
+from database.engine import AsyncDBEngine
+from database.structure import AudioFiles, Pos, Users, Words, UsersWords, \
+    WordJobs
+
+
+class AsyncDBRepository(AsyncDBEngine):
+
+    """
+    Асинхронный аналог DBRepository на расширении asyncio SQLAlchemy.
+    Публичные методы совпадают с методами DBRepository
+    по названиям, параметрам и выводимым значениям.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+
+        """
+        Инициируемые параметры класса совпадают с параметрами AsyncDBEngine.
+        """
+
+        super().__init__(*args, **kwargs)
+        self._listeners: list[Callable[[Optional[int]], None]] = []
+
+    def add_listener(self, listener: Callable[[Optional[int]], None]) -> None:
+
+        """
+        Подписывает обработчик на операции записи пар "пользователь-слово"
+        (см. DBRepository.add_listener).
+        """
+
+        self._listeners.append(listener)
+
+    def notify_listeners(self, user_id: Optional[int]) -> None:
+
+        """
+        Оповещает подписанные обработчики об операции записи.
+        """
+
+        for listener in self._listeners:
+            listener(user_id)
+
+    async def add_pos(self, pos_name: str) -> None:
+
+        """
+        Добавляет новую часть речи в таблицу pos.
+
+        Вводный параметр:
+        - pos_name: наименование новой части речи
+        """
+
+        async with self.get_session() as session:
+            existing_pos = await session.scalar(
+                sq.select(Pos).where(Pos.pos_name == pos_name)
+            )
+
+            if not existing_pos:
+                session.add(Pos(pos_name=pos_name))
+                await session.commit()
+
+    async def update_pos(self, existing_pos_name: str,
+                         new_pos_name: str) -> None:
+
+        """
+        Обновляет существующую часть речи в таблице pos.
+
+        Вводные параметры:
+        - existing_pos_name: наименование существующей части речи
+        - new_pos_name: новое наименование для существующей части речи
+        """
+
+        async with self.get_session() as session:
+            existing_pos = await session.scalar(
+                sq.select(Pos).where(Pos.pos_name == existing_pos_name)
+            )
+            new_pos = await session.scalar(
+                sq.select(Pos).where(Pos.pos_name == new_pos_name)
+            )
+
+            if existing_pos and not new_pos:
+                existing_pos.pos_name = new_pos_name
+                await session.commit()
+
+    async def delete_pos(self, pos_name: str) -> None:
+
+        """
+        Удаляет часть речи из таблицы pos.
+
+        Вводный параметр:
+        - pos_name: наименование части речи, которую хотим удалить
+        """
+
+        async with self.get_session() as session:
+            existing_pos = await session.scalar(
+                sq.select(Pos).where(Pos.pos_name == pos_name)
+            )
+
+            if existing_pos:
+                await session.delete(existing_pos)
+                await session.commit()
+
+    async def get_pos(self) -> list[dict]:
+
+        """
+        Позволяет получить часть речи из таблицы pos.
+
+        Выводной параметр:
+        - список словарей, содержащий данные таблицы pos
+        """
+
+        async with self.get_session() as session:
+            existing_pos = (await session.scalars(sq.select(Pos))).all()
+
+        pos_list = []
+        for pos_item in existing_pos:
+            pos_list.append({
+                'id': pos_item.id,
+                'pos_name': pos_item.pos_name
+            })
+        return pos_list
+
+    async def get_pos_id(self, pos_name: str) -> Optional[int]:
+
+        """
+        Выводит ID части речи по ее наименованию.
+
+        Вводный параметр:
+        - pos_name: наименование части речи
+
+        Выводной параметр:
+        - ID части речи (None при ее отсутствии)
+        """
+
+        async with self.get_session() as session:
+            return await session.scalar(
+                sq.select(Pos.id).where(Pos.pos_name == pos_name)
+            )
+
+    async def add_word(self, data_dict: dict,
+                       is_added_by_users: bool) -> None:
+
+        """
+        Добавляет новое слово в таблицу words.
+
+        Вводные параметры:
+        - data_dict: словарь с данными английского слова
+        - is_added_by_users: факт добавления слова пользователями
+            -- True: слово добавлено пользователем
+            -- False: слово добавлено разработчиком
+        """
+
+        id_pos = await self.get_pos_id(data_dict.get('pos_name'))
+        if id_pos is None:
+            return
+
+        en_word = data_dict.get('en_word')
+
+        async with self.get_session() as session:
+            existing_word = await session.scalar(
+                sq.select(Words).
+                where(Words.en_word == en_word,
+                      Words.id_pos == id_pos)
+            )
+
+            if not existing_word:
+                session.add(Words(
+                    en_word=en_word,
+                    en_trans=data_dict.get('en_trans'),
+                    mp_3_url=data_dict.get('mp_3_url'),
+                    id_pos=id_pos,
+                    ru_word=data_dict.get('ru_word'),
+                    en_example=data_dict.get('en_example'),
+                    ru_example=data_dict.get('ru_example'),
+                    is_added_by_users=is_added_by_users
+                ))
+            else:
+                existing_word.en_trans = data_dict.get('en_trans')
+                existing_word.mp_3_url = data_dict.get('mp_3_url')
+                existing_word.ru_word = data_dict.get('ru_word')
+                existing_word.en_example = data_dict.get('en_example')
+                existing_word.ru_example = data_dict.get('ru_example')
+                existing_word.is_added_by_users = is_added_by_users
+
+            await session.commit()
+
+    async def delete_word(self, data_dict: dict) -> None:
+
+        """
+        Удаляет слово из таблицы words.
+
+        Вводный параметр:
+        - data_dict: словарь с данными английского слова
+        """
+
+        id_pos = await self.get_pos_id(data_dict.get('pos_name'))
+        if id_pos is None:
+            return
+
+        async with self.get_session() as session:
+            existing_word = await session.scalar(
+                sq.select(Words).
+                where(Words.en_word == data_dict.get('en_word'),
+                      Words.id_pos == id_pos)
+            )
+
+            if existing_word:
+                await session.delete(existing_word)
+                await session.commit()
+
+    async def get_words(self, en_word: str = None,
+                        is_added_by_users: bool = False) -> list[dict]:
+
+        """
+        Позволяет получить слова из таблицы words.
+        По умолчанию выводятся все слова разработчика.
+
+        Вводные параметры:
+        - en_word: слово, которое хотим получить методом фильтрации
+        - is_added_by_users: факт добавления слова пользователями
+
+        Выводной параметр:
+        - список словарей с данными английских слов
+        """
+
+        statement = sq.select(Words). \
+            where(Words.is_added_by_users == is_added_by_users)
+        if en_word:
+            statement = statement.where(Words.en_word == en_word)
+
+        async with self.get_session() as session:
+            existing_words = (await session.scalars(statement)).all()
+
+        words_list = []
+        for word_item in existing_words:
+            words_list.append({
+                'id': word_item.id,
+                'en_word': word_item.en_word,
+                'en_trans': word_item.en_trans,
+                'mp_3_url': word_item.mp_3_url,
+                'id_pos': word_item.id_pos,
+                'ru_word': word_item.ru_word,
+                'en_example': word_item.en_example,
+                'ru_example': word_item.ru_example,
+                'is_added_by_users': word_item.is_added_by_users,
+            })
+        return words_list
+
+    async def add_user(self, user_dict: dict) -> None:
+
+        """
+        Добавляет нового пользователя в таблицу users
+        или обновляет данные существующего.
+
+        Вводный параметр:
+        - user_dict: словарь с данными относительно пользователя
+        """
+
+        async with self.get_session() as session:
+            existing_user = await session.get(
+                Users, user_dict.get('user_id')
+            )
+
+            if not existing_user:
+                session.add(Users(
+                    user_id=user_dict.get('user_id'),
+                    first_name=user_dict.get('first_name'),
+                    last_name=user_dict.get('last_name'),
+                    username=user_dict.get('username')
+                ))
+            else:
+                existing_user.first_name = user_dict.get('first_name')
+                existing_user.last_name = user_dict.get('last_name')
+                existing_user.username = user_dict.get('username')
+
+            await session.commit()
+
+    async def delete_user(self, user_id: int) -> None:
+
+        """
+        Удаляет пользователя из таблицы users.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+        """
+
+        async with self.get_session() as session:
+            existing_user = await session.get(Users, user_id)
+
+            if existing_user:
+                await session.delete(existing_user)
+                await session.commit()
+
+        if existing_user:
+            self.notify_listeners(user_id)
+
+    async def get_users(self, user_id: int = None) -> list[dict]:
+
+        """
+        Позволяет получить информацию относительно пользователей
+        приложения. По умолчанию выводятся все пользователи.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - список словарей с данными таблицы users
+        """
+
+        statement = sq.select(Users)
+        if user_id:
+            statement = statement.where(Users.user_id == user_id)
+
+        async with self.get_session() as session:
+            existing_users = (await session.scalars(statement)).all()
+
+        users_list = []
+        for user_item in existing_users:
+            users_list.append({
+                'user_id': user_item.user_id,
+                'first_name': user_item.first_name,
+                'last_name': user_item.last_name,
+                'username': user_item.username
+            })
+        return users_list
+
+    async def prepare_user_word_pairs(self, user_id: int) -> int:
+
+        """
+        Связывает пользователя со словами из csv-файла database.csv
+        одним запросом INSERT ... SELECT (см. DBRepository).
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - кол-во добавленных пар "пользователь-слово"
+        """
+
+        statement = queries.prepare_pairs_statement(
+            user_id=user_id,
+            date_added=datetime.datetime.now()
+        )
+
+        async with self.get_session() as session:
+            try:
+                async with session.begin():
+                    await self.lock_words_count(
+                        session=session,
+                        user_id=user_id
+                    )
+                    result = await session.execute(statement)
+
+                    if result.rowcount:
+                        await self.shift_words_count(
+                            session=session,
+                            user_id=user_id,
+                            delta=None
+                        )
+            except exc.IntegrityError:
+                return 0
+
+        if result.rowcount:
+            self.notify_listeners(user_id)
+
+        return result.rowcount
+
+    async def add_user_word(self, user_id: int,
+                            data_dict: dict) -> dict:
+
+        """
+        Добавляет или восстанавливает пары "пользователь-слово"
+        одним запросом INSERT ... ON CONFLICT (см. DBRepository).
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - data_dict: словарь с данными английского слова
+
+        Выводной параметр:
+        - словарь с кол-вом добавленных (added)
+          и восстановленных (reactivated) пар
+        """
+
+        en_word = data_dict.get('en_word')
+        result_dict = queries.count_upserted_pairs([])
+
+        async with self.get_session() as session:
+            existing_user = await session.get(Users, user_id)
+            words_id = (await session.scalars(
+                sq.select(Words.id).
+                where(Words.en_word == en_word,
+                      Words.is_added_by_users == False)
+            )).all()
+
+        if not existing_user:
+            return result_dict
+
+        if not words_id:
+            await self.add_word(
+                data_dict,
+                is_added_by_users=True
+            )
+
+            async with self.get_session() as session:
+                words_id = (await session.scalars(
+                    sq.select(Words.id).
+                    where(Words.en_word == en_word,
+                          Words.is_added_by_users == True)
+                )).all()
+
+        if not words_id:
+            return result_dict
+
+        statement = queries.upsert_pairs_statement(
+            user_id=user_id,
+            words_id=list(words_id),
+            date_added=datetime.datetime.now()
+        )
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await self.lock_words_count(
+                    session=session,
+                    user_id=user_id
+                )
+                had_word = await self.has_user_word(
+                    user_id=user_id,
+                    en_word=en_word,
+                    session=session
+                )
+                upserted_rows = (await session.execute(statement)).all()
+
+                if upserted_rows and not had_word:
+                    await self.shift_words_count(
+                        session=session,
+                        user_id=user_id,
+                        delta=1
+                    )
+
+        if upserted_rows:
+            self.notify_listeners(user_id)
+
+        return queries.count_upserted_pairs(upserted_rows)
+
+    async def remove_user_word(self, user_id: int,
+                               en_word: str) -> int:
+
+        """
+        Делает неактивными пары пользователя по английскому слову
+        одним запросом UPDATE ... FROM words.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - en_word: английское слово, которое не устроило пользователя
+
+        Выводной параметр:
+        - кол-во пар "пользователь-слово", ставших неактивными
+        """
+
+        statement = queries.remove_pairs_statement(
+            user_id=user_id,
+            en_word=en_word,
+            date_deleted=datetime.datetime.now()
+        )
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await self.lock_words_count(
+                    session=session,
+                    user_id=user_id
+                )
+                removed_count = (await session.execute(statement)).rowcount
+
+                if removed_count:
+                    await self.shift_words_count(
+                        session=session,
+                        user_id=user_id,
+                        delta=-1
+                    )
+
+        if removed_count:
+            self.notify_listeners(user_id)
+
+        return removed_count
+
+    async def delete_user_word_pair(self, user_id: int,
+                                    en_word: str) -> int:
+
+        """
+        Удаляет пары пользователя по английскому слову
+        одним запросом DELETE ... USING words.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - en_word: английское слово
+
+        Выводной параметр:
+        - кол-во удаленных пар "пользователь-слово"
+        """
+
+        statement = queries.delete_pairs_statement(
+            user_id=user_id,
+            en_word=en_word
+        )
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await self.lock_words_count(
+                    session=session,
+                    user_id=user_id
+                )
+                deleted_count = (await session.execute(statement)).rowcount
+
+                if deleted_count:
+                    await self.shift_words_count(
+                        session=session,
+                        user_id=user_id,
+                        delta=None
+                    )
+
+        if deleted_count:
+            self.notify_listeners(user_id)
+
+        return deleted_count
+
+    async def get_user_words(self, user_id: int,
+                             pos_name: str = None) -> list[dict]:
+
+        """
+        Позволяет получить ВСЕ активные английские слова пользователя.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - pos_name: наименование части речи (по умолчанию None)
+
+        Выводной параметр:
+        - список словарей с данными английских слов
+        """
+
+        statement = sq.select(Words, Pos.pos_name). \
+            join(Pos, Pos.id == Words.id_pos). \
+            join(UsersWords, UsersWords.word_id == Words.id). \
+            where(UsersWords.user_id == user_id,
+                  UsersWords.is_added == True)
+        if pos_name is not None:
+            statement = statement.where(Pos.pos_name == pos_name)
+
+        async with self.get_session() as session:
+            query_result = (await session.execute(statement)).all()
+
+        user_words_list = []
+        for word, word_pos_name in query_result:
+            user_words_list.append({
+                'en_word': word.en_word,
+                'en_trans': word.en_trans,
+                'mp_3_url': word.mp_3_url,
+                'pos_name': word_pos_name,
+                'ru_word': word.ru_word,
+                'en_example': word.en_example,
+                'ru_example': word.ru_example
+            })
+        return user_words_list
+
+    async def get_user_card(self, user_id: int, pos_name: str,
+                            others_count: int = 3) -> Optional[tuple]:
+
+        """
+        Выбирает на стороне БД карточку для тренировки
+        (см. DBRepository.get_user_card).
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - pos_name: наименование части речи
+        - others_count: кол-во некорректных вариантов ответа (по умолчанию 3)
+
+        Выводной параметр:
+        - кортеж в формате Functionality.get_random_words
+          или None при отсутствии слов
+        """
+
+        async with self.get_session() as session:
+            total_words = await session.scalar(
+                queries.card_count_statement(user_id, pos_name)
+            )
+
+            if not total_words:
+                return None
+
+            row_numbers = queries.sample_row_numbers(
+                total_words=total_words,
+                others_count=others_count
+            )
+
+            query_result = (await session.execute(
+                queries.card_rows_statement(user_id, pos_name, row_numbers)
+            )).all()
+
+        return queries.build_card(
+            query_result=query_result,
+            row_numbers=row_numbers,
+            others_count=others_count
+        )
+
+    async def get_user_deck(self, user_id: int) -> list[dict]:
+
+        """
+        Выводит активные слова пользователя для загрузки колоды
+        в VocabularyStore.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - список словарей с данными английских слов
+        """
+
+        async with self.get_session() as session:
+            query_result = (await session.execute(
+                queries.user_deck_statement(user_id)
+            )).all()
+
+        return [word_row._asdict() for word_row in query_result]
+
+    async def get_unique_user_words(self, user_id: int) -> Optional[list]:
+
+        """
+        Выводит УНИКАЛЬНЫЕ английские слова пользователя.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - список с уникальными английскими словами пользователя
+          (None при их отсутствии, как в DBRepository)
+        """
+
+        statement = sq.select(Words.en_word). \
+            join(UsersWords, UsersWords.word_id == Words.id). \
+            where(UsersWords.user_id == user_id,
+                  UsersWords.is_added == True). \
+            distinct()
+
+        async with self.get_session() as session:
+            unique_words = (await session.scalars(statement)).all()
+
+        if unique_words:
+            return list(unique_words)
+
+    async def count_unique_user_words(self, user_id: int) -> int:
+
+        """
+        Считает кол-во УНИКАЛЬНЫХ английских слов пользователя
+        через COUNT(DISTINCT en_word).
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - кол-во уникальных английских слов пользователя
+        """
+
+        async with self.get_session() as session:
+            words_count = await session.scalar(
+                queries.count_unique_statement(user_id)
+            )
+
+        return words_count or 0
+
+    async def get_user_words_count(self, user_id: int) -> int:
+
+        """
+        Выводит кол-во уникальных английских слов пользователя из
+        счетчика users.words_count с пересчетом сброшенного значения.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - кол-во уникальных английских слов пользователя
+        """
+
+        async with self.get_session() as session:
+            words_count = await session.scalar(
+                queries.words_count_statement(user_id)
+            )
+
+        if words_count is None:
+            async with self.get_session() as session:
+                async with session.begin():
+                    words_count = await session.scalar(
+                        queries.lock_words_count_statement(user_id)
+                    )
+
+                    if words_count is None:
+                        words_count = await session.scalar(
+                            queries.count_unique_statement(user_id)
+                        ) or 0
+
+                        await session.execute(
+                            queries.store_words_count_statement(
+                                user_id=user_id,
+                                words_count=words_count
+                            )
+                        )
+
+        return words_count
+
+    async def get_word_info(self, en_word: str) -> list[dict]:
+
+        """
+        Выводит имеющиеся в таблице words переводы английского слова
+        (см. DBRepository.get_word_info).
+        """
+
+        async with self.get_session() as session:
+            query_result = (await session.execute(
+                queries.word_info_statement(en_word)
+            )).all()
+
+        word_list = []
+        pos_names = set()
+        for word_row in query_result:
+            if word_row.pos_name not in pos_names:
+                pos_names.add(word_row.pos_name)
+                word_list.append(word_row._asdict())
+        return word_list
+
+    async def get_audio_file_id(self, file_name: str) -> Optional[str]:
+
+        """
+        Выводит ID MP3-файла, ранее загруженного в Telegram.
+        """
+
+        async with self.get_session() as session:
+            return await session.scalar(
+                sq.select(AudioFiles.file_id).
+                where(AudioFiles.file_name == file_name)
+            )
+
+    async def get_audio_file_names(self) -> set[str]:
+
+        """
+        Выводит названия MP3-файлов, загруженных в Telegram.
+        """
+
+        async with self.get_session() as session:
+            file_names = await session.scalars(
+                sq.select(AudioFiles.file_name)
+            )
+            return set(file_names)
+
+    async def add_audio_file_id(self, file_name: str, file_id: str) -> None:
+
+        """
+        Сохраняет ID MP3-файла, загруженного в Telegram.
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await session.execute(
+                    queries.upsert_audio_file_statement(
+                        file_name=file_name,
+                        file_id=file_id,
+                        date_added=datetime.datetime.now()
+                    )
+                )
+
+    async def delete_audio_file_id(self, file_name: str) -> None:
+
+        """
+        Удаляет устаревший ID MP3-файла.
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await session.execute(
+                    sq.delete(AudioFiles).
+                    where(AudioFiles.file_name == file_name)
+                )
+
+    async def add_word_job(self, user_id: int, chat_id: int,
+                           en_word: str) -> Optional[int]:
+
+        """
+        Ставит в очередь задачу поиска перевода английского слова
+        (None - слово пользователя уже стоит в очереди).
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                return await session.scalar(
+                    queries.add_word_job_statement(
+                        user_id=user_id,
+                        chat_id=chat_id,
+                        en_word=en_word,
+                        date_added=datetime.datetime.now()
+                    )
+                )
+
+    async def claim_word_job(self) -> Optional[dict]:
+
+        """
+        Забирает в работу самую раннюю готовую к выполнению задачу.
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                job_row = (await session.execute(
+                    queries.claim_word_job_statement(
+                        date_updated=datetime.datetime.now()
+                    )
+                )).first()
+            return job_row._asdict() if job_row else None
+
+    async def complete_word_job(self, job_id: int) -> None:
+
+        """
+        Удаляет выполненную задачу из очереди.
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await session.execute(
+                    sq.delete(WordJobs).
+                    where(WordJobs.id == job_id)
+                )
+
+    async def retry_word_job(self, job_id: int, delay: float,
+                             error: Optional[str] = None) -> None:
+
+        """
+        Возвращает задачу в очередь для повторной попытки.
+        """
+
+        now = datetime.datetime.now()
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await session.execute(
+                    queries.update_word_job_statement(
+                        job_id=job_id,
+                        status='pending',
+                        date_updated=now,
+                        run_after=now + datetime.timedelta(seconds=delay),
+                        last_error=error
+                    )
+                )
+
+    async def fail_word_job(self, job_id: int,
+                            error: Optional[str] = None) -> None:
+
+        """
+        Помечает задачу как неудавшуюся.
+        """
+
+        async with self.get_session() as session:
+            async with session.begin():
+                await session.execute(
+                    queries.update_word_job_statement(
+                        job_id=job_id,
+                        status='failed',
+                        date_updated=datetime.datetime.now(),
+                        last_error=error
+                    )
+                )
+
+    async def reset_stale_word_jobs(self, timeout: float) -> int:
+
+        """
+        Возвращает в очередь задачи, выполнение которых было прервано.
+        """
+
+        now = datetime.datetime.now()
+
+        async with self.get_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    queries.reset_word_jobs_statement(
+                        updated_before=now - datetime.timedelta(
+                            seconds=timeout
+                        ),
+                        date_updated=now
+                    )
+                )
+            return result.rowcount
+
+    async def has_user_word(self, user_id: int, en_word: str,
+                            session: Optional[AsyncSession] = None) -> bool:
+
+        """
+        Проверяет наличие английского слова в БД пользователя.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - en_word: английское слово
+        - session: открытая сессия (по умолчанию создается новая)
+
+        Выводной параметр:
+        - bool: True - слово есть у пользователя, False - наоборот
+        """
+
+        statement = queries.has_word_statement(user_id, en_word)
+
+        if session is not None:
+            return bool(await session.scalar(statement))
+
+        async with self.get_session() as session:
+            return bool(await session.scalar(statement))
+
+    async def lock_words_count(self, session: AsyncSession,
+                               user_id: int) -> None:
+
+        """
+        Блокирует строку пользователя до конца транзакции открытой
+        сессии (см. DBRepository.lock_words_count).
+        """
+
+        await session.execute(
+            queries.lock_words_count_statement(user_id)
+        )
+
+    async def shift_words_count(self, session: AsyncSession, user_id: int,
+                                delta: Optional[int]) -> None:
+
+        """
+        Изменяет счетчик users.words_count в рамках открытой сессии
+        (см. DBRepository.shift_words_count).
+        """
+
+        await session.execute(
+            queries.shift_words_count_statement(
+                user_id=user_id,
+                delta=delta
+            )
+        )
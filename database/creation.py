@@ -1,47 +1,143 @@
 import csv
+import datetime
+import io
+from typing import Iterable, Iterator, Optional
 
 import sqlalchemy as sq
-from psycopg2 import errors
-from sqlalchemy import create_engine, exc, Engine
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import database_exists, create_database
 
 from filefinder import find_file
-from database.structure import get_table_list, form_tables, Pos, Words
-
-
-class DBCreation:
-
-    def __init__(self, dbname: str, user: str, password: str,
-                 host: str = 'localhost', port: str = '5432'):
-
-        """
-        Инициируемые параметры класса:
-        - dbname: название базы данных
-        - user: логин пользователя Postgres
-        - password: пароль пользователя Postgres
-        - host: хост (по умолчанию localhost)
-        - port: порт (по умолчанию 5432)
-        """
-
-        self.dbname = dbname
-        self.user = user
-        self.password = password
-        self.host = host
-        self.port = port
-
-    def get_engine(self) -> Engine:
-
-        """
-        Запускает движок по DNS-ссылке. Запуск движка
-        позволяет начать взаимодействие с БД через ORM.
+from database.engine import DBEngine
+from database.migrations import MIGRATIONS
+from database.structure import get_table_list, form_tables, \
+    Pos, SchemaVersion
+
+SCHEMA_LOCK_ID = 4475
+
+STAGE_WORDS_SQL = """
+    CREATE TEMP TABLE words_stage (
+        en_word VARCHAR(350) NOT NULL,
+        en_trans VARCHAR(350),
+        mp_3_url VARCHAR(350),
+        id_pos INTEGER NOT NULL,
+        ru_word VARCHAR(350) NOT NULL,
+        en_example VARCHAR(1500) NOT NULL,
+        ru_example VARCHAR(1500) NOT NULL
+    ) ON COMMIT DROP
+"""
+
+COPY_WORDS_SQL = """
+    COPY words_stage (en_word, en_trans, mp_3_url, id_pos,
+                      ru_word, en_example, ru_example)
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+UNIQUE_STAGE_SQL = """
+    SELECT DISTINCT ON (en_word, id_pos) *
+    FROM words_stage
+    ORDER BY en_word, id_pos
+"""
+
+UPDATE_WORDS_SQL = f"""
+    UPDATE words AS w
+    SET en_trans = s.en_trans,
+        mp_3_url = s.mp_3_url,
+        ru_word = s.ru_word,
+        en_example = s.en_example,
+        ru_example = s.ru_example,
+        is_added_by_users = false
+    FROM ({UNIQUE_STAGE_SQL}) AS s
+    WHERE w.en_word = s.en_word
+      AND w.id_pos = s.id_pos
+      AND (w.en_trans, w.mp_3_url, w.ru_word, w.en_example,
+           w.ru_example, w.is_added_by_users)
+          IS DISTINCT FROM
+          (s.en_trans, s.mp_3_url, s.ru_word, s.en_example,
+           s.ru_example, false)
+"""
+
+INSERT_WORDS_SQL = f"""
+    INSERT INTO words (en_word, en_trans, mp_3_url, id_pos, ru_word,
+                       en_example, ru_example, is_added_by_users)
+    SELECT s.en_word, s.en_trans, s.mp_3_url, s.id_pos, s.ru_word,
+           s.en_example, s.ru_example, false
+    FROM ({UNIQUE_STAGE_SQL}) AS s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM words AS w
+        WHERE w.en_word = s.en_word
+          AND w.id_pos = s.id_pos
+    )
+"""
+
+
+def get_seed_rows(csv_reader: Iterable[list],
+                  pos_ids: dict) -> Iterator[list]:
+
+    """
+    Построчно преобразует строки database.csv в строки для COPY.
+    Заголовок и строки с неизвестной частью речи пропускаются.
+
+    Вводные параметры:
+    - csv_reader: итерируемый объект со строками csv-файла
+    - pos_ids: словарь "название части речи - ID"
+
+    Выводной параметр:
+    - итератор списков (en_word, en_trans, mp_3_url, id_pos,
+      ru_word, en_example, ru_example)
+    """
+
+    for idx, word_row in enumerate(csv_reader):
+        if idx == 0 or len(word_row) < 8:
+            continue
+
+        id_pos = pos_ids.get(word_row[1])
+        if id_pos is None:
+            continue
+
+        yield [word_row[0], word_row[5], word_row[3], id_pos,
+               word_row[4], word_row[6], word_row[7]]
+
+
+class CsvCopyStream:
+
+    """
+    Файлоподобный объект для cursor.copy_expert. Строки итератора
+    сериализуются в CSV по мере чтения, поэтому файл целиком
+    в памяти не хранится. Все значения берутся в кавычки, чтобы
+    пустые строки не превращались в NULL.
+    """
+
+    def __init__(self, rows: Iterator[list]) -> None:
+        self.rows = rows
+        self.buffer = ''
+        self.line = io.StringIO()
+        self.writer = csv.writer(
+            self.line,
+            quoting=csv.QUOTE_ALL,
+            lineterminator='\n'
+        )
+
+    def read(self, size: int = -1) -> str:
+        while self.rows is not None and \
+                (size < 0 or len(self.buffer) < size):
+            row = next(self.rows, None)
+            if row is None:
+                self.rows = None
+                break
+
+            self.line.seek(0)
+            self.line.truncate()
+            self.writer.writerow(row)
+            self.buffer += self.line.getvalue()
+
+        if size < 0:
+            chunk, self.buffer = self.buffer, ''
+        else:
+            chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
 
-        Выводной параметр:
-        - движок sqlalchemy
-        """
 
-        dns_link = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
-        return create_engine(dns_link)
+class DBCreation(DBEngine):
 
     def exists_db(self) -> bool:
 
@@ -95,23 +191,84 @@ class DBCreation:
         if not self.exists_tables():
             form_tables(engine)
 
+    def get_schema_version(self) -> int:
+
+        """
+        Выводит номер последней примененной версии схемы БД.
+
+        Выводной параметр:
+        - номер версии (0, если обновления схемы не применялись)
+        """
+
+        engine = self.get_engine()
+        if not sq.inspect(engine).has_table(SchemaVersion.__tablename__):
+            return 0
+
+        with engine.connect() as connection:
+            version = connection.execute(
+                sq.select(sq.func.max(SchemaVersion.version))
+            ).scalar()
+
+        return version or 0
+
+    def upgrade_schema(self) -> list[int]:
+
+        """
+        Применяет к БД недостающие версии схемы из database/migrations.py.
+        Нужен для уже развернутых БД: create_tables создает индексы
+        только для отсутствующих таблиц. Обновление выполняется в одной
+        транзакции под advisory-блокировкой, поэтому параллельно
+        запущенные экземпляры бота не применяют шаги дважды.
+
+        Выводной параметр:
+        - список примененных версий
+        """
+
+        engine = self.get_engine()
+        applied_versions = []
+
+        with engine.begin() as connection:
+            connection.execute(
+                sq.select(sq.func.pg_advisory_xact_lock(SCHEMA_LOCK_ID))
+            )
+            SchemaVersion.__table__.create(connection, checkfirst=True)
+
+            current_version = connection.execute(
+                sq.select(sq.func.max(SchemaVersion.version))
+            ).scalar() or 0
+
+            for version in sorted(MIGRATIONS):
+                if version <= current_version:
+                    continue
+
+                for statement in MIGRATIONS[version]:
+                    connection.exec_driver_sql(statement)
+
+                connection.execute(
+                    sq.insert(SchemaVersion).values(
+                        version=version,
+                        date_applied=datetime.datetime.now()
+                    )
+                )
+                applied_versions.append(version)
+
+        return applied_versions
+
     def prepare_pos(self) -> None:
 
         """
         Заполняет таблицу pos.
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         pos_count = session.query(Pos).count()
 
         if pos_count == 0:
-            noun = Pos(id=1, pos_name='noun')
-            verb = Pos(id=2, pos_name='verb')
-            adjective = Pos(id=3, pos_name='adjective')
-            unidentified = Pos(id=4, pos_name='unidentified')
+            noun = Pos(pos_name='noun')
+            verb = Pos(pos_name='verb')
+            adjective = Pos(pos_name='adjective')
+            unidentified = Pos(pos_name='unidentified')
 
             session.add_all([noun, verb, adjective,
                              unidentified])
@@ -128,11 +285,10 @@ class DBCreation:
         - список словарей с данными по частям речи
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_pos = session.query(Pos).all()
+        session.close()
 
         pos_list = []
         if existing_pos:
@@ -143,55 +299,61 @@ class DBCreation:
                 })
             return pos_list
 
-    def prepare_words(self) -> None:
+    def prepare_words(self, csv_path: Optional[str] = None) -> int:
 
         """
-        Заполняет таблицу words словами,
-        содержащимися в csv-файле database.csv.
-        """
+        Заполняет таблицу words словами, содержащимися в csv-файле
+        database.csv. Файл читается построчно и передается в БД
+        через COPY FROM STDIN во временную таблицу, после чего
+        слова добавляются в words с обновлением уже существующих
+        пар (en_word, id_pos). Повторный запуск не дублирует слова,
+        а дубли внутри файла не прерывают загрузку.
 
-        csv_path = find_file(file_name='database.csv')
+        Вводный параметр:
+        - csv_path: путь к csv-файлу (по умолчанию database.csv)
+
+        Выводной параметр:
+        - кол-во добавленных и обновленных слов
+        """
 
-        with (open(csv_path) as f):
-            csv_reader = csv.reader(f)
-            data = list(csv_reader)
+        if csv_path is None:
+            csv_path = find_file(file_name='database.csv')
 
         self.prepare_pos()
         pos_data = self.get_pos()
 
-        object_list = []
-
-        if pos_data:
-            for idx, word_dict in enumerate(data[1:]):
-
-                id_pos = []
-                for pos_dict in pos_data:
-                    if pos_dict.get('pos_name') == word_dict[1]:
-                        id_pos.append(pos_dict.get('id'))
-
-                object_list.append(
-                    Words(
-                        id=idx + 1,
-                        en_word=word_dict[0],
-                        en_trans=word_dict[5],
-                        mp_3_url=word_dict[3],
-                        id_pos=id_pos.pop(),
-                        ru_word=word_dict[4],
-                        en_example=word_dict[6],
-                        ru_example=word_dict[7],
-                        is_added_by_users=False
+        if not pos_data:
+            return 0
+
+        pos_ids = {}
+        for pos_dict in pos_data:
+            pos_ids[pos_dict.get('pos_name')] = pos_dict.get('id')
+
+        raw_connection = self.get_engine().raw_connection()
+
+        try:
+            with raw_connection.cursor() as cursor:
+                cursor.execute(STAGE_WORDS_SQL)
+
+                with open(csv_path, newline='', encoding='utf-8') as f:
+                    cursor.copy_expert(
+                        sql=COPY_WORDS_SQL,
+                        file=CsvCopyStream(
+                            get_seed_rows(csv.reader(f), pos_ids)
+                        )
                     )
-                )
 
-            engine = self.get_engine()
-            session_class = sessionmaker(bind=engine)
-            session = session_class()
+                cursor.execute(UPDATE_WORDS_SQL)
+                updated_count = cursor.rowcount
+
+                cursor.execute(INSERT_WORDS_SQL)
+                inserted_count = cursor.rowcount
 
-            try:
-                session.bulk_save_objects(object_list)
-                session.commit()
-            except (exc.IntegrityError,
-                    errors.UniqueViolation):
-                pass
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
 
-            session.close()
+        return updated_count + inserted_count
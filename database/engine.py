@@ -0,0 +1,239 @@
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, \
+    AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+
+
+class DBEngine:
+
+    def __init__(self, dbname: str, user: str, password: str,
+                 host: str = 'localhost', port: str = '5432',
+                 pool_size: int = 5, max_overflow: int = 10,
+                 pool_pre_ping: bool = True,
+                 pool_recycle: int = 1800) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - dbname: название базы данных
+        - user: логин пользователя Postgres
+        - password: пароль пользователя Postgres
+        - host: хост (по умолчанию localhost)
+        - port: порт (по умолчанию 5432)
+        - pool_size: кол-во постоянных соединений в пуле (по умолчанию 5)
+        - max_overflow: кол-во временных соединений сверх pool_size
+                        (по умолчанию 10)
+        - pool_pre_ping: проверка соединения перед его выдачей из пула
+                         (по умолчанию True)
+        - pool_recycle: кол-во секунд, по истечении которых соединение
+                        пересоздается (по умолчанию 1800)
+        """
+
+        self.dbname = dbname
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+
+        self._engine: Optional[Engine] = None
+        self._session_class: Optional[sessionmaker] = None
+        self._engine_lock = threading.Lock()
+
+    def get_engine(self) -> Engine:
+
+        """
+        Запускает движок по DNS-ссылке. Движок создается один раз
+        при первом обращении и далее переиспользуется вместе
+        со своим пулом соединений.
+
+        Выводной параметр:
+        - движок sqlalchemy
+        """
+
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    dns_link = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
+                    engine = create_engine(
+                        dns_link,
+                        poolclass=QueuePool,
+                        pool_size=self.pool_size,
+                        max_overflow=self.max_overflow,
+                        pool_pre_ping=self.pool_pre_ping,
+                        pool_recycle=self.pool_recycle
+                    )
+                    # Фабрика сессий публикуется раньше движка: поток,
+                    # увидевший _engine, всегда видит и _session_class
+                    self._session_class = sessionmaker(
+                        bind=engine
+                    )
+                    self._engine = engine
+        return self._engine
+
+    def get_session(self) -> Session:
+
+        """
+        Открывает новую сессию на общей фабрике сессий.
+        Соединение для сессии берется из пула движка.
+
+        Выводной параметр:
+        - сессия sqlalchemy
+        """
+
+        session_class = self._session_class
+        if session_class is None:
+            self.get_engine()
+            session_class = self._session_class
+        return session_class()
+
+    def get_pool_stats(self) -> dict:
+
+        """
+        Выводит состояние пула соединений. Пока движок
+        не создан, все показатели равны нулю.
+
+        Выводной параметр:
+        - словарь с показателями пула:
+            -- pool_size: кол-во постоянных соединений
+            -- checked_out: кол-во выданных соединений
+            -- idle: кол-во простаивающих соединений в пуле
+            -- overflow: кол-во временных соединений сверх pool_size
+        """
+
+        if self._engine is None:
+            return {
+                'pool_size': self.pool_size,
+                'checked_out': 0,
+                'idle': 0,
+                'overflow': 0
+            }
+
+        pool = self._engine.pool
+        return {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        }
+
+    def dispose(self) -> None:
+
+        """
+        Закрывает все соединения пула и сбрасывает движок.
+        Следующее обращение к get_engine создаст новый движок.
+        """
+
+        with self._engine_lock:
+            engine = self._engine
+            self._engine = None
+            self._session_class = None
+            if engine is not None:
+                engine.dispose()
+
+
+class AsyncDBEngine:
+
+    def __init__(self, dbname: str, user: str, password: str,
+                 host: str = 'localhost', port: str = '5432',
+                 pool_size: int = 5, max_overflow: int = 10,
+                 pool_pre_ping: bool = True,
+                 pool_recycle: int = 1800) -> None:
+
+        """
+        Инициируемые параметры класса совпадают с параметрами DBEngine.
+        Движок работает через драйвер asyncpg.
+        """
+
+        self.dbname = dbname
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+
+        self._engine: Optional[AsyncEngine] = None
+        self._session_class: Optional[async_sessionmaker] = None
+
+    def get_engine(self) -> AsyncEngine:
+
+        """
+        Запускает асинхронный движок по DNS-ссылке. Движок создается
+        один раз при первом обращении и далее переиспользуется.
+
+        Выводной параметр:
+        - асинхронный движок sqlalchemy
+        """
+
+        if self._engine is None:
+            dns_link = f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
+            engine = create_async_engine(
+                dns_link,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_pre_ping=self.pool_pre_ping,
+                pool_recycle=self.pool_recycle
+            )
+            self._session_class = async_sessionmaker(
+                bind=engine,
+                expire_on_commit=False
+            )
+            self._engine = engine
+        return self._engine
+
+    def get_session(self) -> AsyncSession:
+
+        """
+        Открывает новую асинхронную сессию на общей фабрике сессий.
+
+        Выводной параметр:
+        - асинхронная сессия sqlalchemy
+        """
+
+        self.get_engine()
+        return self._session_class()
+
+    def get_pool_stats(self) -> dict:
+
+        """
+        Выводит состояние пула соединений
+        в формате DBEngine.get_pool_stats.
+        """
+
+        if self._engine is None:
+            return {
+                'pool_size': self.pool_size,
+                'checked_out': 0,
+                'idle': 0,
+                'overflow': 0
+            }
+
+        pool = self._engine.sync_engine.pool
+        return {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        }
+
+    async def dispose(self) -> None:
+
+        """
+        Закрывает все соединения пула и сбрасывает движок.
+        """
+
+        if self._engine is not None:
+            await self._engine.dispose()
+        self._engine = None
+        self._session_class = None
@@ -0,0 +1,167 @@
+"""
+Версионированные шаги обновления схемы БД.
+
+Каждой версии соответствует список SQL-выражений, которые
+DBCreation.upgrade_schema выполняет в одной транзакции. Выражения
+должны быть идемпотентными: на новой БД таблицы уже созданы через
+create_all вместе с индексами, и шаги применяются к ним повторно.
+"""
+
+IDENTITY_TABLES = ['pos', 'words', 'users_words']
+
+
+def get_identity_steps(table_name: str) -> list[str]:
+
+    """
+    Формирует шаги перевода столбца id таблицы на identity-столбец.
+    Прежний SERIAL-сиквенс удаляется, а счетчик identity выставляется
+    на значение, следующее за максимальным ID таблицы.
+
+    Вводный параметр:
+    - table_name: название таблицы
+
+    Выводной параметр:
+    - список SQL-выражений
+    """
+
+    return [
+        f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = '{table_name}'
+                  AND column_name = 'id'
+                  AND is_identity = 'YES'
+            ) THEN
+                ALTER TABLE {table_name} ALTER COLUMN id DROP DEFAULT;
+                DROP SEQUENCE IF EXISTS {table_name}_id_seq;
+                ALTER TABLE {table_name} ALTER COLUMN id
+                ADD GENERATED BY DEFAULT AS IDENTITY;
+            END IF;
+        END
+        $$
+        """,
+        f"""
+        SELECT setval(
+            pg_get_serial_sequence('{table_name}', 'id'),
+            COALESCE(MAX(id), 0) + 1,
+            false
+        )
+        FROM {table_name}
+        """,
+    ]
+
+
+MIGRATIONS = {
+    1: [
+        # Перед уникальным ограничением убираем дубли пар
+        # "пользователь-слово", оставляя активную пару с меньшим ID
+        """
+        DELETE FROM users_words a
+        USING users_words b
+        WHERE a.user_id = b.user_id
+          AND a.word_id = b.word_id
+          AND (b.is_added > a.is_added
+               OR (b.is_added = a.is_added AND b.id < a.id))
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'uq_users_words_user_id_word_id'
+            ) THEN
+                ALTER TABLE users_words
+                ADD CONSTRAINT uq_users_words_user_id_word_id
+                UNIQUE (user_id, word_id);
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_users_words_user_id_active
+        ON users_words (user_id, word_id)
+        WHERE is_added
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_users_words_word_id
+        ON users_words (word_id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_words_en_word_id_pos
+        ON words (en_word, id_pos)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_words_en_word_is_added_by_users
+        ON words (en_word, is_added_by_users)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_words_id_pos
+        ON words (id_pos)
+        """,
+    ],
+    2: [
+        step
+        for table_name in IDENTITY_TABLES
+        for step in get_identity_steps(table_name)
+    ],
+    3: [
+        # Счетчик уникальных слов пользователя. NULL означает,
+        # что значение будет пересчитано при первом обращении
+        """
+        ALTER TABLE users
+        ADD COLUMN IF NOT EXISTS words_count INTEGER
+        """,
+    ],
+    4: [
+        # ID MP3-файлов, загруженных в Telegram
+        """
+        CREATE TABLE IF NOT EXISTS audio_files (
+            file_name VARCHAR(500) PRIMARY KEY,
+            file_id VARCHAR(250) NOT NULL,
+            date_added TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+        """,
+    ],
+    5: [
+        # Очередь поиска перевода слов, добавленных пользователями
+        """
+        CREATE TABLE IF NOT EXISTS word_jobs (
+            id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            user_id INTEGER NOT NULL
+                REFERENCES users (user_id) ON DELETE CASCADE,
+            chat_id BIGINT NOT NULL,
+            en_word VARCHAR(350) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER NOT NULL,
+            last_error VARCHAR(1000),
+            run_after TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            date_added TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            date_updated TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_word_jobs_user_id_en_word_active
+        ON word_jobs (user_id, en_word)
+        WHERE status IN ('pending', 'running')
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_word_jobs_status_run_after
+        ON word_jobs (status, run_after)
+        """,
+    ],
+}
+
+
+def get_latest_version() -> int:
+
+    """
+    Выводит номер последней версии схемы БД.
+
+    Выводной параметр:
+    - номер последней версии (0 при отсутствии шагов обновления)
+    """
+
+    return max(MIGRATIONS, default=0)
@@ -0,0 +1,622 @@
+import datetime
+import random
+from typing import Iterable, Optional
+
+import sqlalchemy as sq
+from sqlalchemy.dialects.postgresql import insert
+
+from database.structure import AudioFiles, Pos, Users, Words, UsersWords, \
+    WordJobs
+
+
+def prepare_pairs_statement(user_id: int,
+                            date_added: datetime.datetime) -> sq.Insert:
+
+    """
+    Формирует запрос INSERT ... SELECT, связывающий пользователя
+    со словами разработчика. Пары создаются только для существующего
+    пользователя, у которого еще нет ни одной пары "пользователь-слово".
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - date_added: дата добавления пар
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    word_select = sq.select(
+        sq.literal(user_id),
+        Words.id,
+        sq.true(),
+        sq.false(),
+        sq.literal(date_added)
+    ). \
+        where(Words.is_added_by_users == False,
+              sq.exists().where(Users.user_id == user_id),
+              ~sq.exists().where(UsersWords.user_id == user_id))
+
+    return insert(UsersWords). \
+        from_select(['user_id', 'word_id', 'is_added',
+                     'is_user_word', 'date_added'],
+                    word_select). \
+        on_conflict_do_nothing(index_elements=['user_id', 'word_id'])
+
+
+def upsert_pairs_statement(user_id: int, words_id: list[int],
+                           date_added: datetime.datetime) -> sq.Insert:
+
+    """
+    Формирует запрос INSERT ... ON CONFLICT (user_id, word_id) DO UPDATE,
+    добавляющий новые пары "пользователь-слово" и восстанавливающий
+    неактивные. Запрос возвращает столбец is_inserted
+    (True - пара добавлена, False - пара восстановлена).
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - words_id: список ID слов из таблицы words
+    - date_added: дата добавления пар
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return insert(UsersWords). \
+        values([{
+            'user_id': user_id,
+            'word_id': word_id,
+            'is_added': True,
+            'is_user_word': True,
+            'date_added': date_added,
+            'date_deleted': None
+        } for word_id in words_id]). \
+        on_conflict_do_update(
+            index_elements=['user_id', 'word_id'],
+            set_={
+                'is_added': True,
+                'date_added': date_added,
+                'date_deleted': None
+            },
+            where=UsersWords.is_added == False
+        ). \
+        returning(sq.literal_column('xmax = 0').label('is_inserted'))
+
+
+def count_upserted_pairs(upserted_rows: Iterable) -> dict:
+
+    """
+    Подводит итоги запроса upsert_pairs_statement.
+
+    Вводный параметр:
+    - upserted_rows: строки, возвращенные запросом
+
+    Выводной параметр:
+    - словарь с кол-вом добавленных (added)
+      и восстановленных (reactivated) пар
+    """
+
+    result_dict = {'added': 0, 'reactivated': 0}
+    for upserted_row in upserted_rows:
+        if upserted_row.is_inserted:
+            result_dict['added'] += 1
+        else:
+            result_dict['reactivated'] += 1
+    return result_dict
+
+
+def remove_pairs_statement(user_id: int, en_word: str,
+                           date_deleted: datetime.datetime) -> sq.Update:
+
+    """
+    Формирует запрос UPDATE users_words ... FROM words, делающий
+    неактивными все пары пользователя по английскому слову.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - en_word: английское слово
+    - date_deleted: дата удаления пар
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.update(UsersWords). \
+        where(UsersWords.word_id == Words.id,
+              Words.en_word == en_word,
+              UsersWords.user_id == user_id,
+              UsersWords.is_added == True). \
+        values(is_added=False,
+               date_added=None,
+               date_deleted=date_deleted). \
+        execution_options(synchronize_session=False)
+
+
+def delete_pairs_statement(user_id: int, en_word: str) -> sq.Delete:
+
+    """
+    Формирует запрос DELETE FROM users_words ... USING words, удаляющий
+    все пары пользователя по английскому слову.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - en_word: английское слово
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.delete(UsersWords). \
+        where(UsersWords.word_id == Words.id,
+              Words.en_word == en_word,
+              UsersWords.user_id == user_id). \
+        execution_options(synchronize_session=False)
+
+
+def has_word_statement(user_id: int, en_word: str) -> sq.Select:
+
+    """
+    Формирует запрос EXISTS, проверяющий наличие активной пары
+    пользователя по английскому слову.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - en_word: английское слово
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(
+        sq.exists().
+        where(UsersWords.word_id == Words.id,
+              Words.en_word == en_word,
+              UsersWords.user_id == user_id,
+              UsersWords.is_added == True)
+    )
+
+
+def count_unique_statement(user_id: int) -> sq.Select:
+
+    """
+    Формирует запрос COUNT(DISTINCT en_word) по активным
+    словам пользователя.
+
+    Вводный параметр:
+    - user_id: Telegram ID пользователя
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(sq.func.count(sq.distinct(Words.en_word))). \
+        join(UsersWords, UsersWords.word_id == Words.id). \
+        where(UsersWords.user_id == user_id,
+              UsersWords.is_added == True)
+
+
+def words_count_statement(user_id: int) -> sq.Select:
+
+    """
+    Формирует запрос счетчика users.words_count.
+
+    Вводный параметр:
+    - user_id: Telegram ID пользователя
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(Users.words_count). \
+        where(Users.user_id == user_id)
+
+
+def lock_words_count_statement(user_id: int) -> sq.Select:
+
+    """
+    Формирует запрос счетчика users.words_count с блокировкой строки
+    пользователя (SELECT ... FOR UPDATE) до конца транзакции пересчета.
+
+    Вводный параметр:
+    - user_id: Telegram ID пользователя
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return words_count_statement(user_id). \
+        with_for_update()
+
+
+def store_words_count_statement(user_id: int,
+                                words_count: int) -> sq.Update:
+
+    """
+    Формирует запрос, сохраняющий пересчитанное значение
+    в сброшенный счетчик users.words_count.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - words_count: кол-во уникальных английских слов
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.update(Users). \
+        where(Users.user_id == user_id,
+              Users.words_count.is_(None)). \
+        values(words_count=words_count). \
+        execution_options(synchronize_session=False)
+
+
+def shift_words_count_statement(user_id: int,
+                                delta: Optional[int]) -> sq.Update:
+
+    """
+    Формирует запрос, изменяющий счетчик users.words_count.
+    Несброшенный счетчик сдвигается на delta (не ниже нуля),
+    при delta=None счетчик сбрасывается для последующего пересчета.
+    Строка пользователя обновляется (и блокируется) и при сброшенном
+    счетчике, поэтому изменение дожидается идущего пересчета.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - delta: величина изменения счетчика или None для сброса
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    if delta is None:
+        statement = sq.update(Users). \
+            where(Users.user_id == user_id). \
+            values(words_count=None)
+    else:
+        statement = sq.update(Users). \
+            where(Users.user_id == user_id). \
+            values(words_count=sq.case(
+                (Users.words_count.is_(None), sq.null()),
+                else_=sq.func.greatest(Users.words_count + delta, 0)
+            ))
+
+    return statement.execution_options(synchronize_session=False)
+
+
+def card_filter(user_id: int, pos_name: str) -> tuple:
+
+    """
+    Выводит условия отбора активных слов пользователя
+    конкретной части речи.
+    """
+
+    return (
+        UsersWords.user_id == user_id,
+        UsersWords.is_added == True,
+        Pos.pos_name == pos_name
+    )
+
+
+def card_count_statement(user_id: int, pos_name: str) -> sq.Select:
+
+    """
+    Формирует запрос кол-ва активных слов пользователя
+    конкретной части речи.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - pos_name: наименование части речи
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(sq.func.count(UsersWords.word_id)). \
+        join(Words, Words.id == UsersWords.word_id). \
+        join(Pos, Pos.id == Words.id_pos). \
+        where(*card_filter(user_id, pos_name))
+
+
+def card_rows_statement(user_id: int, pos_name: str,
+                        row_numbers: list[int]) -> sq.Select:
+
+    """
+    Формирует запрос слов пользователя конкретной части речи
+    с заданными порядковыми номерами (нумерация по word_id).
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - pos_name: наименование части речи
+    - row_numbers: список порядковых номеров слов
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    numbered_words = sq.select(
+        Words.en_word,
+        Words.en_trans,
+        Words.ru_word,
+        Words.en_example,
+        Words.ru_example,
+        sq.func.row_number().
+        over(order_by=UsersWords.word_id).
+        label('row_number')
+    ). \
+        join(UsersWords, UsersWords.word_id == Words.id). \
+        join(Pos, Pos.id == Words.id_pos). \
+        where(*card_filter(user_id, pos_name)). \
+        subquery()
+
+    return sq.select(numbered_words). \
+        where(numbered_words.c.row_number.in_(row_numbers))
+
+
+def sample_row_numbers(total_words: int, others_count: int) -> list[int]:
+
+    """
+    Выбирает случайные порядковые номера слов для карточки.
+    Первый номер относится к целевому слову.
+
+    Вводные параметры:
+    - total_words: кол-во доступных слов
+    - others_count: кол-во некорректных вариантов ответа
+
+    Выводной параметр:
+    - список порядковых номеров (нумерация с единицы)
+    """
+
+    return [
+        offset + 1 for offset in random.sample(
+            range(total_words),
+            min(total_words, others_count + 1)
+        )
+    ]
+
+
+def build_card(query_result: list, row_numbers: list[int],
+               others_count: int) -> Optional[tuple]:
+
+    """
+    Собирает карточку из строк запроса card_rows_statement.
+
+    Вводные параметры:
+    - query_result: строки запроса
+    - row_numbers: порядковые номера, выбранные sample_row_numbers
+    - others_count: кол-во некорректных вариантов ответа
+
+    Выводной параметр:
+    - кортеж в формате Functionality.get_random_words
+      или None при отсутствии строк
+    """
+
+    if not query_result:
+        return None
+
+    rows = {row.row_number: row for row in query_result}
+    target_row = rows.get(row_numbers[0], query_result[0])
+
+    other_words = []
+    for row in query_result:
+        if row.en_word != target_row.en_word and \
+                row.en_word not in other_words:
+            other_words.append(row.en_word)
+
+    while len(other_words) < others_count:
+        other_words.append("")
+
+    return (target_row.en_word, target_row.ru_word, other_words,
+            target_row.en_trans, target_row.en_example,
+            target_row.ru_example)
+
+
+def user_deck_statement(user_id: int) -> sq.Select:
+
+    """
+    Формирует запрос активных слов пользователя для загрузки
+    колоды в VocabularyStore.
+
+    Вводный параметр:
+    - user_id: Telegram ID пользователя
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(
+        Words.id,
+        Words.en_word,
+        Words.en_trans,
+        Words.id_pos,
+        Words.ru_word,
+        Words.en_example,
+        Words.ru_example,
+        Words.is_added_by_users
+    ). \
+        join(UsersWords, UsersWords.word_id == Words.id). \
+        where(UsersWords.user_id == user_id,
+              UsersWords.is_added == True)
+
+
+def upsert_audio_file_statement(file_name: str, file_id: str,
+                                date_added: datetime.datetime) -> sq.Insert:
+
+    """
+    Формирует запрос INSERT ... ON CONFLICT (file_name) DO UPDATE,
+    сохраняющий ID MP3-файла в Telegram.
+
+    Вводные параметры:
+    - file_name: название MP3-файла
+    - file_id: ID файла в Telegram
+    - date_added: дата загрузки файла
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return insert(AudioFiles). \
+        values(file_name=file_name,
+               file_id=file_id,
+               date_added=date_added). \
+        on_conflict_do_update(
+            index_elements=['file_name'],
+            set_={
+                'file_id': file_id,
+                'date_added': date_added
+            }
+        )
+
+
+def word_info_statement(en_word: str) -> sq.Select:
+
+    """
+    Формирует запрос переводов английского слова, уже имеющихся
+    в таблице words. Слова без части речи (unidentified) и без
+    перевода не учитываются, слова разработчика выводятся первыми.
+
+    Вводный параметр:
+    - en_word: английское слово
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.select(
+        Words.en_word,
+        Words.ru_word,
+        Words.en_trans,
+        Pos.pos_name,
+        Words.en_example,
+        Words.ru_example,
+        Words.mp_3_url
+    ). \
+        join(Pos, Pos.id == Words.id_pos). \
+        where(Words.en_word == en_word,
+              Words.ru_word != '',
+              Pos.pos_name != 'unidentified'). \
+        order_by(Words.is_added_by_users, Words.id)
+
+
+def add_word_job_statement(user_id: int, chat_id: int, en_word: str,
+                           date_added: datetime.datetime) -> sq.Insert:
+
+    """
+    Формирует запрос INSERT ... ON CONFLICT DO NOTHING, добавляющий
+    задачу поиска перевода слова. Если по слову пользователя уже есть
+    незавершенная задача, новая не добавляется.
+
+    Вводные параметры:
+    - user_id: Telegram ID пользователя
+    - chat_id: ID чата для отправки результата
+    - en_word: английское слово
+    - date_added: дата добавления задачи
+
+    Выводной параметр:
+    - запрос sqlalchemy (возвращает ID добавленной задачи)
+    """
+
+    return insert(WordJobs). \
+        values(user_id=user_id,
+               chat_id=chat_id,
+               en_word=en_word,
+               status='pending',
+               attempts=0,
+               run_after=date_added,
+               date_added=date_added,
+               date_updated=date_added). \
+        on_conflict_do_nothing(
+            index_elements=['user_id', 'en_word'],
+            index_where=sq.text("status IN ('pending', 'running')")
+        ). \
+        returning(WordJobs.id)
+
+
+def claim_word_job_statement(date_updated: datetime.datetime) -> sq.Update:
+
+    """
+    Формирует запрос, переводящий в состояние running самую раннюю
+    готовую к выполнению задачу. Строки, заблокированные другими
+    обработчиками, пропускаются (FOR UPDATE SKIP LOCKED).
+
+    Вводный параметр:
+    - date_updated: текущее время
+
+    Выводной параметр:
+    - запрос sqlalchemy (возвращает данные задачи)
+    """
+
+    job_id = sq.select(WordJobs.id). \
+        where(WordJobs.status == 'pending',
+              WordJobs.run_after <= date_updated). \
+        order_by(WordJobs.run_after, WordJobs.id). \
+        limit(1). \
+        with_for_update(skip_locked=True). \
+        scalar_subquery()
+
+    return sq.update(WordJobs). \
+        where(WordJobs.id == job_id). \
+        values(status='running',
+               attempts=WordJobs.attempts + 1,
+               date_updated=date_updated). \
+        returning(WordJobs.id,
+                  WordJobs.user_id,
+                  WordJobs.chat_id,
+                  WordJobs.en_word,
+                  WordJobs.attempts)
+
+
+def update_word_job_statement(job_id: int, status: str,
+                              date_updated: datetime.datetime,
+                              run_after: Optional[datetime.datetime] = None,
+                              last_error: Optional[str] = None
+                              ) -> sq.Update:
+
+    """
+    Формирует запрос, изменяющий состояние задачи.
+
+    Вводные параметры:
+    - job_id: ID задачи
+    - status: новое состояние задачи
+    - date_updated: текущее время
+    - run_after: время следующей попытки (по умолчанию не изменяется)
+    - last_error: текст ошибки (по умолчанию None)
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    values = {
+        'status': status,
+        'date_updated': date_updated,
+        'last_error': last_error[:1000] if last_error else last_error
+    }
+    if run_after is not None:
+        values['run_after'] = run_after
+
+    return sq.update(WordJobs). \
+        where(WordJobs.id == job_id). \
+        values(**values)
+
+
+def reset_word_jobs_statement(updated_before: datetime.datetime,
+                              date_updated: datetime.datetime) -> sq.Update:
+
+    """
+    Формирует запрос, возвращающий в очередь задачи, которые
+    находятся в состоянии running дольше допустимого (например,
+    после остановки чат-бота во время их выполнения).
+
+    Вводные параметры:
+    - updated_before: задачи, измененные раньше этого времени,
+                      считаются зависшими
+    - date_updated: текущее время
+
+    Выводной параметр:
+    - запрос sqlalchemy
+    """
+
+    return sq.update(WordJobs). \
+        where(WordJobs.status == 'running',
+              WordJobs.date_updated < updated_before). \
+        values(status='pending',
+               run_after=date_updated,
+               date_updated=date_updated)
@@ -1,43 +1,50 @@
 import datetime
+from typing import Callable, Optional
 
 from psycopg2 import errors
-from sqlalchemy import create_engine, exc, Engine
-from sqlalchemy.orm import sessionmaker
-from database.structure import Pos, Users, Words, UsersWords
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from database import queries
+from database.engine import DBEngine
+from database.structure import AudioFiles, Pos, Users, Words, UsersWords, \
+    WordJobs
 
 
-class DBRepository:
+class DBRepository(DBEngine):
 
-    def __init__(self, dbname: str, user: str, password: str,
-                 host='localhost', port='5432'):
+    def __init__(self, *args, **kwargs) -> None:
 
         """
-        Инициируемые параметры класса:
-        - dbname: название базы данных
-        - user: логин пользователя Postgres
-        - password: пароль пользователя Postgres
-        - host: хост (по умолчанию localhost)
-        - port: порт (по умолчанию 5432)
+        Инициируемые параметры класса совпадают с параметрами DBEngine.
         """
 
-        self.dbname = dbname
-        self.user = user
-        self.password = password
-        self.host = host
-        self.port = port
+        super().__init__(*args, **kwargs)
+        self._listeners: list[Callable[[Optional[int]], None]] = []
 
-    def get_engine(self) -> Engine:
+    def add_listener(self, listener: Callable[[Optional[int]], None]) -> None:
 
         """
-        Запускает движок по DNS-ссылке. Запуск движка
-        позволяет начать взаимодействие с БД через ORM.
+        Подписывает обработчик на операции записи пар "пользователь-слово".
+        Обработчик получает Telegram ID пользователя, данные которого
+        изменились (None - изменения затрагивают всех пользователей).
 
-        Выводной параметр:
-        - движок sqlalchemy
+        Вводный параметр:
+        - listener: обработчик, например VocabularyStore.invalidate
+        """
+
+        self._listeners.append(listener)
+
+    def notify_listeners(self, user_id: Optional[int]) -> None:
+
+        """
+        Оповещает подписанные обработчики об операции записи.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
         """
 
-        dns_link = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
-        return create_engine(dns_link)
+        for listener in self._listeners:
+            listener(user_id)
 
     def add_pos(self, pos_name: str) -> None:
 
@@ -48,26 +55,14 @@ class DBRepository:
         - pos_name: наименование новой части речи
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_pos = session.query(Pos). \
             filter_by(pos_name=pos_name). \
             first()
 
         if not existing_pos:
-            last_pos = session.query(Pos). \
-                order_by(Pos.id.desc()). \
-                first()
-
-            if not last_pos:
-                new_id = 1
-            else:
-                new_id = last_pos.id + 1
-
             new_pos = Pos(
-                id=new_id,
                 pos_name=pos_name
             )
 
@@ -87,9 +82,7 @@ class DBRepository:
         - existing_pos_name: новое наименование для существующей части речи
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_pos = session.query(Pos). \
             filter_by(pos_name=existing_pos_name). \
@@ -116,9 +109,7 @@ class DBRepository:
         - pos_name: наименование части речи, которую хотим удалить
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_pos = session.query(Pos). \
             filter_by(pos_name=pos_name). \
@@ -139,9 +130,7 @@ class DBRepository:
         - список словарей, содержащий данные таблицы pos
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_pos = session.query(Pos).all()
         session.close()
@@ -188,26 +177,14 @@ class DBRepository:
                 en_example = data_dict.get('en_example')
                 ru_example = data_dict.get('ru_example')
 
-                engine = self.get_engine()
-                session_class = sessionmaker(bind=engine)
-                session = session_class()
+                session = self.get_session()
 
                 existing_word = session.query(Words). \
                     filter_by(en_word=en_word, id_pos=id_pos). \
                     first()
 
                 if not existing_word:
-                    last_word = session.query(Words). \
-                        order_by(Words.id.desc()). \
-                        first()
-
-                    if not last_word:
-                        new_id = 1
-                    else:
-                        new_id = last_word.id + 1
-
                     new_word = Words(
-                        id=new_id,
                         en_word=en_word,
                         en_trans=en_trans,
                         mp_3_url=mp_3_url,
@@ -254,9 +231,7 @@ class DBRepository:
                 id_pos = id_pos.pop()
                 en_word = data_dict.get('en_word')
 
-                engine = self.get_engine()
-                session_class = sessionmaker(bind=engine)
-                session = session_class()
+                session = self.get_session()
 
                 existing_word = session.query(Words). \
                     filter_by(en_word=en_word,
@@ -286,9 +261,7 @@ class DBRepository:
         - список словарей с данными английских слов
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         if not en_word:
             existing_words = session.query(Words). \
@@ -334,9 +307,7 @@ class DBRepository:
         last_name = user_dict.get('last_name')
         username = user_dict.get('username')
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_user = session.query(Users). \
             filter_by(user_id=user_id). \
@@ -369,9 +340,7 @@ class DBRepository:
         - user_id: Telegram ID пользователя
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         existing_user = session.query(Users). \
             filter_by(user_id=user_id). \
@@ -383,6 +352,9 @@ class DBRepository:
 
         session.close()
 
+        if existing_user:
+            self.notify_listeners(user_id)
+
     def get_users(self, user_id: int = None) -> list[dict]:
 
         """
@@ -397,9 +369,7 @@ class DBRepository:
         - список словарей с данными таблицы users
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         if not user_id:
             existing_users = session.query(Users). \
@@ -424,83 +394,56 @@ class DBRepository:
         else:
             return []
 
-    def prepare_user_word_pairs(self, user_id: int) -> None:
+    def prepare_user_word_pairs(self, user_id: int) -> int:
 
         """
         Позволяет связать пользователя со словами из
-        csv-файла database.csv.
+        csv-файла database.csv. Пары формируются одним запросом
+        INSERT ... SELECT на стороне БД в рамках одной транзакции.
+        Пары создаются только для существующего пользователя,
+        у которого еще нет ни одной пары "пользователь-слово".
 
         Вводный параметр:
         - user_id: Telegram ID пользователя
-        """
-
-        word_data = self.get_words()
-        user_data = self.get_users(user_id=user_id)
-
-        words_id = []
-        if word_data:
-            for word_dict in word_data:
-                words_id.append(word_dict.get('id'))
-
-        user_id = 0
-        if user_data:
-            user_id += user_data.pop().get('user_id')
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
-
-        existing_user = session.query(UsersWords). \
-            filter_by(user_id=user_id). \
-            first()
-
-        session.close()
-
-        if not existing_user and words_id and user_id:
-
-            engine = self.get_engine()
-            session_class = sessionmaker(bind=engine)
-            session = session_class()
+        Выводной параметр:
+        - кол-во добавленных пар "пользователь-слово"
+        """
 
-            last_user_word_pair = session.query(UsersWords). \
-                order_by(UsersWords.id.desc()). \
-                first()
+        statement = queries.prepare_pairs_statement(
+            user_id=user_id,
+            date_added=datetime.datetime.now()
+        )
 
-            session.close()
+        session = self.get_session()
 
-            if last_user_word_pair:
-                idx_start = last_user_word_pair.id
-            else:
-                idx_start = 0
+        try:
+            with session.begin():
+                self.lock_words_count(
+                    session=session,
+                    user_id=user_id
+                )
+                result = session.execute(statement)
 
-            object_list = []
-            for idx, word_id in enumerate(words_id):
-                object_list.append(
-                    UsersWords(
-                        id=idx_start + (idx + 1),
+                if result.rowcount:
+                    self.shift_words_count(
+                        session=session,
                         user_id=user_id,
-                        word_id=word_id,
-                        is_added=True,
-                        is_user_word=False,
-                        date_added=datetime.datetime.now(),
-                        date_deleted=None
+                        delta=None
                     )
-                )
+            added_count = result.rowcount
+        except (exc.IntegrityError, errors.UniqueViolation):
+            added_count = 0
 
-            engine = self.get_engine()
-            session_class = sessionmaker(bind=engine)
-            session = session_class()
+        session.close()
 
-            try:
-                session.bulk_save_objects(object_list)
-                session.commit()
-            except (exc.IntegrityError, errors.UniqueViolation) as e:
-                pass
+        if added_count:
+            self.notify_listeners(user_id)
 
-            session.close()
+        return added_count
 
     def add_user_word(self, user_id: int,
-                      data_dict: dict) -> None:
+                      data_dict: dict) -> dict:
 
         """
         1. Добавляет новую пару "пользователь-слово"
@@ -509,160 +452,179 @@ class DBRepository:
            (т.е. если ранее слово имело is_added=False,
            то после обработки появится is_added=True)
 
+        Все пары по найденным ID слова записываются одним запросом
+        INSERT ... ON CONFLICT (user_id, word_id) DO UPDATE
+        в рамках одной транзакции.
+
         Вводные параметры:
         - user_id: Telegram ID пользователя
         - data_dict: словарь с данными английского слова
+
+        Выводной параметр:
+        - словарь с итогами добавления:
+            -- added: кол-во новых пар "пользователь-слово"
+            -- reactivated: кол-во восстановленных пар
         """
 
-        word_data = self.get_words(en_word=data_dict.get('en_word'))
-        user_data = self.get_users(user_id=user_id)
+        en_word = data_dict.get('en_word')
+        result_dict = queries.count_upserted_pairs([])
 
-        if user_data:
-            if not word_data:
-                self.add_word(
-                    data_dict,
-                    is_added_by_users=True
-                )
-                word_data = self.get_words(
-                    en_word=data_dict.get('en_word'),
-                    is_added_by_users=True
-                )
+        session = self.get_session()
 
-            words_id = []
-            for dict_word in word_data:
-                words_id.append(dict_word.get('id'))
+        existing_user = session.query(Users.user_id). \
+            filter_by(user_id=user_id). \
+            first()
 
-            if words_id:
+        word_rows = session.query(Words.id). \
+            filter_by(en_word=en_word, is_added_by_users=False). \
+            all()
 
-                engine = self.get_engine()
-                session_class = sessionmaker(bind=engine)
-                session = session_class()
+        session.close()
 
-                last_user_word_pair = session.query(UsersWords). \
-                    order_by(UsersWords.id.desc()). \
-                    first()
+        if not existing_user:
+            return result_dict
 
-                session.close()
+        if not word_rows:
+            self.add_word(
+                data_dict,
+                is_added_by_users=True
+            )
 
-                if last_user_word_pair:
-                    idx_start = last_user_word_pair.id
-                else:
-                    idx_start = 0
-
-                object_list = []
-                for idx, word_id in enumerate(words_id):
-                    engine = self.get_engine()
-                    session_class = sessionmaker(bind=engine)
-                    session = session_class()
-
-                    existing_word_user_pair = session.query(UsersWords). \
-                        filter_by(user_id=user_id, word_id=word_id). \
-                        first()
-
-                    if not existing_word_user_pair:
-                        object_list.append(
-                            UsersWords(
-                                id=idx_start + (idx + 1),
-                                user_id=user_id,
-                                word_id=word_id,
-                                is_added=True,
-                                is_user_word=True,
-                                date_added=datetime.datetime.now(),
-                                date_deleted=None
-                            )
-                        )
+            session = self.get_session()
+
+            word_rows = session.query(Words.id). \
+                filter_by(en_word=en_word, is_added_by_users=True). \
+                all()
+
+            session.close()
+
+        if not word_rows:
+            return result_dict
+
+        statement = queries.upsert_pairs_statement(
+            user_id=user_id,
+            words_id=[word_row.id for word_row in word_rows],
+            date_added=datetime.datetime.now()
+        )
 
-                    else:
-                        if existing_word_user_pair.is_added is not True:
-                            existing_word_user_pair.is_added = True
-                            existing_word_user_pair.date_added = datetime.datetime.now()
-                            existing_word_user_pair.date_deleted = None
-                            session.commit()
+        session = self.get_session()
 
-                    session.close()
+        with session.begin():
+            self.lock_words_count(
+                session=session,
+                user_id=user_id
+            )
+            had_word = self.has_user_word(
+                user_id=user_id,
+                en_word=en_word,
+                session=session
+            )
+            upserted_rows = session.execute(statement).all()
 
-                if object_list:
-                    engine = self.get_engine()
-                    session_class = sessionmaker(bind=engine)
-                    session = session_class()
+            if upserted_rows and not had_word:
+                self.shift_words_count(
+                    session=session,
+                    user_id=user_id,
+                    delta=1
+                )
 
-                    try:
-                        session.bulk_save_objects(object_list)
-                        session.commit()
-                    except (exc.IntegrityError, errors.UniqueViolation) as e:
-                        pass
+        session.close()
 
-                    session.close()
+        if upserted_rows:
+            self.notify_listeners(user_id)
+
+        return queries.count_upserted_pairs(upserted_rows)
 
     def remove_user_word(self, user_id: int,
-                         en_word: str) -> None:
+                         en_word: str) -> int:
 
         """
         Делает неактивным слово из пары "пользователь-слово",
-        расположенной внутри таблицы users_words.
+        расположенной внутри таблицы users_words. Все пары по
+        английскому слову обновляются одним запросом
+        UPDATE users_words ... FROM words.
 
         Вводные параметры:
         - user_id: Telegram ID пользователя
         - en_word: английское слово, которое не устроило пользователя
+
+        Выводной параметр:
+        - кол-во пар "пользователь-слово", ставших неактивными
         """
 
-        word_data1 = self.get_words(en_word, is_added_by_users=False)
-        word_data2 = self.get_words(en_word, is_added_by_users=True)
-        word_data = word_data1 + word_data2
+        statement = queries.remove_pairs_statement(
+            user_id=user_id,
+            en_word=en_word,
+            date_deleted=datetime.datetime.now()
+        )
 
-        if word_data:
-            for dict_data in word_data:
-                word_id = dict_data.get('id')
+        session = self.get_session()
 
-                engine = self.get_engine()
-                session_class = sessionmaker(bind=engine)
-                session = session_class()
+        with session.begin():
+            self.lock_words_count(
+                session=session,
+                user_id=user_id
+            )
+            removed_count = session.execute(statement).rowcount
 
-                existing_word_user_pair = session.query(UsersWords). \
-                    filter_by(user_id=user_id, word_id=word_id, is_added=True). \
-                    first()
+            if removed_count:
+                self.shift_words_count(
+                    session=session,
+                    user_id=user_id,
+                    delta=-1
+                )
 
-                if existing_word_user_pair:
-                    existing_word_user_pair.is_added = False
-                    existing_word_user_pair.date_added = None
-                    existing_word_user_pair.date_deleted = datetime.datetime.now()
-                    session.commit()
+        session.close()
 
-                session.close()
+        if removed_count:
+            self.notify_listeners(user_id)
+
+        return removed_count
 
     def delete_user_word_pair(self, user_id: int,
-                              en_word: str) -> None:
+                              en_word: str) -> int:
 
         """
         Удаляет пару "пользователь-слово" из таблицы users_words.
+        Все пары по английскому слову удаляются одним запросом
+        DELETE FROM users_words ... USING words.
 
         Вводные параметры:
         - user_id: Telegram ID пользователя
         - en_word: английское слово, требующее удаления из таблицы
                    users_words в рамках конкретного пользователя
+
+        Выводной параметр:
+        - кол-во удаленных пар "пользователь-слово"
         """
 
-        word_data1 = self.get_words(en_word, is_added_by_users=False)
-        word_data2 = self.get_words(en_word, is_added_by_users=True)
-        word_data = word_data1 + word_data2
+        statement = queries.delete_pairs_statement(
+            user_id=user_id,
+            en_word=en_word
+        )
 
-        if word_data:
-            for dict_data in word_data:
-                word_id = dict_data.get('id')
+        session = self.get_session()
 
-                engine = self.get_engine()
-                session_class = sessionmaker(bind=engine)
-                session = session_class()
+        with session.begin():
+            self.lock_words_count(
+                session=session,
+                user_id=user_id
+            )
+            deleted_count = session.execute(statement).rowcount
 
-                existing_word_user_pair = session.query(UsersWords). \
-                    filter_by(user_id=user_id, word_id=word_id). \
-                    first()
+            if deleted_count:
+                self.shift_words_count(
+                    session=session,
+                    user_id=user_id,
+                    delta=None
+                )
 
-                if existing_word_user_pair:
-                    session.delete(existing_word_user_pair)
-                    session.commit()
+        session.close()
 
-                session.close()
+        if deleted_count:
+            self.notify_listeners(user_id)
+
+        return deleted_count
 
     def get_user_words(self, user_id: int, pos_name: str = None) -> list[dict]:
 
@@ -679,9 +641,7 @@ class DBRepository:
         - список словарей с данными таблицы users_words
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         if pos_name is None:
             query_result = session.query(Words, Pos, UsersWords). \
@@ -717,6 +677,79 @@ class DBRepository:
         else:
             return []
 
+    def get_user_card(self, user_id: int, pos_name: str,
+                      others_count: int = 3) -> Optional[tuple]:
+
+        """
+        Выбирает на стороне БД карточку для тренировки: одно целевое
+        английское слово и others_count отличающихся от него слов
+        той же части речи. Вместо выгрузки всех слов пользователя
+        считается их количество, после чего по индексу
+        (user_id, word_id) выбираются строки со случайными
+        порядковыми номерами.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - pos_name: наименование части речи
+        - others_count: кол-во некорректных вариантов ответа (по умолчанию 3)
+
+        Выводной параметр:
+        - кортеж в формате Functionality.get_random_words:
+          (target_word, translate, other_words,
+           transcription, en_example, ru_example)
+          или None при отсутствии слов
+        """
+
+        session = self.get_session()
+
+        total_words = session.execute(
+            queries.card_count_statement(user_id, pos_name)
+        ).scalar()
+
+        if not total_words:
+            session.close()
+            return None
+
+        row_numbers = queries.sample_row_numbers(
+            total_words=total_words,
+            others_count=others_count
+        )
+
+        query_result = session.execute(
+            queries.card_rows_statement(user_id, pos_name, row_numbers)
+        ).all()
+
+        session.close()
+
+        return queries.build_card(
+            query_result=query_result,
+            row_numbers=row_numbers,
+            others_count=others_count
+        )
+
+    def get_user_deck(self, user_id: int) -> list[dict]:
+
+        """
+        Выводит активные слова пользователя для загрузки колоды
+        в VocabularyStore.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - список словарей с данными английских слов
+        """
+
+        session = self.get_session()
+
+        query_result = session.execute(
+            queries.user_deck_statement(user_id)
+        ).all()
+
+        session.close()
+
+        return [word_row._asdict() for word_row in query_result]
+
     def get_unique_user_words(self, user_id: int) -> list:
 
         """
@@ -729,9 +762,7 @@ class DBRepository:
         - список с уникальными английскими словами пользователя
         """
 
-        engine = self.get_engine()
-        session_class = sessionmaker(bind=engine)
-        session = session_class()
+        session = self.get_session()
 
         query_result = session.query(Words, UsersWords). \
             join(UsersWords, UsersWords.word_id == Words.id). \
@@ -746,9 +777,7 @@ class DBRepository:
             for _, word in query_result:
                 word_id.append(word.id)
 
-            engine = self.get_engine()
-            session_class = sessionmaker(bind=engine)
-            session = session_class()
+            session = self.get_session()
 
             unique_english_words = session.query(Words.en_word). \
                 filter(Words.id.in_(word_id)). \
@@ -763,3 +792,413 @@ class DBRepository:
                     unique_words.append(word.en_word)
 
                 return unique_words
+
+    def count_unique_user_words(self, user_id: int) -> int:
+
+        """
+        Считает на стороне БД кол-во УНИКАЛЬНЫХ английских слов
+        пользователя через COUNT(DISTINCT en_word).
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - кол-во уникальных английских слов пользователя
+        """
+
+        session = self.get_session()
+
+        words_count = session.execute(
+            queries.count_unique_statement(user_id)
+        ).scalar()
+
+        session.close()
+
+        return words_count or 0
+
+    def get_user_words_count(self, user_id: int) -> int:
+
+        """
+        Выводит кол-во уникальных английских слов пользователя из
+        счетчика users.words_count. Счетчик поддерживается методами
+        add_user_word и remove_user_word. Если счетчик сброшен (NULL),
+        значение пересчитывается и сохраняется в одной транзакции
+        под блокировкой строки пользователя: параллельные добавление
+        и удаление слов дожидаются сохранения и сдвигают новое значение.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - кол-во уникальных английских слов пользователя
+        """
+
+        session = self.get_session()
+
+        words_count = session.execute(
+            queries.words_count_statement(user_id)
+        ).scalar()
+
+        session.close()
+
+        if words_count is None:
+            session = self.get_session()
+
+            with session.begin():
+                words_count = session.execute(
+                    queries.lock_words_count_statement(user_id)
+                ).scalar()
+
+                if words_count is None:
+                    words_count = session.execute(
+                        queries.count_unique_statement(user_id)
+                    ).scalar() or 0
+
+                    session.execute(
+                        queries.store_words_count_statement(
+                            user_id=user_id,
+                            words_count=words_count
+                        )
+                    )
+
+            session.close()
+
+        return words_count
+
+    def get_word_info(self, en_word: str) -> list[dict]:
+
+        """
+        Выводит имеющиеся в таблице words переводы английского слова
+        в формате Parsing.get_word_info (по одному на часть речи).
+
+        Вводный параметр:
+        - en_word: английское слово
+
+        Выводной параметр:
+        - список словарей с данными английского слова
+          (пустой список при отсутствии слова)
+        """
+
+        session = self.get_session()
+
+        query_result = session.execute(
+            queries.word_info_statement(en_word)
+        ).all()
+
+        session.close()
+
+        word_list = []
+        pos_names = set()
+        for word_row in query_result:
+            if word_row.pos_name not in pos_names:
+                pos_names.add(word_row.pos_name)
+                word_list.append(word_row._asdict())
+        return word_list
+
+    def get_audio_file_id(self, file_name: str) -> Optional[str]:
+
+        """
+        Выводит ID MP3-файла, ранее загруженного в Telegram.
+
+        Вводный параметр:
+        - file_name: название MP3-файла
+
+        Выводной параметр:
+        - ID файла в Telegram (None при его отсутствии)
+        """
+
+        session = self.get_session()
+
+        file_id = session.query(AudioFiles.file_id). \
+            filter_by(file_name=file_name). \
+            scalar()
+
+        session.close()
+
+        return file_id
+
+    def get_audio_file_names(self) -> set[str]:
+
+        """
+        Выводит названия MP3-файлов, загруженных в Telegram.
+
+        Выводной параметр:
+        - множество названий MP3-файлов
+        """
+
+        session = self.get_session()
+
+        file_names = {
+            audio_row.file_name
+            for audio_row in session.query(AudioFiles.file_name).all()
+        }
+
+        session.close()
+
+        return file_names
+
+    def add_audio_file_id(self, file_name: str, file_id: str) -> None:
+
+        """
+        Сохраняет ID MP3-файла, загруженного в Telegram.
+        Ранее сохраненный ID файла перезаписывается.
+
+        Вводные параметры:
+        - file_name: название MP3-файла
+        - file_id: ID файла в Telegram
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            session.execute(
+                queries.upsert_audio_file_statement(
+                    file_name=file_name,
+                    file_id=file_id,
+                    date_added=datetime.datetime.now()
+                )
+            )
+
+        session.close()
+
+    def delete_audio_file_id(self, file_name: str) -> None:
+
+        """
+        Удаляет устаревший ID MP3-файла.
+
+        Вводный параметр:
+        - file_name: название MP3-файла
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            session.query(AudioFiles). \
+                filter_by(file_name=file_name). \
+                delete(synchronize_session=False)
+
+        session.close()
+
+    def add_word_job(self, user_id: int, chat_id: int,
+                     en_word: str) -> Optional[int]:
+
+        """
+        Ставит в очередь задачу поиска перевода английского слова.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - chat_id: ID чата для отправки результата
+        - en_word: английское слово
+
+        Выводной параметр:
+        - ID задачи (None - слово пользователя уже стоит в очереди)
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            job_id = session.execute(
+                queries.add_word_job_statement(
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    en_word=en_word,
+                    date_added=datetime.datetime.now()
+                )
+            ).scalar()
+
+        session.close()
+
+        return job_id
+
+    def claim_word_job(self) -> Optional[dict]:
+
+        """
+        Забирает в работу самую раннюю готовую к выполнению задачу.
+        Задачи, которые уже забрали другие обработчики, пропускаются.
+
+        Выводной параметр:
+        - словарь с ключами id, user_id, chat_id, en_word, attempts
+          (None - готовых к выполнению задач нет)
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            job_row = session.execute(
+                queries.claim_word_job_statement(
+                    date_updated=datetime.datetime.now()
+                )
+            ).first()
+
+        session.close()
+
+        return job_row._asdict() if job_row else None
+
+    def complete_word_job(self, job_id: int) -> None:
+
+        """
+        Удаляет выполненную задачу из очереди.
+
+        Вводный параметр:
+        - job_id: ID задачи
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            session.query(WordJobs). \
+                filter_by(id=job_id). \
+                delete(synchronize_session=False)
+
+        session.close()
+
+    def retry_word_job(self, job_id: int, delay: float,
+                       error: Optional[str] = None) -> None:
+
+        """
+        Возвращает задачу в очередь для повторной попытки.
+
+        Вводные параметры:
+        - job_id: ID задачи
+        - delay: пауза перед повторной попыткой в секундах
+        - error: текст ошибки (по умолчанию None)
+        """
+
+        now = datetime.datetime.now()
+        session = self.get_session()
+
+        with session.begin():
+            session.execute(
+                queries.update_word_job_statement(
+                    job_id=job_id,
+                    status='pending',
+                    date_updated=now,
+                    run_after=now + datetime.timedelta(seconds=delay),
+                    last_error=error
+                )
+            )
+
+        session.close()
+
+    def fail_word_job(self, job_id: int, error: Optional[str] = None) -> None:
+
+        """
+        Помечает задачу как неудавшуюся (status='failed'). Такие задачи
+        остаются в таблице для разбора и не мешают добавить слово заново.
+
+        Вводные параметры:
+        - job_id: ID задачи
+        - error: текст ошибки (по умолчанию None)
+        """
+
+        session = self.get_session()
+
+        with session.begin():
+            session.execute(
+                queries.update_word_job_statement(
+                    job_id=job_id,
+                    status='failed',
+                    date_updated=datetime.datetime.now(),
+                    last_error=error
+                )
+            )
+
+        session.close()
+
+    def reset_stale_word_jobs(self, timeout: float) -> int:
+
+        """
+        Возвращает в очередь задачи, выполнение которых было прервано
+        (например, перезапуском чат-бота).
+
+        Вводный параметр:
+        - timeout: время в секундах, после которого задача в состоянии
+                   running считается прерванной
+
+        Выводной параметр:
+        - кол-во возвращенных в очередь задач
+        """
+
+        now = datetime.datetime.now()
+        session = self.get_session()
+
+        with session.begin():
+            reset_count = session.execute(
+                queries.reset_word_jobs_statement(
+                    updated_before=now - datetime.timedelta(seconds=timeout),
+                    date_updated=now
+                )
+            ).rowcount
+
+        session.close()
+
+        return reset_count
+
+    def has_user_word(self, user_id: int, en_word: str,
+                      session: Optional[Session] = None) -> bool:
+
+        """
+        Проверяет наличие английского слова в БД пользователя
+        (т.е. наличие хотя бы одной пары с is_added=True).
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - en_word: английское слово
+        - session: открытая сессия (по умолчанию создается новая)
+
+        Выводной параметр:
+        - bool: True - слово есть у пользователя, False - наоборот
+        """
+
+        own_session = session is None
+        if own_session:
+            session = self.get_session()
+
+        word_exists = session.execute(
+            queries.has_word_statement(user_id, en_word)
+        ).scalar()
+
+        if own_session:
+            session.close()
+
+        return bool(word_exists)
+
+    def lock_words_count(self, session: Session, user_id: int) -> None:
+
+        """
+        Блокирует строку пользователя в таблице users до конца
+        транзакции открытой сессии. Вызывается первым запросом
+        транзакций, изменяющих пары "пользователь-слово": проверка
+        наличия слова и сдвиг счетчика users.words_count выполняются
+        без параллельных изменений слов того же пользователя,
+        а строки блокируются всегда в одном порядке.
+
+        Вводные параметры:
+        - session: открытая сессия
+        - user_id: Telegram ID пользователя
+        """
+
+        session.execute(
+            queries.lock_words_count_statement(user_id)
+        )
+
+    def shift_words_count(self, session: Session, user_id: int,
+                          delta: Optional[int]) -> None:
+
+        """
+        Изменяет счетчик users.words_count в рамках открытой сессии.
+        Несброшенный счетчик сдвигается на delta (не ниже нуля),
+        при delta=None счетчик сбрасывается для последующего пересчета.
+
+        Вводные параметры:
+        - session: открытая сессия
+        - user_id: Telegram ID пользователя
+        - delta: величина изменения счетчика или None для сброса
+        """
+
+        session.execute(
+            queries.shift_words_count_statement(
+                user_id=user_id,
+                delta=delta
+            )
+        )
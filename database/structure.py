@@ -22,6 +22,7 @@ class Pos(Base):
 
     id = sq.Column(
         sq.Integer,
+        sq.Identity(),
         primary_key=True
     )
 
@@ -49,12 +50,27 @@ class Words(Base):
     - is_added_by_users: параметр булева типа, отражающий
     добавление слова одним из пользователей (True - слово добавлено
     одним из пользователей, False - слово добавлено разработчиком)
+
+    Индексы:
+    - ix_words_en_word_id_pos: поиск слова в рамках части речи
+    - ix_words_en_word_is_added_by_users: поиск слова по источнику добавления
+    - ix_words_id_pos: выборка слов по части речи
     """
 
     __tablename__ = 'words'
 
+    __table_args__ = (
+        sq.Index('ix_words_en_word_id_pos',
+                 'en_word', 'id_pos'),
+        sq.Index('ix_words_en_word_is_added_by_users',
+                 'en_word', 'is_added_by_users'),
+        sq.Index('ix_words_id_pos',
+                 'id_pos'),
+    )
+
     id = sq.Column(
         sq.Integer,
+        sq.Identity(),
         primary_key=True
     )
 
@@ -108,6 +124,8 @@ class Users(Base):
     - first_name: имя пользователя
     - last_name: фамилия пользователя
     - username: профиль пользователя в Telegram
+    - words_count: кол-во уникальных английских слов пользователя
+    (NULL - значение требует пересчета)
     """
 
     __tablename__ = 'users'
@@ -133,6 +151,10 @@ class Users(Base):
         unique=True
     )
 
+    words_count = sq.Column(
+        sq.Integer
+    )
+
 
 class UsersWords(Base):
 
@@ -152,12 +174,28 @@ class UsersWords(Base):
     пользователь не имеет отношения к добавлению слова)
     - date_added: дата добавления пользователем слова
     - date_deleted: дата удаления пользователем слова
+
+    Индексы:
+    - uq_users_words_user_id_word_id: уникальность пары "пользователь-слово"
+    - ix_users_words_user_id_active: активные слова пользователя (is_added=True)
+    - ix_users_words_word_id: поиск пар по ID слова
     """
 
     __tablename__ = 'users_words'
 
+    __table_args__ = (
+        sq.UniqueConstraint('user_id', 'word_id',
+                            name='uq_users_words_user_id_word_id'),
+        sq.Index('ix_users_words_user_id_active',
+                 'user_id', 'word_id',
+                 postgresql_where=sq.text('is_added')),
+        sq.Index('ix_users_words_word_id',
+                 'word_id'),
+    )
+
     id = sq.Column(
         sq.Integer,
+        sq.Identity(),
         primary_key=True
     )
 
@@ -193,6 +231,148 @@ class UsersWords(Base):
     )
 
 
+class AudioFiles(Base):
+
+    """
+    audio_files - таблица с MP3-файлами, загруженными в Telegram.
+
+    Столбцы:
+    - file_name: название MP3-файла в папке eng_audio_files_mp3
+    - file_id: ID файла на серверах Telegram
+    - date_added: дата загрузки файла
+    """
+
+    __tablename__ = 'audio_files'
+
+    file_name = sq.Column(
+        sq.String(length=500),
+        primary_key=True
+    )
+
+    file_id = sq.Column(
+        sq.String(length=250),
+        nullable=False
+    )
+
+    date_added = sq.Column(
+        sq.DateTime,
+        nullable=False
+    )
+
+
+class WordJobs(Base):
+
+    """
+    word_jobs - таблица с очередью поиска перевода слов,
+    добавленных пользователями.
+
+    Столбцы:
+    - id: ID задачи
+    - user_id: Telegram ID пользователя
+    - chat_id: ID чата, в который отправляется результат
+    - en_word: английское слово
+    - status: состояние задачи (pending - ожидает выполнения,
+    running - выполняется, failed - попытки исчерпаны)
+    - attempts: кол-во начатых попыток
+    - last_error: текст последней ошибки
+    - run_after: время, раньше которого задачу не берем в работу
+    - date_added: дата добавления задачи
+    - date_updated: дата последнего изменения состояния задачи
+
+    Индексы:
+    - uq_word_jobs_user_id_en_word_active: одна незавершенная задача
+    на слово пользователя
+    - ix_word_jobs_status_run_after: выбор очередной задачи
+    """
+
+    __tablename__ = 'word_jobs'
+
+    __table_args__ = (
+        sq.Index('uq_word_jobs_user_id_en_word_active',
+                 'user_id', 'en_word',
+                 unique=True,
+                 postgresql_where=sq.text("status IN ('pending', 'running')")),
+        sq.Index('ix_word_jobs_status_run_after',
+                 'status', 'run_after'),
+    )
+
+    id = sq.Column(
+        sq.Integer,
+        sq.Identity(),
+        primary_key=True
+    )
+
+    user_id = sq.Column(
+        sq.Integer,
+        sq.ForeignKey('users.user_id',
+                      ondelete='CASCADE'),
+        nullable=False
+    )
+
+    chat_id = sq.Column(
+        sq.BigInteger,
+        nullable=False
+    )
+
+    en_word = sq.Column(
+        sq.String(length=350),
+        nullable=False
+    )
+
+    status = sq.Column(
+        sq.String(length=20),
+        nullable=False
+    )
+
+    attempts = sq.Column(
+        sq.Integer,
+        nullable=False
+    )
+
+    last_error = sq.Column(
+        sq.String(length=1000)
+    )
+
+    run_after = sq.Column(
+        sq.DateTime,
+        nullable=False
+    )
+
+    date_added = sq.Column(
+        sq.DateTime,
+        nullable=False
+    )
+
+    date_updated = sq.Column(
+        sq.DateTime,
+        nullable=False
+    )
+
+
+class SchemaVersion(Base):
+
+    """
+    schema_version - таблица с примененными версиями схемы БД.
+
+    Столбцы:
+    - version: номер версии схемы
+    - date_applied: дата применения версии
+    """
+
+    __tablename__ = 'schema_version'
+
+    version = sq.Column(
+        sq.Integer,
+        primary_key=True,
+        autoincrement=False
+    )
+
+    date_applied = sq.Column(
+        sq.DateTime,
+        nullable=False
+    )
+
+
 def form_tables(engine: sq.Engine) -> None:
 
     """
@@ -0,0 +1,408 @@
+"""
+Хранилище словаря в памяти процесса.
+
+Слова разработчика (is_added_by_users=False) загружаются один раз при
+запуске в столбцы-списки, ID частей речи - в массив array. Колода
+пользователя хранится как битовая маска над индексами этих слов
+и небольшой набор собственных слов пользователя. Выбор карточки,
+подсчет и проверка наличия слов выполняются в памяти.
+
+Источником данных остается Postgres: операции записи DBRepository
+сбрасывают колоду пользователя, и при следующем обращении
+она загружается из БД заново. Колоды хранятся в LRU-кэше
+с ограничением кол-ва, объема и времени жизни, поэтому колоды
+неактивных пользователей вытесняются из памяти.
+"""
+
+import random
+import sys
+import threading
+from array import array
+from typing import Optional
+
+from cache import LRUCache, estimate_size
+from database.repository import DBRepository
+
+
+class UserDeck:
+
+    """
+    Колода пользователя.
+
+    Атрибуты:
+    - bits: битовая маска активных слов разработчика
+            (бит i соответствует i-ому слову хранилища)
+    - overlay: собственные слова пользователя в формате
+               {ID слова: (en_word, en_trans, ru_word,
+                           en_example, ru_example, id_pos)}
+    - words_count: кол-во уникальных английских слов колоды
+    """
+
+    __slots__ = ('bits', 'overlay', 'words_count')
+
+    def __init__(self, seed_count: int) -> None:
+        self.bits = bytearray((seed_count + 7) // 8)
+        self.overlay: dict[int, tuple] = {}
+        self.words_count = 0
+
+    def has_index(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def set_index(self, index: int) -> None:
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def get_size(self) -> int:
+
+        """
+        Оценивает объем колоды в байтах для LRUCache.
+        """
+
+        return sys.getsizeof(self) + sys.getsizeof(self.bits) + \
+            estimate_size(self.overlay)
+
+
+class VocabularyStore:
+
+    def __init__(self, max_decks: int = 1024, deck_ttl: Optional[float] = 600,
+                 max_bytes: Optional[int] = 64 * 1024 * 1024) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - max_decks: максимальное кол-во хранимых колод (по умолчанию 1024)
+        - deck_ttl: время жизни колоды в секундах (None - без ограничения,
+                    по умолчанию 600)
+        - max_bytes: ограничение объема колод в байтах
+                     (None - без ограничения, по умолчанию 64 МБ)
+        """
+
+        self._lock = threading.RLock()
+        self._repository: Optional[DBRepository] = None
+
+        self._pos_ids = array('i')
+        self._en_words: list[str] = []
+        self._en_trans: list[str] = []
+        self._ru_words: list[str] = []
+        self._en_examples: list[str] = []
+        self._ru_examples: list[str] = []
+
+        self._index_by_id: dict[int, int] = {}
+        self._indexes_by_word: dict[str, list[int]] = {}
+        self._indexes_by_pos: dict[int, array] = {}
+        self._pos_ids_by_name: dict[str, int] = {}
+
+        self._decks = LRUCache(
+            max_entries=max_decks,
+            ttl=deck_ttl,
+            max_bytes=max_bytes,
+            size_func=UserDeck.get_size
+        )
+        self._generation = 0
+
+    @property
+    def seed_count(self) -> int:
+        return len(self._en_words)
+
+    def load(self, repository: DBRepository) -> int:
+
+        """
+        Загружает слова разработчика из БД и подписывает хранилище
+        на операции записи репозитория.
+
+        Вводный параметр:
+        - repository: экземпляр класса DBRepository
+
+        Выводной параметр:
+        - кол-во загруженных слов
+        """
+
+        self.load_seed(
+            seed_words=repository.get_words(),
+            pos_list=repository.get_pos()
+        )
+
+        with self._lock:
+            self._repository = repository
+        repository.add_listener(self.invalidate)
+
+        return self.seed_count
+
+    def load_seed(self, seed_words: list[dict], pos_list: list[dict]) -> None:
+
+        """
+        Заполняет столбцы хранилища словами разработчика.
+        Загруженные ранее колоды пользователей сбрасываются.
+
+        Вводные параметры:
+        - seed_words: список словарей в формате DBRepository.get_words
+        - pos_list: список словарей в формате DBRepository.get_pos
+        """
+
+        seed_words = sorted(seed_words, key=lambda word: word.get('id'))
+
+        pos_ids = array('i')
+        en_words, en_trans, ru_words = [], [], []
+        en_examples, ru_examples = [], []
+        index_by_id = {}
+        indexes_by_word = {}
+        indexes_by_pos = {}
+
+        for index, word_dict in enumerate(seed_words):
+            word_id = word_dict.get('id')
+            id_pos = word_dict.get('id_pos')
+            en_word = word_dict.get('en_word')
+
+            pos_ids.append(id_pos)
+            en_words.append(en_word)
+            en_trans.append(word_dict.get('en_trans'))
+            ru_words.append(word_dict.get('ru_word'))
+            en_examples.append(word_dict.get('en_example'))
+            ru_examples.append(word_dict.get('ru_example'))
+
+            index_by_id[word_id] = index
+            indexes_by_word.setdefault(en_word, []).append(index)
+            indexes_by_pos.setdefault(id_pos, array('i')).append(index)
+
+        with self._lock:
+            self._pos_ids = pos_ids
+            self._en_words = en_words
+            self._en_trans = en_trans
+            self._ru_words = ru_words
+            self._en_examples = en_examples
+            self._ru_examples = ru_examples
+            self._index_by_id = index_by_id
+            self._indexes_by_word = indexes_by_word
+            self._indexes_by_pos = indexes_by_pos
+            self._pos_ids_by_name = {
+                pos_dict.get('pos_name'): pos_dict.get('id')
+                for pos_dict in pos_list
+            }
+            self._decks.clear()
+            self._generation += 1
+
+    def load_deck(self, user_id: int, deck_rows: list[dict],
+                  generation: Optional[int] = None) -> UserDeck:
+
+        """
+        Собирает колоду пользователя по активным словам из БД.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - deck_rows: список словарей в формате DBRepository.get_user_deck
+        - generation: номер сброса, при котором строки были прочитаны из БД.
+                      Если после чтения колоды сбрасывались, собранная
+                      колода не сохраняется (по умолчанию сохраняется всегда)
+
+        Выводной параметр:
+        - колода пользователя
+        """
+
+        with self._lock:
+            deck = UserDeck(self.seed_count)
+            unique_words = set()
+
+            for word_dict in deck_rows:
+                en_word = word_dict.get('en_word')
+                index = self._index_by_id.get(word_dict.get('id'))
+
+                if index is not None and \
+                        not word_dict.get('is_added_by_users'):
+                    deck.set_index(index)
+                else:
+                    deck.overlay[word_dict.get('id')] = (
+                        en_word,
+                        word_dict.get('en_trans'),
+                        word_dict.get('ru_word'),
+                        word_dict.get('en_example'),
+                        word_dict.get('ru_example'),
+                        word_dict.get('id_pos')
+                    )
+                unique_words.add(en_word)
+
+            deck.words_count = len(unique_words)
+            if generation is None or generation == self._generation:
+                self._decks.set(user_id, deck)
+
+        return deck
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+
+        """
+        Сбрасывает колоду пользователя. При user_id=None
+        сбрасываются колоды всех пользователей.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+        """
+
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._decks.clear()
+            else:
+                self._decks.pop(user_id)
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели кэша колод (см. LRUCache.get_stats).
+        """
+
+        return self._decks.get_stats()
+
+    def get_deck(self, user_id: int) -> UserDeck:
+
+        """
+        Выводит колоду пользователя, загружая ее из БД
+        при первом обращении или после сброса.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+
+        Выводной параметр:
+        - колода пользователя
+        """
+
+        with self._lock:
+            deck = self._decks.get(user_id, None)
+            generation = self._generation
+            repository = self._repository
+
+        if deck is not None:
+            return deck
+        if repository is None:
+            return UserDeck(self.seed_count)
+
+        return self.load_deck(
+            user_id=user_id,
+            deck_rows=repository.get_user_deck(user_id),
+            generation=generation
+        )
+
+    def get_user_card(self, user_id: int, pos_name: str,
+                      others_count: int = 3) -> Optional[tuple]:
+
+        """
+        Выбирает карточку для тренировки из колоды пользователя
+        без обращения к БД. Если колода не загружена (например,
+        сброшена записью), карточка выбирается на стороне БД через
+        DBRepository.get_user_card без загрузки колоды.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - pos_name: наименование части речи
+        - others_count: кол-во некорректных вариантов ответа (по умолчанию 3)
+
+        Выводной параметр:
+        - кортеж в формате Functionality.get_random_words
+          или None при отсутствии слов
+        """
+
+        with self._lock:
+            deck = self._decks.get(user_id, None)
+            repository = self._repository
+
+        if deck is None:
+            if repository is not None:
+                return repository.get_user_card(
+                    user_id=user_id,
+                    pos_name=pos_name,
+                    others_count=others_count
+                )
+            deck = UserDeck(self.seed_count)
+
+        id_pos = self._pos_ids_by_name.get(pos_name)
+
+        candidates = [
+            index for index in self._indexes_by_pos.get(id_pos, ())
+            if deck.has_index(index)
+        ]
+        candidates.extend(
+            word_row for word_row in deck.overlay.values()
+            if word_row[5] == id_pos
+        )
+
+        if not candidates:
+            return None
+
+        picked = random.sample(
+            candidates,
+            min(len(candidates), others_count + 1)
+        )
+        target_row = self.get_word_row(picked[0])
+        target_word = target_row[0]
+
+        other_words = []
+        for candidate in picked[1:]:
+            en_word = self.get_word_row(candidate)[0]
+            if en_word != target_word and en_word not in other_words:
+                other_words.append(en_word)
+
+        while len(other_words) < others_count:
+            other_words.append("")
+
+        return (target_word, target_row[2], other_words,
+                target_row[1], target_row[3], target_row[4])
+
+    def get_word_row(self, candidate) -> tuple:
+
+        """
+        Выводит данные слова в формате
+        (en_word, en_trans, ru_word, en_example, ru_example, id_pos).
+
+        Вводный параметр:
+        - candidate: индекс слова разработчика или строка слова пользователя
+        """
+
+        if isinstance(candidate, tuple):
+            return candidate
+
+        return (self._en_words[candidate], self._en_trans[candidate],
+                self._ru_words[candidate], self._en_examples[candidate],
+                self._ru_examples[candidate], self._pos_ids[candidate])
+
+    def count_user_words(self, user_id: int) -> int:
+
+        """
+        Выводит кол-во уникальных английских слов пользователя.
+        Если колода не загружена (например, сброшена записью),
+        значение берется из счетчика users.words_count без загрузки
+        колоды из БД.
+
+        Вводный параметр:
+        - user_id: Telegram ID пользователя
+        """
+
+        with self._lock:
+            deck = self._decks.get(user_id, None)
+            repository = self._repository
+
+        if deck is not None:
+            return deck.words_count
+        if repository is None:
+            return 0
+
+        return repository.get_user_words_count(user_id)
+
+    def has_user_word(self, user_id: int, en_word: str) -> bool:
+
+        """
+        Проверяет наличие английского слова в колоде пользователя.
+
+        Вводные параметры:
+        - user_id: Telegram ID пользователя
+        - en_word: английское слово
+
+        Выводной параметр:
+        - bool: True - слово есть у пользователя, False - наоборот
+        """
+
+        deck = self.get_deck(user_id)
+
+        for index in self._indexes_by_word.get(en_word, ()):
+            if deck.has_index(index):
+                return True
+
+        return any(
+            word_row[0] == en_word
+            for word_row in deck.overlay.values()
+        )
@@ -1,11 +1,15 @@
 import os
 from typing import Optional
 
+_found_paths: dict[tuple, str] = {}
+
 
 def find_file(file_name: str) -> Optional[str]:
 
     """
     Позволяет найти путь к файлу относительно проекта.
+    Найденный путь запоминается, и повторный поиск
+    по дереву проекта не выполняется.
 
     Вводный параметр:
     - file_name: название файла, который хотим найти относительно проекта
@@ -14,17 +18,25 @@ def find_file(file_name: str) -> Optional[str]:
     - путь к заданному файлу (в случае его наличия)
     """
 
+    cached_path = _found_paths.get(('file', file_name))
+    if cached_path is not None and os.path.isfile(cached_path):
+        return cached_path
+
     search_path = os.path.dirname(os.path.abspath(__file__))
 
     for dirpath, dirnames, filenames in os.walk(search_path):
         if file_name in filenames:
-            return os.path.join(dirpath, file_name)
+            file_path = os.path.join(dirpath, file_name)
+            _found_paths[('file', file_name)] = file_path
+            return file_path
 
 
 def find_folder(folder_name: str) -> Optional[str]:
 
     """
     Позволяет найти путь к папке относительно проекта.
+    Найденный путь запоминается, и повторный поиск
+    по дереву проекта не выполняется.
 
     Вводный параметр:
     - folder_name: название папки, которую хотим найти относительно проекта
@@ -33,8 +45,14 @@ def find_folder(folder_name: str) -> Optional[str]:
     - путь к заданной папке (в случае его наличия)
     """
 
+    cached_path = _found_paths.get(('folder', folder_name))
+    if cached_path is not None and os.path.isdir(cached_path):
+        return cached_path
+
     search_path = os.path.dirname(os.path.abspath(__file__))
 
     for dirpath, dirnames, filenames in os.walk(search_path):
         if folder_name in dirnames:
-            return os.path.join(dirpath, folder_name)
+            folder_path = os.path.join(dirpath, folder_name)
+            _found_paths[('folder', folder_name)] = folder_path
+            return folder_path
@@ -13,7 +13,10 @@ def main_function(
     password: str, 
     host: str,
     port: str,
-    token: str
+    token: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = 1800
 ) -> None:
 
     print('ПОДКЛЮЧЕНИЕ К БАЗЕ ДАННЫХ...')
@@ -34,12 +37,18 @@ def main_function(
         database.prepare_pos()
         database.prepare_words()
 
+    database.upgrade_schema()
+    database.dispose()
+
     repository = DBRepository(
         dbname=dbname,
         user=user,
         password=password,
         host=host,
-        port=port
+        port=port,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle
     )
 
     print('ПОДКЛЮЧЕНИЕ К ЧАТ-БОТУ...')
@@ -58,5 +67,8 @@ if __name__ == '__main__':
         password=os.getenv(key='DB_PASSWORD'),
         host=os.getenv(key='HOST', default='localhost'),
         port=os.getenv(key='PORT', default='5432'),
-        token=os.getenv(key='TG_TOKEN')
+        token=os.getenv(key='TG_TOKEN'),
+        pool_size=int(os.getenv(key='DB_POOL_SIZE', default='5')),
+        max_overflow=int(os.getenv(key='DB_MAX_OVERFLOW', default='10')),
+        pool_recycle=int(os.getenv(key='DB_POOL_RECYCLE', default='1800'))
     )
@@ -1,15 +1,32 @@
+import asyncio
+import csv
 import os
 import random
+import threading
+import time
 
 import pytest
+from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from sqlalchemy import Engine
 
-from database.creation import DBCreation
+from benchmarks.replay_server import ReplayServer
+from benchmarks.stub_server import OXFORD_PATH, PROMT_PATH
+from cache import DiskCache, LRUCache, MISSING
+from database.async_repository import AsyncDBRepository
+from database.creation import DBCreation, CsvCopyStream, get_seed_rows
+from database.migrations import get_latest_version
 from database.repository import DBRepository
 from database.structure import get_table_list
+from database.vocabulary import VocabularyStore
+from tgbot.audio import AudioIndex, get_mp3_name
+from tgbot.builder import CSV_COLUMNS, build_vocabulary, read_word_list
 from tgbot.functionality import Functionality
+from tgbot.jobs import TransientJobError, WordJobWorker
+from tgbot.lookup import WordLookup
 from tgbot.parsing import Parsing
+from tgbot.prefetch import AudioPrefetcher
+from tgbot.ratelimit import RateLimiter, TokenBucket, get_backoff_delay
 
 load_dotenv()
 
@@ -44,6 +61,37 @@ TEST_USER_DICT = {
 
 TEST_URL = 'https://www.oxfordlearnersdictionaries.com/media/english/uk_pron/t/tes/test_/test__gb_1.mp3'
 
+FIXTURES_FOLDER = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class AsyncRepositoryRunner:
+
+    """
+    Дает AsyncDBRepository синхронный интерфейс DBRepository, чтобы
+    одни и те же тесты проверяли обе реализации. Каждый вызов метода
+    выполняется в отдельном цикле событий, после чего пул соединений
+    закрывается.
+    """
+
+    def __init__(self, repository: AsyncDBRepository) -> None:
+        self.repository = repository
+
+    def __getattr__(self, name: str):
+        method = getattr(self.repository, name)
+        if not asyncio.iscoroutinefunction(method):
+            return method
+
+        def run(*args, **kwargs):
+            async def run_method():
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    await self.repository.dispose()
+
+            return asyncio.run(run_method())
+
+        return run
+
 
 class Tests:
 
@@ -62,15 +110,29 @@ class Tests:
             host=HOST,
             port=PORT
         )
+        self.test_async_repository = AsyncDBRepository(
+            dbname=TEST_DBNAME,
+            user=USER,
+            password=PASSWORD,
+            host=HOST,
+            port=PORT
+        )
         self.test_parsing = Parsing()
         self.test_functionality = Functionality()
 
     def teardown_method(self) -> None:
         del self.test_database
         del self.test_repository
+        del self.test_async_repository
         del self.test_parsing
         del self.test_functionality
 
+    @pytest.fixture(params=['sync', 'async'])
+    def repository(self, request):
+        if request.param == 'async':
+            return AsyncRepositoryRunner(self.test_async_repository)
+        return self.test_repository
+
     @pytest.mark.parametrize(
         'expected_bool',
         (True,)
@@ -85,6 +147,26 @@ class Tests:
         assert actual_bool1 == expected_bool
         assert actual_bool2 == expected_bool
 
+    @pytest.mark.parametrize(
+        'expected_bool',
+        (True,)
+    )
+    def test_get_engine_reuse(self, expected_bool: bool) -> None:
+        actual_bool = (
+                self.test_repository.get_engine() is
+                self.test_repository.get_engine()
+        )
+        assert actual_bool == expected_bool
+
+    @pytest.mark.parametrize(
+        'expected_keys',
+        ({'pool_size', 'checked_out', 'idle', 'overflow'},)
+    )
+    def test_get_pool_stats(self, expected_keys: set) -> None:
+        pool_stats = self.test_repository.get_pool_stats()
+        assert set(pool_stats) == expected_keys
+        assert pool_stats.get('checked_out') == 0
+
     @pytest.mark.parametrize(
         'expected_bool',
         (True,)
@@ -103,6 +185,15 @@ class Tests:
         actual_bool = self.test_database.exists_tables()
         assert actual_bool == expected_bool
 
+    @pytest.mark.parametrize(
+        'expected_version',
+        (get_latest_version(),)
+    )
+    def test_upgrade_schema(self, expected_version: int) -> None:
+        self.test_database.upgrade_schema()
+        actual_version = self.test_database.get_schema_version()
+        assert actual_version == expected_version
+
     @pytest.mark.parametrize(
         'expected_min_len',
         (1,)
@@ -125,6 +216,35 @@ class Tests:
         )
         assert actual_len >= expected_min_len
 
+    @pytest.mark.parametrize(
+        'expected_count',
+        (0,)
+    )
+    def test_prepare_words_repeat(self, expected_count: int) -> None:
+        actual_count = self.test_database.prepare_words()
+        assert actual_count == expected_count
+
+    @pytest.mark.parametrize(
+        'csv_rows,pos_ids,expected_rows',
+        ([[['en_word', 'pos', 'level', 'mp3_url', 'ru_word',
+            'transcription', 'en_example', 'ru_example'],
+           ['test', 'noun', 'a1', 'url', 'тест', '', 'A test, "quoted".', ''],
+           ['test', 'adverb', 'a1', 'url', 'тест', '', '', '']],
+          {'noun': 1},
+          [['test', '', 'url', '1', 'тест', 'A test, "quoted".', '']]],)
+    )
+    def test_csv_copy_stream(self, csv_rows: list, pos_ids: dict,
+                             expected_rows: list) -> None:
+        stream = CsvCopyStream(get_seed_rows(csv_rows, pos_ids))
+        chunks = []
+        while True:
+            chunk = stream.read(8)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        actual_rows = list(csv.reader(''.join(chunks).splitlines()))
+        assert actual_rows == expected_rows
+
     @pytest.mark.parametrize(
         'expected_min_len',
         (1,)
@@ -252,13 +372,13 @@ class Tests:
         'user_dict,expected_bool',
         ([TEST_USER_DICT, True],)
     )
-    def test_add_user(self, user_dict: dict,
+    def test_add_user(self, repository: DBRepository, user_dict: dict,
                       expected_bool: bool) -> None:
         user_id = user_dict.get('user_id')
-        self.test_repository.add_user(
+        repository.add_user(
             user_dict=user_dict
         )
-        user_data = self.test_repository.get_users(
+        user_data = repository.get_users(
             user_id=user_id
         )
         if user_data:
@@ -270,13 +390,13 @@ class Tests:
         'user_dict,expected_bool',
         ([TEST_USER_DICT, False],)
     )
-    def test_delete_user(self, user_dict: dict,
+    def test_delete_user(self, repository: DBRepository, user_dict: dict,
                          expected_bool: bool) -> None:
         user_id = user_dict.get('user_id')
-        self.test_repository.delete_user(
+        repository.delete_user(
             user_id=user_id
         )
-        user_data = self.test_repository.get_users(
+        user_data = repository.get_users(
             user_id=user_id
         )
         if user_data:
@@ -288,14 +408,14 @@ class Tests:
         'user_dict,expected_min_len',
         ([TEST_USER_DICT, 1],)
     )
-    def test_get_user(self, user_dict: dict,
+    def test_get_user(self, repository: DBRepository, user_dict: dict,
                       expected_min_len: int) -> None:
         user_id = user_dict.get('user_id')
-        self.test_repository.add_user(
+        repository.add_user(
             user_dict=user_dict
         )
         actual_len = len(
-            self.test_repository.get_users(user_id)
+            repository.get_users(user_id)
         )
         assert actual_len >= expected_min_len
 
@@ -303,17 +423,31 @@ class Tests:
         'user_dict,expected_min_len',
         ([TEST_USER_DICT, 4],)
     )
-    def test_prepare_user_word_pairs(self, user_dict: dict,
+    def test_prepare_user_word_pairs(self, repository: DBRepository,
+                                     user_dict: dict,
                                      expected_min_len: int) -> None:
         user_id = user_dict.get('user_id')
-        self.test_repository.prepare_user_word_pairs(
+        repository.prepare_user_word_pairs(
             user_id=user_id
         )
         actual_len = len(
-            self.test_repository.get_user_words(user_id)
+            repository.get_user_words(user_id)
         )
         assert actual_len >= expected_min_len
 
+    @pytest.mark.parametrize(
+        'user_dict,expected_count',
+        ([TEST_USER_DICT, 0],)
+    )
+    def test_prepare_user_word_pairs_repeat(self, repository: DBRepository,
+                                            user_dict: dict,
+                                            expected_count: int) -> None:
+        user_id = user_dict.get('user_id')
+        actual_count = repository.prepare_user_word_pairs(
+            user_id=user_id
+        )
+        assert actual_count == expected_count
+
     @pytest.mark.parametrize(
         'user_dict,word_dict,expected_bool',
         ([TEST_USER_DICT, TEST_WORD_DICT, True],)
@@ -335,6 +469,24 @@ class Tests:
         )
         assert actual_bool == expected_bool
 
+    @pytest.mark.parametrize(
+        'user_dict,word_dict,expected_result',
+        ([TEST_USER_DICT, TEST_WORD_DICT, {'added': 0, 'reactivated': 0}],)
+    )
+    def test_add_user_word_repeat(self, repository: DBRepository,
+                                  user_dict: dict, word_dict: dict,
+                                  expected_result: dict) -> None:
+        user_id = user_dict.get('user_id')
+        repository.add_user_word(
+            user_id=user_id,
+            data_dict=word_dict
+        )
+        actual_result = repository.add_user_word(
+            user_id=user_id,
+            data_dict=word_dict
+        )
+        assert actual_result == expected_result
+
     @pytest.mark.parametrize(
         'user_dict,word_dict,expected_bool',
         ([TEST_USER_DICT, TEST_WORD_DICT, False],)
@@ -356,6 +508,29 @@ class Tests:
         )
         assert actual_bool == expected_bool
 
+    @pytest.mark.parametrize(
+        'user_dict,word_dict,expected_count',
+        ([TEST_USER_DICT, TEST_WORD_DICT, 0],)
+    )
+    def test_remove_user_word_count(self, repository: DBRepository,
+                                    user_dict: dict, word_dict: dict,
+                                    expected_count: int) -> None:
+        user_id = user_dict.get('user_id')
+        en_word = word_dict.get('en_word')
+        repository.add_user_word(
+            user_id=user_id,
+            data_dict=word_dict
+        )
+        repository.remove_user_word(
+            user_id=user_id,
+            en_word=en_word
+        )
+        actual_count = repository.remove_user_word(
+            user_id=user_id,
+            en_word=en_word
+        )
+        assert actual_count == expected_count
+
     @pytest.mark.parametrize(
         'user_dict,word_dict,expected_bool',
         ([TEST_USER_DICT, TEST_WORD_DICT, False],)
@@ -381,26 +556,977 @@ class Tests:
         'user_dict,expected_min_len',
         ([TEST_USER_DICT, 4],)
     )
-    def test_get_user_words(self, user_dict: dict,
+    def test_get_user_words(self, repository: DBRepository, user_dict: dict,
                             expected_min_len: int) -> None:
         user_id = user_dict.get('user_id')
         actual_len = len(
-            self.test_repository.get_user_words(user_id)
+            repository.get_user_words(user_id)
         )
         assert actual_len >= expected_min_len
 
+    @pytest.mark.parametrize(
+        'user_dict,pos_name,expected_len',
+        ([TEST_USER_DICT, 'noun', 3],
+         [TEST_USER_DICT, 'verb', 3],
+         [TEST_USER_DICT, 'adjective', 3])
+    )
+    def test_get_user_card(self, repository: DBRepository, user_dict: dict,
+                           pos_name: str, expected_len: int) -> None:
+        user_id = user_dict.get('user_id')
+        (target_word, translate, others, _,
+         _, _) = repository.get_user_card(
+            user_id=user_id,
+            pos_name=pos_name
+        )
+        assert len(others) == expected_len
+        assert target_word not in others
+        assert len(translate) > 0
+
     @pytest.mark.parametrize(
         'user_dict,expected_min_len',
         ([TEST_USER_DICT, 4],)
     )
-    def test_get_unique_user_words(self, user_dict: dict,
+    def test_get_unique_user_words(self, repository: DBRepository,
+                                   user_dict: dict,
                                    expected_min_len: int) -> None:
         user_id = user_dict.get('user_id')
         actual_len = len(
-            self.test_repository.get_unique_user_words(user_id)
+            repository.get_unique_user_words(user_id)
         )
         assert actual_len >= expected_min_len
 
+    @pytest.mark.parametrize(
+        'user_dict',
+        (TEST_USER_DICT,)
+    )
+    def test_get_user_words_count(self, repository: DBRepository,
+                                  user_dict: dict) -> None:
+        user_id = user_dict.get('user_id')
+        expected_count = len(
+            repository.get_unique_user_words(user_id)
+        )
+        assert repository.count_unique_user_words(
+            user_id) == expected_count
+        assert repository.get_user_words_count(
+            user_id) == expected_count
+
+    @pytest.mark.parametrize(
+        'user_dict,word_dict,expected_shift',
+        ([TEST_USER_DICT, TEST_WORD_DICT, 1],)
+    )
+    def test_words_count_shift(self, repository: DBRepository, user_dict: dict,
+                               word_dict: dict, expected_shift: int) -> None:
+        user_id = user_dict.get('user_id')
+        en_word = word_dict.get('en_word')
+        repository.remove_user_word(
+            user_id=user_id,
+            en_word=en_word
+        )
+        count_before = repository.get_user_words_count(user_id)
+        repository.add_user_word(
+            user_id=user_id,
+            data_dict=word_dict
+        )
+        count_after = repository.get_user_words_count(user_id)
+        assert repository.has_user_word(
+            user_id=user_id,
+            en_word=en_word
+        )
+        assert count_after - count_before == expected_shift
+        assert count_after == repository.count_unique_user_words(
+            user_id)
+
+    @pytest.mark.parametrize(
+        'user_dict,expected_min_len',
+        ([TEST_USER_DICT, 4],)
+    )
+    def test_get_user_deck(self, repository: DBRepository, user_dict: dict,
+                           expected_min_len: int) -> None:
+        user_id = user_dict.get('user_id')
+        deck_rows = repository.get_user_deck(user_id)
+        assert len(deck_rows) >= expected_min_len
+        assert len(deck_rows) == len(
+            repository.get_user_words(user_id)
+        )
+
+    @pytest.mark.parametrize(
+        'seed_words,deck_rows,expected_count',
+        ([[{'id': 10, 'en_word': 'cat', 'en_trans': '[kæt]', 'id_pos': 1,
+            'ru_word': 'кот', 'en_example': '', 'ru_example': ''},
+           {'id': 11, 'en_word': 'dog', 'en_trans': '[dɒɡ]', 'id_pos': 1,
+            'ru_word': 'собака', 'en_example': '', 'ru_example': ''},
+           {'id': 12, 'en_word': 'run', 'en_trans': '[rʌn]', 'id_pos': 2,
+            'ru_word': 'бежать', 'en_example': '', 'ru_example': ''}],
+          [{'id': 10, 'en_word': 'cat', 'is_added_by_users': False},
+           {'id': 12, 'en_word': 'run', 'is_added_by_users': False},
+           {'id': 50, 'en_word': 'test case', 'en_trans': '',
+            'id_pos': 1, 'ru_word': 'прецедент', 'en_example': '',
+            'ru_example': '', 'is_added_by_users': True}],
+          3],)
+    )
+    def test_vocabulary_store(self, seed_words: list, deck_rows: list,
+                              expected_count: int) -> None:
+        user_id = TEST_USER_DICT.get('user_id')
+        vocabulary = VocabularyStore()
+        vocabulary.load_seed(
+            seed_words=seed_words,
+            pos_list=[{'id': 1, 'pos_name': 'noun'},
+                      {'id': 2, 'pos_name': 'verb'}]
+        )
+        vocabulary.load_deck(user_id, deck_rows)
+
+        assert vocabulary.count_user_words(user_id) == expected_count
+        assert vocabulary.has_user_word(user_id, 'cat')
+        assert vocabulary.has_user_word(user_id, 'test case')
+        assert not vocabulary.has_user_word(user_id, 'dog')
+
+        (target_word, translate, others, _,
+         _, _) = vocabulary.get_user_card(user_id, 'noun')
+        assert target_word in ('cat', 'test case')
+        assert others[0] in ('cat', 'test case')
+        assert others[1:] == ['', '']
+        assert translate in ('кот', 'прецедент')
+
+        vocabulary.invalidate(user_id)
+        assert vocabulary.count_user_words(user_id) == 0
+        assert vocabulary.get_user_card(user_id, 'noun') is None
+
+    @pytest.mark.parametrize(
+        'max_decks,user_ids,expected_counts,expected_evictions',
+        ([1, [1, 2], [0, 1], 1],
+         [2, [1, 2], [1, 1], 0])
+    )
+    def test_vocabulary_store_eviction(self, max_decks: int, user_ids: list,
+                                       expected_counts: list,
+                                       expected_evictions: int) -> None:
+        vocabulary = VocabularyStore(max_decks=max_decks)
+        vocabulary.load_seed(
+            seed_words=[{'id': 10, 'en_word': 'cat', 'en_trans': '',
+                         'id_pos': 1, 'ru_word': 'кот', 'en_example': '',
+                         'ru_example': ''}],
+            pos_list=[{'id': 1, 'pos_name': 'noun'}]
+        )
+        for user_id in user_ids:
+            vocabulary.load_deck(
+                user_id, [{'id': 10, 'en_word': 'cat',
+                           'is_added_by_users': False}]
+            )
+
+        assert [vocabulary.count_user_words(user_id)
+                for user_id in user_ids] == expected_counts
+        stats = vocabulary.get_stats()
+        assert stats.get('evictions') == expected_evictions
+        assert stats.get('entries') == min(max_decks, len(user_ids))
+        assert stats.get('bytes') > 0
+
+        vocabulary.invalidate(user_ids[-1])
+        assert vocabulary.get_stats().get('entries') == \
+            min(max_decks, len(user_ids)) - 1
+
+    @pytest.mark.parametrize(
+        'max_entries,max_bytes,expected_keys,expected_evictions',
+        ([2, None, ['b', 'c'], 1],
+         [10, 15, ['c'], 2])
+    )
+    def test_lru_cache_eviction(self, max_entries: int, max_bytes: int,
+                                expected_keys: list,
+                                expected_evictions: int) -> None:
+        cache = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            size_func=lambda value: 10
+        )
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        actual_keys = [key for key in 'abc' if cache.get(key) is not MISSING]
+        assert actual_keys == expected_keys
+        assert cache.get_stats().get('evictions') == expected_evictions
+
+    @pytest.mark.parametrize(
+        'ttl,expected_stats',
+        ([5, {'hits': 1, 'misses': 2, 'entries': 0}],)
+    )
+    def test_lru_cache_ttl(self, ttl: float, expected_stats: dict) -> None:
+        now = [0.0]
+        cache = LRUCache(ttl=ttl, clock=lambda: now[0])
+        cache.set('key', None)
+        assert cache.get('key') is None
+        now[0] = ttl
+        assert cache.get('key') is MISSING
+        assert cache.get('other') is MISSING
+        stats = cache.get_stats()
+        assert {key: stats.get(key) for key in expected_stats} == \
+            expected_stats
+
+    @pytest.mark.parametrize(
+        'user_dict,word_dict',
+        ([TEST_USER_DICT, TEST_WORD_DICT],)
+    )
+    def test_vocabulary_words_count(self, user_dict: dict,
+                                    word_dict: dict) -> None:
+        user_id = user_dict.get('user_id')
+        en_word = word_dict.get('en_word')
+        vocabulary = VocabularyStore()
+        vocabulary.load(repository=self.test_repository)
+
+        self.test_repository.add_user_word(
+            user_id=user_id,
+            data_dict=word_dict
+        )
+        expected_count = self.test_repository.count_unique_user_words(
+            user_id)
+        assert vocabulary.count_user_words(user_id) == expected_count
+        assert vocabulary.has_user_word(user_id, en_word)
+        assert vocabulary.count_user_words(user_id) == expected_count
+
+        self.test_repository.remove_user_word(
+            user_id=user_id,
+            en_word=en_word
+        )
+        assert vocabulary.count_user_words(user_id) == expected_count - 1
+        assert vocabulary.get_user_card(user_id, 'noun') is not None
+        assert not vocabulary.has_user_word(user_id, en_word)
+
+    @pytest.mark.parametrize(
+        'file_name,file_ids',
+        (['test case.mp3', ['first_file_id', 'second_file_id']],)
+    )
+    def test_audio_file_id(self, file_name: str, file_ids: list) -> None:
+        for file_id in file_ids:
+            self.test_repository.add_audio_file_id(
+                file_name=file_name,
+                file_id=file_id
+            )
+        assert self.test_repository.get_audio_file_id(
+            file_name) == file_ids[-1]
+        assert file_name in self.test_repository.get_audio_file_names()
+
+        self.test_repository.delete_audio_file_id(file_name)
+        assert self.test_repository.get_audio_file_id(file_name) is None
+
+    @pytest.mark.parametrize(
+        'en_word,transcription,expected_name',
+        (['test case', '[test keɪs]', 'test case [test keɪs].mp3'],
+         ['test', None, 'test.mp3'],
+         ['a/b', '/ə?/', 'ab ə.mp3'])
+    )
+    def test_get_mp3_name(self, en_word: str, transcription: str,
+                          expected_name: str) -> None:
+        assert get_mp3_name(en_word, transcription) == expected_name
+
+    @pytest.mark.parametrize(
+        'file_names,en_word,transcription,expected_name',
+        ([['AIDS.mp3'], 'aids', '[eɪdz]', 'AIDS.mp3'],
+         [['test.mp3', 'test [test].mp3'], 'test', '[test]', 'test [test].mp3'],
+         [['test.mp3'], 'test case', '[test keɪs]', None])
+    )
+    def test_audio_index(self, tmp_path, file_names: list, en_word: str,
+                         transcription: str, expected_name: str) -> None:
+        for file_name in file_names:
+            (tmp_path / file_name).write_bytes(b'')
+        index = AudioIndex(folder_path=str(tmp_path))
+        assert index.build() == len(file_names)
+
+        mp3_path = index.find(en_word, transcription)
+        actual_name = os.path.basename(mp3_path) if mp3_path else None
+        assert actual_name == expected_name
+
+        new_path = index.get_new_path('new word', '[njuː]')
+        index.add('new word', '[njuː]', new_path)
+        assert index.find('new word', '[njuː]') == new_path
+
+    @pytest.mark.parametrize(
+        'key,value,ttl',
+        (['promt:test', [{'en_word': 'test', 'ru_word': 'тест'}], 60],)
+    )
+    def test_disk_cache(self, tmp_path, key: str, value: list,
+                        ttl: float) -> None:
+        now = [0.0]
+        file_path = str(tmp_path / 'cache.sqlite3')
+        DiskCache(file_path, ttl=ttl, clock=lambda: now[0]).set(key, value)
+
+        cache = DiskCache(file_path, ttl=ttl, clock=lambda: now[0])
+        cached_value = cache.get(key)
+        assert cached_value == value
+        cached_value[0]['ru_word'] = None
+        assert cache.get(key) == value
+
+        now[0] = ttl
+        assert cache.get(key) is MISSING
+        assert cache.get_stats().get('hits') == 2
+
+    @pytest.mark.parametrize(
+        'max_entries,prune_interval,writes,expected_keys',
+        ([3, 2, 6, ['key3', 'key4', 'key5']],)
+    )
+    def test_disk_cache_bound(self, tmp_path, max_entries: int,
+                              prune_interval: int, writes: int,
+                              expected_keys: list) -> None:
+        now = [0.0]
+        file_path = str(tmp_path / 'cache.sqlite3')
+        cache = DiskCache(file_path, max_entries=max_entries,
+                          prune_interval=prune_interval,
+                          clock=lambda: now[0])
+        for idx in range(writes):
+            now[0] = idx
+            cache.set(f'key{idx}', idx)
+        assert cache.get_stats().get('entries') == max_entries
+
+        other_cache = DiskCache(file_path, max_entries=max_entries,
+                                clock=lambda: now[0])
+        assert [key for key in (f'key{idx}' for idx in range(writes))
+                if other_cache.get(key) is not MISSING] == expected_keys
+        other_cache.set('other', 0)
+        assert cache.get('other') == 0
+        assert os.listdir(tmp_path) == ['cache.sqlite3']
+        cache.close()
+        other_cache.close()
+
+    @pytest.mark.parametrize(
+        'en_word,pos_list,cached_data',
+        (['test', POS_LIST, [{'en_word': 'test', 'ru_word': 'тест',
+                              'en_trans': '[test]', 'pos_name': 'noun',
+                              'en_example': '', 'ru_example': ''}]],)
+    )
+    def test_receive_promt_data_cached(self, tmp_path, en_word: str,
+                                       pos_list: list,
+                                       cached_data: list) -> None:
+        parsing = Parsing(cache_path=str(tmp_path / 'cache.sqlite3'))
+        parsing.cache.set(f"promt:{en_word}:{','.join(pos_list)}",
+                          cached_data)
+        actual_data = parsing.receive_promt_data(
+            en_word=en_word,
+            pos_list=pos_list,
+            os_='win',
+            browser='chrome'
+        )
+        assert actual_data == cached_data
+        assert parsing.get_lookup_stats() == {
+            'cache_hits': 1, 'cache_misses': 0, 'negative_hits': 0,
+            'promt': 0, 'oxford': 0
+        }
+
+    @pytest.mark.parametrize(
+        'url1,url2,url3',
+        (['https://example.com/a', 'https://example.com/b',
+          'https://example.org/a'],)
+    )
+    def test_get_session(self, url1: str, url2: str, url3: str) -> None:
+        session = self.test_parsing.get_session(url1)
+        assert self.test_parsing.get_session(url2) is session
+        assert self.test_parsing.get_session(url3) is not session
+
+        self.test_parsing.close()
+        assert self.test_parsing.get_session(url1) is not session
+
+    @pytest.mark.parametrize(
+        'os_,browser,header_pool_size',
+        (['win', 'chrome', 3],)
+    )
+    def test_header_pool(self, os_: str, browser: str,
+                         header_pool_size: int) -> None:
+        parsing = Parsing(header_pool_size=header_pool_size)
+        header_list = [
+            parsing.get_headers(os_=os_, browser=browser)
+            for _ in range(header_pool_size * 2)
+        ]
+        assert header_list[:header_pool_size] == \
+            header_list[header_pool_size:]
+
+        header_list[0]['Connection'] = 'close'
+        assert 'close' not in [
+            parsing.get_headers(os_=os_, browser=browser).get('Connection')
+            for _ in range(header_pool_size)
+        ]
+
+    @pytest.mark.parametrize(
+        'en_word,status_code,expected_lookups',
+        (['qwertyuiop', 404, 1],
+         ['qwertyuiop', 503, 2])
+    )
+    def test_negative_cache(self, monkeypatch, en_word: str,
+                            status_code: int,
+                            expected_lookups: int) -> None:
+        class Response:
+            content = b''
+
+            def __init__(self) -> None:
+                self.status_code = status_code
+
+        monkeypatch.setattr(
+            'tgbot.parsing.requests.Session.get',
+            lambda *args, **kwargs: Response()
+        )
+        for _ in range(2):
+            oxford_data = self.test_parsing.receive_oxford_data(
+                en_word=en_word,
+                os_='win',
+                browser='chrome'
+            )
+            assert oxford_data == {'mp_3_url': ''}
+
+            promt_data = self.test_parsing.receive_promt_data(
+                en_word=en_word,
+                pos_list=POS_LIST,
+                os_='win',
+                browser='chrome'
+            )
+            assert promt_data[0].get('pos_name') == 'unidentified'
+
+        lookup_stats = self.test_parsing.get_lookup_stats()
+        assert lookup_stats.get('oxford') == expected_lookups
+        assert lookup_stats.get('promt') == expected_lookups
+
+    @pytest.mark.parametrize(
+        'file_name,expected_len',
+        (['promt_test.html', 3],
+         ['promt_missing.html', 0])
+    )
+    def test_extract_promt(self, file_name: str, expected_len: int) -> None:
+        with open(os.path.join(FIXTURES_FOLDER, file_name), 'rb') as file:
+            content = file.read()
+        expected_dict = self.test_parsing.parse_promt(
+            BeautifulSoup(markup=content, features='lxml')
+        )
+        actual_dict = self.test_parsing.extract_promt(content)
+        assert actual_dict == expected_dict
+        assert len(actual_dict) == expected_len
+
+    @pytest.mark.parametrize(
+        'file_name,expected_url',
+        (['oxford_test.html', TEST_URL],
+         ['oxford_no_pron.html', None])
+    )
+    def test_extract_oxford(self, file_name: str,
+                            expected_url: str) -> None:
+        with open(os.path.join(FIXTURES_FOLDER, file_name), 'rb') as file:
+            content = file.read()
+        expected_mp3_url = self.test_parsing.parse_oxford(
+            BeautifulSoup(markup=content, features='lxml')
+        )
+        actual_mp3_url = self.test_parsing.extract_oxford(content)
+        assert actual_mp3_url == expected_mp3_url == expected_url
+
+    @pytest.mark.parametrize(
+        'chunks,content_type,max_mp3_size,expected_bool',
+        ([[b'ID3', b'\x00' * 10], 'audio/mpeg', 100, True],
+         [[b'\xff\xfb\x90', b'\x00' * 10], None, 100, True],
+         [[b'ID3', b'\x00' * 200], 'audio/mpeg', 100, False],
+         [[b'<html>'], 'text/html', 100, False],
+         [[b'<html>'], 'audio/mpeg', 100, False])
+    )
+    def test_write_mp3(self, monkeypatch, tmp_path, chunks: list,
+                       content_type: str, max_mp3_size: int,
+                       expected_bool: bool) -> None:
+        class Response:
+            url = TEST_URL
+            headers = {'Content-Type': content_type}
+
+            def __enter__(self) -> 'Response':
+                return self
+
+            def __exit__(self, *args) -> None:
+                pass
+
+            def raise_for_status(self) -> None:
+                pass
+
+            def iter_content(self, chunk_size: int) -> list:
+                return chunks
+
+        monkeypatch.setattr(
+            'tgbot.parsing.requests.Session.get',
+            lambda *args, **kwargs: Response()
+        )
+        parsing = Parsing(max_mp3_size=max_mp3_size)
+        file_path = str(tmp_path / 'test.mp3')
+
+        actual_bool = parsing.write_mp3(
+            url=TEST_URL,
+            file_path=file_path,
+            os_='win',
+            browser='chrome',
+            attempts=1,
+            error_timeout=0
+        )
+        assert actual_bool == expected_bool
+        assert os.listdir(tmp_path) == (['test.mp3'] if expected_bool else [])
+        if expected_bool:
+            with open(file_path, 'rb') as file:
+                assert file.read() == b''.join(chunks)
+
+    @pytest.mark.parametrize(
+        'rate,capacity,expected_delays',
+        ([2, 2, [0.0, 0.0, 0.5, 1.0]],
+         [10, 1, [0.0, 0.1, 0.2, 0.3]])
+    )
+    def test_token_bucket(self, rate: float, capacity: float,
+                          expected_delays: list) -> None:
+        now = [0.0]
+        bucket = TokenBucket(rate=rate, capacity=capacity,
+                             clock=lambda: now[0])
+        actual_delays = [bucket.reserve() for _ in expected_delays]
+        assert actual_delays == pytest.approx(expected_delays)
+
+        now[0] = 100.0
+        assert bucket.reserve() == 0.0
+
+    @pytest.mark.parametrize(
+        'attempt,base,max_delay,expected_delay',
+        ([0, 1.0, 30.0, 1.0],
+         [3, 1.0, 30.0, 8.0],
+         [10, 1.0, 30.0, 30.0])
+    )
+    def test_get_backoff_delay(self, attempt: int, base: float,
+                               max_delay: float,
+                               expected_delay: float) -> None:
+        actual_delay = get_backoff_delay(
+            attempt=attempt,
+            base=base,
+            max_delay=max_delay,
+            random_func=lambda low, high: high
+        )
+        assert actual_delay == expected_delay
+
+    @pytest.mark.parametrize(
+        'url1,url2,url3',
+        (['https://example.com/a', 'https://example.com/b',
+          'https://example.org/a'],)
+    )
+    def test_rate_limiter(self, url1: str, url2: str, url3: str) -> None:
+        limiter = RateLimiter(rate=1000, capacity=1,
+                              host_rates={'example.org': (1, 5)})
+        assert limiter.get_bucket(url1) is limiter.get_bucket(url2)
+        assert limiter.get_bucket(url3).capacity == 5
+
+        start = time.perf_counter()
+        asyncio.run(limiter.acquire_async(url1))
+        asyncio.run(limiter.acquire_async(url2))
+        limiter.acquire(url1)
+        assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.parametrize(
+        'en_word,delay,max_duration',
+        (['test', 0.2, 0.7],)
+    )
+    def test_get_word_info_concurrent(self, monkeypatch, tmp_path,
+                                      en_word: str, delay: float,
+                                      max_duration: float) -> None:
+        promt_page = (
+            '<div class="cforms_result"><span class="ref_psp">noun</span>'
+            '<span class="transcription">[test]</span>'
+            '<div class="translation-item">'
+            '<span class="result_only sayWord">тест</span></div></div>'
+        )
+        oxford_page = (
+            '<div class="webtop"><div class="pron-uk" '
+            'data-src-mp3="https://oxford.test/test.mp3"></div></div>'
+        )
+
+        class Response:
+
+            def __init__(self, status_code: int, content: str) -> None:
+                self.status_code = status_code
+                self.content = content.encode()
+                self.headers = {}
+
+            def __enter__(self) -> 'Response':
+                return self
+
+            def __exit__(self, *args) -> None:
+                pass
+
+            def raise_for_status(self) -> None:
+                pass
+
+            def iter_content(self, chunk_size: int) -> list:
+                return [self.content]
+
+        def get(_, url: str, **kwargs) -> Response:
+            time.sleep(delay)
+            if url.endswith('.mp3'):
+                return Response(200, 'ID3')
+            if url.endswith(f'/{en_word}_1'):
+                return Response(200, oxford_page)
+            if 'oxford' in url:
+                return Response(404, '')
+            return Response(200, promt_page)
+
+        monkeypatch.setattr('tgbot.parsing.requests.Session.get', get)
+        monkeypatch.setattr(
+            'tgbot.parsing.audio_index',
+            AudioIndex(folder_path=str(tmp_path))
+        )
+
+        start = time.perf_counter()
+        word_list = self.test_parsing.get_word_info(
+            en_word=en_word,
+            pos_list=['noun'],
+            os_='win',
+            browser='chrome'
+        )
+        duration = time.perf_counter() - start
+
+        assert word_list[0].get('mp_3_url') == 'https://oxford.test/test.mp3'
+        assert os.listdir(tmp_path) == [get_mp3_name(en_word, '[test]')]
+        assert duration < max_duration
+
+    @pytest.mark.parametrize(
+        'responses,expected_url,expected_count',
+        (
+            [[(0.3, 'base.mp3'), (0.0, '1.mp3'), (0.0, None), (0.0, None)],
+             'base.mp3', 1],
+            [[(0.0, None), (0.3, '1.mp3'), (0.0, '2.mp3'), (0.1, '3.mp3')],
+             '1.mp3', 2],
+            [[(0.2, None), (0.1, None), (0.3, None), (0.0, '3.mp3')],
+             '3.mp3', 4],
+        )
+    )
+    def test_receive_oxford_data_order(self, monkeypatch, responses: list,
+                                       expected_url: str,
+                                       expected_count: int) -> None:
+        url_list = self.test_parsing.get_oxford_url_list('test')
+        requested_urls = []
+
+        def receive_oxford_url(url: str, os_: str, browser: str) -> tuple:
+            requested_urls.append(url)
+            delay, mp_3_url = responses[url_list.index(url)]
+            time.sleep(delay)
+            return mp_3_url, True
+
+        monkeypatch.setattr(self.test_parsing, 'receive_oxford_url',
+                            receive_oxford_url)
+
+        oxford_data = self.test_parsing.receive_oxford_data(
+            en_word='test',
+            os_='win',
+            browser='chrome'
+        )
+        assert oxford_data == {'mp_3_url': expected_url}
+        # Следующие страницы запрашиваются только после промаха
+        assert requested_urls == url_list[:expected_count]
+
+    @pytest.mark.parametrize(
+        'en_word,missing_word,rate_limit,expected_missing',
+        (['test', 'qwertyuiop', None, False],
+         ['test', 'qwertyuiop', 1, True])
+    )
+    def test_replay_server(self, tmp_path, monkeypatch, en_word: str,
+                           missing_word: str, rate_limit: float,
+                           expected_missing: bool) -> None:
+        server = ReplayServer(rate_limit=rate_limit, burst=1)
+        base_url = server.start()
+        monkeypatch.setattr(
+            'tgbot.parsing.audio_index',
+            AudioIndex(folder_path=str(tmp_path))
+        )
+        parsing = Parsing(
+            promt_url=base_url + PROMT_PATH,
+            oxford_url=base_url + OXFORD_PATH
+        )
+
+        promt_data = parsing.receive_promt_data(
+            en_word=en_word,
+            pos_list=POS_LIST,
+            os_='win',
+            browser='chrome'
+        )
+        missing_data = parsing.receive_promt_data(
+            en_word=missing_word,
+            pos_list=POS_LIST,
+            os_='win',
+            browser='chrome'
+        )
+        mp3_path = parsing.write_user_mp3(
+            en_word=en_word,
+            mp_3_url=base_url + '/media/test__gb_1.mp3',
+            transcription=promt_data[0].get('en_trans'),
+            os_='win',
+            browser='chrome'
+        )
+        parsing.close()
+        server.shutdown()
+        server.server_close()
+
+        assert [word.get('pos_name') for word in promt_data] == POS_LIST
+        assert missing_data[0].get('pos_name') == 'unidentified'
+        assert (parsing.get_cached_promt_data(
+            missing_word, POS_LIST) is MISSING) == expected_missing
+        assert (server.get_stats().get('throttled') > 0) == expected_missing
+        assert (mp3_path is None) == expected_missing
+
+    @pytest.mark.parametrize(
+        'word_lines,failed_words,oxford_failed_words,expected_words',
+        (['test,a1\nqwertyuiop\nbroken\nflaky\ntest\n', {'broken'},
+          {'flaky'}, ['test']],)
+    )
+    def test_build_vocabulary(self, monkeypatch, tmp_path, word_lines: str,
+                              failed_words: set, oxford_failed_words: set,
+                              expected_words: list) -> None:
+        promt_page = (
+            '<div class="cforms_result"><span class="ref_psp">noun</span>'
+            '<span class="transcription">[test]</span>'
+            '<div class="translation-item">'
+            '<span class="result_only sayWord">тест</span></div></div>'
+        )
+        oxford_page = (
+            '<div class="webtop"><div class="pron-uk" '
+            'data-src-mp3="https://oxford.test/test.mp3"></div></div>'
+        )
+
+        class Response:
+
+            def __init__(self, status_code: int, content: str) -> None:
+                self.status_code = status_code
+                self.content = content.encode()
+                self.headers = {}
+
+            def __enter__(self) -> 'Response':
+                return self
+
+            def __exit__(self, *args) -> None:
+                pass
+
+            def raise_for_status(self) -> None:
+                pass
+
+            def iter_content(self, chunk_size: int) -> list:
+                return [self.content]
+
+        def get(_, url: str, **kwargs) -> Response:
+            if url.endswith('.mp3'):
+                return Response(200, 'ID3')
+            if any(url.endswith(word) for word in failed_words):
+                return Response(503, '')
+            if 'oxford' in url:
+                if url.rsplit('/', 1)[-1].split('_')[0] in \
+                        oxford_failed_words:
+                    return Response(503, '')
+                return Response(200, oxford_page)
+            if url.endswith('/test') or \
+                    any(url.endswith(word) for word in oxford_failed_words):
+                return Response(200, promt_page)
+            return Response(200, '<html></html>')
+
+        monkeypatch.setattr('tgbot.parsing.requests.Session.get', get)
+        monkeypatch.setattr('tgbot.parsing.time.sleep', lambda _: None)
+
+        words_path = tmp_path / 'words.txt'
+        words_path.write_text(word_lines, encoding='utf-8')
+        output_path = str(tmp_path / 'words.csv')
+        word_list = read_word_list(str(words_path))
+
+        first_result = build_vocabulary(
+            parsing=self.test_parsing,
+            word_list=word_list,
+            output_path=output_path,
+            audio_folder=str(tmp_path / 'audio')
+        )
+        assert first_result == {'added': 1, 'rows': 1, 'missing': 1,
+                                'failed': 2, 'skipped': 0}
+
+        second_result = build_vocabulary(
+            parsing=self.test_parsing,
+            word_list=word_list,
+            output_path=output_path
+        )
+        assert second_result.get('skipped') == len(word_list) - 2
+        assert second_result.get('failed') == 2
+
+        with open(output_path, newline='', encoding='utf-8') as f:
+            csv_rows = list(csv.reader(f))
+        assert csv_rows[0] == CSV_COLUMNS
+        assert [row[0] for row in csv_rows[1:]] == expected_words
+        assert csv_rows[1][2:6] == ['a1', 'https://oxford.test/test.mp3',
+                                    'тест', '[test]']
+        assert os.listdir(tmp_path / 'audio') == [
+            get_mp3_name('test', '[test]')
+        ]
+
+    @pytest.mark.parametrize(
+        'cards,expected_stats,expected_files',
+        (
+            [[(1, 'test'), (2, 'test')],
+             {'started': 1, 'deduplicated': 1, 'cancelled': 0}, 1],
+            [[(1, 'test'), (1, 'case')],
+             {'started': 2, 'deduplicated': 0, 'cancelled': 1}, 1],
+        )
+    )
+    def test_audio_prefetcher(self, monkeypatch, tmp_path, cards: list,
+                              expected_stats: dict,
+                              expected_files: int) -> None:
+        oxford_page = (
+            '<div class="webtop"><div class="pron-uk" '
+            'data-src-mp3="https://oxford.test/{word}.mp3"></div></div>'
+        )
+
+        class Response:
+
+            def __init__(self, status_code: int, content: str) -> None:
+                self.status_code = status_code
+                self.content = content.encode()
+                self.headers = {}
+
+            def __enter__(self) -> 'Response':
+                return self
+
+            def __exit__(self, *args) -> None:
+                pass
+
+            def raise_for_status(self) -> None:
+                pass
+
+            def iter_content(self, chunk_size: int) -> list:
+                return [self.content]
+
+        def get(_, url: str, **kwargs) -> Response:
+            time.sleep(0.2)
+            if url.endswith('.mp3'):
+                return Response(200, 'ID3')
+            word = url.rsplit('/', 1)[-1]
+            if '_' in word:
+                return Response(404, '')
+            return Response(200, oxford_page.format(word=word))
+
+        test_audio_index = AudioIndex(folder_path=str(tmp_path))
+        monkeypatch.setattr('tgbot.parsing.requests.Session.get', get)
+        monkeypatch.setattr('tgbot.parsing.audio_index', test_audio_index)
+        monkeypatch.setattr('tgbot.prefetch.audio_index', test_audio_index)
+
+        prefetcher = AudioPrefetcher(parsing=self.test_parsing)
+        for owner_id, en_word in cards:
+            prefetcher.prefetch(owner_id, en_word, '[test]')
+
+        owner_id, en_word = cards[-1]
+        results = []
+        is_sent = threading.Event()
+        prefetcher.when_ready(
+            owner_id, en_word, '[test]',
+            lambda audio_dict: (results.append(audio_dict), is_sent.set())
+        )
+        assert is_sent.wait(timeout=5)
+        prefetcher.close()
+
+        stats = prefetcher.get_stats()
+        assert {key: stats[key] for key in expected_stats} == expected_stats
+        assert results[0].get('mp3_path') == \
+            str(tmp_path / get_mp3_name(en_word, '[test]'))
+        assert len(os.listdir(tmp_path)) == expected_files
+
+    @pytest.mark.parametrize(
+        'word_dict,expected_pos',
+        ([TEST_WORD_DICT, 'noun'],)
+    )
+    def test_word_lookup_database(self, word_dict: dict,
+                                  expected_pos: str) -> None:
+        self.test_repository.add_word(word_dict, is_added_by_users=True)
+        word_lookup = WordLookup(
+            parsing=self.test_parsing,
+            repository=self.test_repository
+        )
+        word_list = word_lookup.get_word_info(
+            en_word=word_dict.get('en_word'),
+            pos_list=POS_LIST,
+            os_='win',
+            browser='chrome'
+        )
+        assert [word.get('pos_name') for word in word_list] == [expected_pos]
+        assert word_lookup.get_stats().get('database') == 1
+        assert word_lookup.get_stats().get('promt') == 0
+
+    @pytest.mark.parametrize(
+        'user_dict,en_word,chat_id',
+        ([TEST_USER_DICT, 'test case', 202020202],)
+    )
+    def test_word_job_queue(self, repository: DBRepository, user_dict: dict,
+                            en_word: str, chat_id: int) -> None:
+        user_id = user_dict.get('user_id')
+        repository.add_user(user_dict)
+
+        job_id = repository.add_word_job(user_id, chat_id, en_word)
+        assert job_id is not None
+        assert repository.add_word_job(
+            user_id, chat_id, en_word) is None
+
+        job = repository.claim_word_job()
+        assert job == {'id': job_id, 'user_id': user_id, 'chat_id': chat_id,
+                       'en_word': en_word, 'attempts': 1}
+        assert repository.claim_word_job() is None
+        assert repository.reset_stale_word_jobs(timeout=60) == 0
+
+        repository.retry_word_job(job_id, delay=0, error='timeout')
+        assert repository.claim_word_job().get('attempts') == 2
+
+        repository.complete_word_job(job_id)
+        assert repository.add_word_job(
+            user_id, chat_id, en_word) is not None
+        repository.delete_user(user_id)
+
+    @pytest.mark.parametrize(
+        'user_dict,en_word,max_attempts,expected_failures',
+        (
+            [TEST_USER_DICT, 'test case', 1, 1],
+            [TEST_USER_DICT, 'test case', 2, 0],
+        )
+    )
+    def test_word_job_worker(self, user_dict: dict, en_word: str,
+                             max_attempts: int,
+                             expected_failures: int) -> None:
+        user_id = user_dict.get('user_id')
+        self.test_repository.add_user(user_dict)
+        self.test_repository.add_word_job(user_id, user_id, en_word)
+
+        def handler(job: dict) -> None:
+            raise TransientJobError(job['en_word'])
+
+        failed_jobs = []
+        worker = WordJobWorker(
+            max_attempts=max_attempts,
+            retry_delay=60,
+            repository=self.test_repository
+        )
+        worker.set_handler(handler, failure_handler=failed_jobs.append)
+
+        assert worker.process_next()
+        assert len(failed_jobs) == expected_failures
+        assert not worker.process_next()
+        self.test_repository.delete_user(user_id)
+
+    @pytest.mark.parametrize(
+        'user_dict,en_word',
+        ([TEST_USER_DICT, 'test case'],)
+    )
+    def test_word_job_restart(self, user_dict: dict, en_word: str) -> None:
+        user_id = user_dict.get('user_id')
+        self.test_repository.add_user(user_dict)
+        self.test_repository.add_word_job(user_id, user_id, en_word)
+
+        # Процесс остановлен во время выполнения задачи
+        assert self.test_repository.claim_word_job() is not None
+        assert self.test_repository.add_word_job(
+            user_id, user_id, en_word) is None
+
+        # Задача может выполняться другим экземпляром, поэтому при
+        # запуске она не возвращается в очередь до истечения stale_timeout
+        done_event = threading.Event()
+        worker = WordJobWorker(
+            workers=1,
+            poll_interval=0.1,
+            stale_timeout=1,
+            stale_check_interval=0.1,
+            repository=self.test_repository
+        )
+        worker.set_handler(lambda job: done_event.set())
+        worker.start()
+        assert not done_event.wait(0.5)
+        assert done_event.wait(5)
+        worker.stop(timeout=5)
+
+        assert self.test_repository.add_word_job(
+            user_id, user_id, en_word) is not None
+        self.test_repository.delete_user(user_id)
+
     @pytest.mark.parametrize(
         'os_,browser,expected_bool',
         (['win', 'chrome', True],)
@@ -0,0 +1,459 @@
+"""
+Асинхронный аналог Parsing на aiohttp.
+
+Разбор страниц, кэши и заголовки берутся из экземпляра Parsing,
+а сетевые запросы выполняются в цикле событий: частота запросов
+к каждому сайту ограничивается RateLimiter, кол-во одновременных
+запросов - семафором, а повторные попытки выполняются с экспоненциальной
+паузой со случайным разбросом через asyncio.sleep. Разбор HTML
+и запись файлов выполняются в отдельных потоках, поэтому цикл событий
+не блокируется.
+
+Экземпляр AsyncParsing привязан к циклу событий, в котором
+был выполнен первый запрос.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+from cache import MISSING
+from tgbot.audio import audio_index
+from tgbot.parsing import MP3_CHUNK_SIZE, Parsing, check_mp3_headers, \
+    is_mp3_header
+from tgbot.ratelimit import RateLimiter, get_backoff_delay
+
+
+class AsyncParsing:
+
+    def __init__(self, parsing: Optional[Parsing] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 max_concurrency: int = 10,
+                 attempts: int = 3,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 30.0,
+                 timeout: float = 10.0) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - parsing: экземпляр класса Parsing (по умолчанию новый экземпляр)
+        - limiter: ограничение частоты запросов к сайтам
+                   (по умолчанию parsing.limiter)
+        - max_concurrency: максимальное кол-во одновременных запросов
+                           (по умолчанию 10)
+        - attempts: кол-во попыток запроса (по умолчанию 3)
+        - backoff_base: пауза после первой неудачной попытки в секундах
+                        (по умолчанию 1.0)
+        - backoff_max: максимальная пауза между попытками в секундах
+                       (по умолчанию 30.0)
+        - timeout: время ожидания соединения и очередной части ответа
+                   в секундах (по умолчанию 10.0)
+        """
+
+        self.parsing = parsing if parsing is not None else Parsing()
+        self.limiter = limiter if limiter is not None \
+            else self.parsing.limiter
+        self.max_concurrency = max_concurrency
+        self.attempts = attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+
+        """
+        Выводит HTTP-сессию (создается при первом обращении).
+
+        Выводной параметр:
+        - объект класса aiohttp.ClientSession
+        """
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency,
+                    limit_per_host=self.parsing.pool_size
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.timeout,
+                    sock_read=self.timeout
+                )
+            )
+        return self._session
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+
+        """
+        Выводит семафор, ограничивающий кол-во одновременных запросов.
+
+        Выводной параметр:
+        - объект класса asyncio.Semaphore
+        """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self) -> None:
+
+        """
+        Закрывает HTTP-сессию и ее соединения.
+        """
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str, os_: str, browser: str,
+                    read: Optional[Callable[[aiohttp.ClientResponse],
+                                            Awaitable[Any]]] = None
+                    ) -> Optional[tuple]:
+
+        """
+        Выполняет GET-запрос. При ошибке соединения, ответе 429 или 5xx
+        запрос повторяется после паузы get_backoff_delay (не меньше
+        заголовка Retry-After, но не больше backoff_max).
+
+        Вводные параметры:
+        - url: URL-ссылка
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+        - read: корутина чтения успешного (2xx) ответа
+                (по умолчанию None - ответ читается целиком)
+
+        Выводной параметр:
+        - кортеж (код ответа, содержимое ответа или результат read)
+          (None - все попытки неудачны)
+        """
+
+        for attempt in range(self.attempts):
+            if self.limiter is not None:
+                await self.limiter.acquire_async(url)
+
+            status, content, retry_after = None, b'', None
+            try:
+                async with self.get_semaphore():
+                    async with self.get_session().get(
+                        url,
+                        headers=self.parsing.get_headers(os_, browser)
+                    ) as resp:
+                        status = resp.status
+                        if read is not None and 200 <= status < 300:
+                            content = await read(resp)
+                        else:
+                            content = await resp.read()
+                        retry_after = resp.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                print(f'aiohttp exceptions: {url}')
+
+            if status is not None and status != 429 and status < 500:
+                return status, content
+
+            if attempt + 1 < self.attempts:
+                delay = get_backoff_delay(
+                    attempt=attempt,
+                    base=self.backoff_base,
+                    max_delay=self.backoff_max
+                )
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, min(float(retry_after),
+                                           self.backoff_max))
+                await asyncio.sleep(delay)
+
+        return None
+
+    async def receive_promt_data(self, en_word: str, pos_list: list,
+                                 os_: str, browser: str) -> list[dict]:
+
+        """
+        Асинхронный аналог Parsing.receive_promt_data.
+
+        Вводные параметры:
+        - en_word: английское слово, которое хотим перевести в Promt
+        - pos_list: список учитываемых частей речи
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - список словарей с информацией о переведенном слове в разрезе
+        отдельных частей речи
+        """
+
+        # Кэш Parsing читает файл SQLite, поэтому обращение
+        # к нему выполняется вне цикла событий
+        cached_data = await asyncio.to_thread(
+            self.parsing.get_cached_promt_data, en_word, pos_list
+        )
+        if cached_data is not MISSING:
+            return cached_data
+
+        self.parsing.count_network_lookup('promt')
+
+        response = await self.fetch(
+            url=self.parsing.promt_url + en_word,
+            os_=os_,
+            browser=browser
+        )
+
+        def parse(content: Optional[bytes]) -> list[dict]:
+            pos_dict = None
+            if content is not None:
+                pos_dict = self.parsing.extract_promt(content)
+            return self.parsing.store_promt_data(en_word, pos_list, pos_dict)
+
+        return await asyncio.to_thread(
+            parse, response[1] if response is not None else None
+        )
+
+    async def receive_oxford_url(self, url: str, os_: str,
+                                 browser: str) -> tuple:
+
+        """
+        Асинхронный аналог Parsing.receive_oxford_url.
+
+        Вводные параметры:
+        - url: ссылка на страницу слова
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - кортеж (ссылка на MP3-файл или None, True - страница ответила
+          2xx или 404, False - ошибка соединения или другой ответ)
+        """
+
+        response = await self.fetch(url=url, os_=os_, browser=browser)
+        if response is None:
+            return None, False
+
+        status, content = response
+        if not 200 <= status < 300:
+            return None, status == 404
+
+        mp_3_url = await asyncio.to_thread(self.parsing.extract_oxford, content)
+        return mp_3_url, True
+
+    async def receive_oxford_data(self, en_word: str, os_: str,
+                                  browser: str) -> dict:
+
+        """
+        Асинхронный аналог Parsing.receive_oxford_data: страницы слова
+        запрашиваются по очереди, и следующая страница запрашивается
+        только если на предыдущей ссылки нет.
+
+        Вводные параметры:
+        - en_word: английское слово, которое хотим найти
+                   в онлайн-словаре Oxford
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - словарь, содержащий ссылку на MP3-файл
+        """
+
+        cached_data = await asyncio.to_thread(
+            self.parsing.get_cached_oxford_data, en_word
+        )
+        if cached_data is not MISSING:
+            return cached_data
+
+        self.parsing.count_network_lookup('oxford')
+
+        is_missing = True
+        for url in self.parsing.get_oxford_url_list(en_word):
+            mp_3_url, is_url_missing = await self.receive_oxford_url(
+                url, os_, browser
+            )
+
+            if mp_3_url:
+                return await asyncio.to_thread(
+                    self.parsing.store_oxford_data, en_word, mp_3_url
+                )
+
+            is_missing = is_missing and is_url_missing
+
+        return await asyncio.to_thread(
+            self.parsing.store_oxford_data, en_word, None, is_missing
+        )
+
+    async def write_mp3(self, url: str, file_path: str,
+                        os_: str, browser: str,
+                        cancel_event: Optional[threading.Event] = None
+                        ) -> bool:
+
+        """
+        Асинхронный аналог Parsing.write_mp3: ответ записывается частями
+        во временный файл и переносится по заданному пути.
+
+        Вводные параметры:
+        - url: URL-ссылка на MP3-файл
+        - file_path: путь, по которому хотим записать файл
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+        - cancel_event: событие отмены загрузки (по умолчанию None)
+
+        Выводной параметр:
+        - bool: True - MP3-файл записан, False - наоборот
+        """
+
+        async def read(resp: aiohttp.ClientResponse) -> bool:
+            return await self.stream_mp3(resp, file_path, cancel_event)
+
+        response = await self.fetch(
+            url=url,
+            os_=os_,
+            browser=browser,
+            read=read
+        )
+        return response is not None and response[1] is True
+
+    async def stream_mp3(self, resp: aiohttp.ClientResponse,
+                         file_path: str,
+                         cancel_event: Optional[threading.Event] = None
+                         ) -> bool:
+
+        """
+        Асинхронный аналог Parsing.stream_mp3.
+
+        Вводные параметры:
+        - resp: ответ на GET-запрос
+        - file_path: путь, по которому хотим записать файл
+        - cancel_event: событие отмены загрузки (по умолчанию None)
+
+        Выводной параметр:
+        - bool: True - MP3-файл записан, False - наоборот
+        """
+
+        max_size = self.parsing.max_mp3_size
+        if not check_mp3_headers(resp.headers, max_size):
+            print(f'Ответ не является MP3-файлом: {resp.url}')
+            return False
+
+        file_descriptor, tmp_path = await asyncio.to_thread(
+            tempfile.mkstemp,
+            suffix='.part',
+            dir=os.path.dirname(os.path.abspath(file_path))
+        )
+        file = os.fdopen(file_descriptor, 'wb')
+
+        success = False
+        try:
+            size, header = 0, b''
+            async for chunk in resp.content.iter_chunked(MP3_CHUNK_SIZE):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+
+                header = (header + chunk[:4])[:4]
+                size += len(chunk)
+                if size > max_size or \
+                        (len(header) == 4 and not is_mp3_header(header)):
+                    print(f'Ответ не является MP3-файлом: {resp.url}')
+                    return False
+
+                await asyncio.to_thread(file.write, chunk)
+
+            await asyncio.to_thread(file.close)
+            if not is_mp3_header(header):
+                return False
+
+            await asyncio.to_thread(os.replace, tmp_path, file_path)
+            success = True
+            return True
+        finally:
+            file.close()
+            if not success:
+                await asyncio.to_thread(self.parsing.remove_file, tmp_path)
+
+    async def write_user_mp3(self, en_word: str, mp_3_url: str,
+                             transcription: str, os_: str,
+                             browser: str) -> Optional[str]:
+
+        """
+        Асинхронный аналог Parsing.write_user_mp3.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - mp_3_url: URL-ссылка на MP3-файл
+        - transcription: транскрипция английского слова
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - путь к MP3-файлу (None - файл не записан)
+        """
+
+        if not mp_3_url:
+            return None
+
+        mp3_path = audio_index.find(en_word, transcription)
+        if mp3_path is not None:
+            return mp3_path
+
+        mp3_path = audio_index.get_new_path(en_word, transcription)
+        if mp3_path is None:
+            return None
+
+        success = await self.write_mp3(
+            url=mp_3_url,
+            file_path=mp3_path,
+            os_=os_,
+            browser=browser
+        )
+        if success:
+            audio_index.add(en_word, transcription, mp3_path)
+            return mp3_path
+
+        print(f'Не удалось скачать аудиофайл: {mp_3_url}')
+        return None
+
+    async def get_word_info(self, en_word: str, pos_list: list,
+                            os_: str, browser: str) -> list[dict]:
+
+        """
+        Асинхронный аналог Parsing.get_word_info.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - pos_list: список учитываемых частей речи
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - список словарей с данными английского слова
+        """
+
+        promt_data, oxford_data = await asyncio.gather(
+            self.receive_promt_data(
+                en_word=en_word,
+                pos_list=pos_list,
+                os_=os_,
+                browser=browser
+            ),
+            self.receive_oxford_data(
+                en_word=en_word,
+                os_=os_,
+                browser=browser
+            )
+        )
+
+        word_list = self.parsing.merge_word_data(
+            promt_data=promt_data,
+            oxford_data=oxford_data
+        )
+
+        for word_dict in word_list[:1]:
+            await self.write_user_mp3(
+                en_word=word_dict.get('en_word'),
+                mp_3_url=word_dict.get('mp_3_url'),
+                transcription=word_dict.get('en_trans'),
+                os_=os_,
+                browser=browser
+            )
+
+        return word_list
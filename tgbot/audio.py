@@ -0,0 +1,245 @@
+"""
+Индекс MP3-файлов с произношением английских слов.
+
+Индекс строится один раз при запуске по папке eng_audio_files_mp3
+и сопоставляет нормализованную пару (слово, транскрипция) с путем
+к файлу. Новые загрузки регистрируются в индексе, а при изменении
+папки (по времени ее модификации) индекс строится заново.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from filefinder import find_folder
+
+AUDIO_FOLDER_NAME = 'eng_audio_files_mp3'
+
+
+def get_mp3_name(en_word: str, transcription: Optional[str] = None) -> str:
+
+    """
+    Задает название MP3-файла с учетом наличия транскрипции
+    у английского слова. Недопустимые в названиях файлов
+    символы удаляются.
+
+    Вводные параметры:
+    - en_word: английское слово
+    - transcription: транскрипция английского слова (по умолчанию None)
+
+    Выводной параметр:
+    - название MP3-файла
+    """
+
+    if transcription:
+        mp3_name = f"{en_word} {transcription}.mp3"
+    else:
+        mp3_name = f"{en_word}.mp3"
+
+    return re.sub(r'[<>:"/\\|?*]', '', mp3_name)
+
+
+def get_audio_key(en_word: str, transcription: Optional[str] = None) -> tuple:
+
+    """
+    Выводит нормализованный ключ индекса: слово в нижнем регистре
+    и транскрипция без пробелов по краям.
+
+    Вводные параметры:
+    - en_word: английское слово
+    - transcription: транскрипция английского слова (по умолчанию None)
+
+    Выводной параметр:
+    - кортеж (en_word, transcription)
+    """
+
+    transcription = re.sub(r'[<>:"/\\|?*]', '', transcription or '')
+    return en_word.strip().lower(), transcription.strip()
+
+
+def parse_mp3_name(mp3_name: str) -> tuple:
+
+    """
+    Выделяет из названия MP3-файла ключ индекса. Транскрипция
+    отделяется от слова пробелом и начинается с "[" или "/".
+
+    Вводный параметр:
+    - mp3_name: название MP3-файла
+
+    Выводной параметр:
+    - кортеж (en_word, transcription) в формате get_audio_key
+    """
+
+    stem = os.path.splitext(mp3_name)[0]
+    match = re.match(r'^(.*?) ([\[/].*)$', stem)
+
+    if match:
+        return get_audio_key(match.group(1), match.group(2))
+    return get_audio_key(stem)
+
+
+class AudioIndex:
+
+    def __init__(self, folder_path: Optional[str] = None,
+                 check_interval: float = 5.0) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - folder_path: путь к папке с MP3-файлами
+                       (по умолчанию папка eng_audio_files_mp3 проекта)
+        - check_interval: интервал проверки изменения папки в секундах
+                          (по умолчанию 5.0)
+        """
+
+        self._folder_path = folder_path
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._paths: dict[tuple, str] = {}
+        self._folder_mtime: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def folder_path(self) -> Optional[str]:
+        if self._folder_path is None:
+            self._folder_path = find_folder(AUDIO_FOLDER_NAME)
+        return self._folder_path
+
+    def build(self) -> int:
+
+        """
+        Строит индекс по содержимому папки с MP3-файлами.
+
+        Выводной параметр:
+        - кол-во проиндексированных файлов
+        """
+
+        folder_path = self.folder_path
+        paths = {}
+        folder_mtime = None
+        file_count = 0
+
+        if folder_path is not None and os.path.isdir(folder_path):
+            folder_mtime = os.stat(folder_path).st_mtime_ns
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.mp3') and entry.is_file():
+                        paths[parse_mp3_name(entry.name)] = entry.path
+                        file_count += 1
+
+            for (word_key, _), mp3_path in list(paths.items()):
+                paths.setdefault((word_key, ''), mp3_path)
+
+        with self._lock:
+            self._paths = paths
+            self._folder_mtime = folder_mtime
+            self._checked_at = time.monotonic()
+
+        return file_count
+
+    def refresh(self) -> None:
+
+        """
+        Перестраивает индекс, если папка изменилась с момента
+        последней проверки. Папка проверяется не чаще одного
+        раза за check_interval секунд.
+        """
+
+        now = time.monotonic()
+        if self._folder_mtime is not None and \
+                now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+
+        folder_path = self.folder_path
+        try:
+            folder_mtime = os.stat(folder_path).st_mtime_ns
+        except (OSError, TypeError):
+            return
+
+        if folder_mtime != self._folder_mtime:
+            self.build()
+
+    def find(self, en_word: str,
+             transcription: Optional[str] = None) -> Optional[str]:
+
+        """
+        Выводит путь к MP3-файлу английского слова. Если файла
+        с транскрипцией нет, берется файл с названием по слову
+        или файл того же слова с другой транскрипцией.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - transcription: транскрипция английского слова (по умолчанию None)
+
+        Выводной параметр:
+        - путь к MP3-файлу (None при его отсутствии)
+        """
+
+        self.refresh()
+
+        word_key, transcription_key = get_audio_key(en_word, transcription)
+
+        with self._lock:
+            mp3_path = self._paths.get((word_key, transcription_key))
+            if mp3_path is None and transcription_key:
+                mp3_path = self._paths.get((word_key, ''))
+
+        return mp3_path
+
+    def get_new_path(self, en_word: str,
+                     transcription: Optional[str] = None) -> Optional[str]:
+
+        """
+        Выводит путь для записи нового MP3-файла английского слова.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - transcription: транскрипция английского слова (по умолчанию None)
+
+        Выводной параметр:
+        - путь к MP3-файлу (None при отсутствии папки)
+        """
+
+        if self.folder_path is None:
+            return None
+
+        return os.path.join(
+            self.folder_path,
+            get_mp3_name(en_word, transcription)
+        )
+
+    def add(self, en_word: str, transcription: Optional[str],
+            mp3_path: str) -> None:
+
+        """
+        Регистрирует в индексе новый MP3-файл. Запись файла
+        в папку не приводит к перестроению индекса.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - transcription: транскрипция английского слова
+        - mp3_path: путь к MP3-файлу
+        """
+
+        try:
+            folder_mtime = os.stat(os.path.dirname(mp3_path)).st_mtime_ns
+        except OSError:
+            folder_mtime = None
+
+        with self._lock:
+            self._paths[get_audio_key(en_word, transcription)] = mp3_path
+            self._paths.setdefault(get_audio_key(en_word), mp3_path)
+            if folder_mtime is not None and \
+                    os.path.dirname(mp3_path) == self.folder_path:
+                self._folder_mtime = folder_mtime
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+audio_index = AudioIndex()
@@ -0,0 +1,405 @@
+"""
+Пакетное пополнение словаря database.csv.
+
+Для каждого слова из списка перевод, транскрипция и примеры берутся
+из Promt, ссылка на MP3-файл - из Oxford. Слова обрабатываются
+в нескольких потоках, а частота запросов к каждому сайту ограничена
+общим RateLimiter. Результаты дописываются в CSV-файл с колонками
+database.csv по мере готовности, обработанные слова отмечаются
+в файле контрольной точки. Прерванный запуск продолжается с места
+остановки; слова, не обработанные из-за ошибок соединения,
+повторяются при следующем запуске.
+
+Запуск:
+    python -m tgbot.builder words.txt --output new_words.csv \
+        --audio-folder data/eng_audio_files_mp3
+"""
+
+import argparse
+import csv
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+from cache import MISSING
+from tgbot.audio import get_mp3_name
+from tgbot.parsing import Parsing
+from tgbot.ratelimit import RateLimiter
+
+CSV_COLUMNS = ['en_word', 'pos', 'level', 'mp3_url', 'ru_word',
+               'transcription', 'en_example', 'ru_example']
+POS_LIST = ['noun', 'verb', 'adjective']
+
+
+def read_word_list(file_path: str) -> list[tuple[str, str]]:
+
+    """
+    Читает список слов. Каждая строка файла - слово и (необязательно)
+    его уровень через запятую. Файл с заголовком en_word (например,
+    сам database.csv) читается по названиям колонок en_word и level.
+    Пустые строки, строки с # и повторы слов пропускаются.
+
+    Вводный параметр:
+    - file_path: путь к файлу со словами
+
+    Выводной параметр:
+    - список кортежей (en_word, level)
+    """
+
+    word_list = []
+    word_set = set()
+    word_idx, level_idx = 0, 1
+
+    with open(file_path, newline='', encoding='utf-8') as f:
+        for idx, word_row in enumerate(csv.reader(f)):
+            if idx == 0 and word_row and word_row[0] == 'en_word':
+                word_idx = word_row.index('en_word')
+                level_idx = word_row.index('level') \
+                    if 'level' in word_row else None
+                continue
+
+            if not word_row or word_row[0].startswith('#'):
+                continue
+
+            en_word = word_row[word_idx].strip().lower()
+            level = word_row[level_idx].strip() \
+                if level_idx is not None and len(word_row) > level_idx \
+                else ''
+
+            if en_word and en_word not in word_set:
+                word_set.add(en_word)
+                word_list.append((en_word, level))
+
+    return word_list
+
+
+def read_checkpoint(output_path: str, checkpoint_path: str) -> set[str]:
+
+    """
+    Выводит слова, обработанные предыдущими запусками: слова из файла
+    контрольной точки и слова, уже записанные в CSV-файл. Недописанная
+    последняя строка CSV-файла (при аварийной остановке) удаляется.
+
+    Вводные параметры:
+    - output_path: путь к CSV-файлу с результатами
+    - checkpoint_path: путь к файлу контрольной точки
+
+    Выводной параметр:
+    - множество обработанных слов
+    """
+
+    done_words = set()
+
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding='utf-8') as f:
+            done_words.update(line.strip() for line in f if line.strip())
+
+    if os.path.exists(output_path):
+        with open(output_path, 'rb+') as f:
+            content = f.read()
+            if content and not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+
+        with open(output_path, newline='', encoding='utf-8') as f:
+            done_words.update(
+                word_row[0] for idx, word_row in enumerate(csv.reader(f))
+                if idx > 0 and word_row
+            )
+
+    return done_words
+
+
+def get_csv_text(row_list: list[list]) -> str:
+
+    """
+    Сериализует строки в CSV-текст, чтобы строки одного слова
+    записывались в файл одной операцией.
+
+    Вводный параметр:
+    - row_list: список строк
+
+    Выводной параметр:
+    - CSV-текст
+    """
+
+    text = io.StringIO()
+    csv.writer(text, lineterminator='\n').writerows(row_list)
+    return text.getvalue()
+
+
+def scrape_word(parsing: Parsing, en_word: str, level: str,
+                audio_folder: Optional[str] = None,
+                os_: str = 'win', browser: str = 'chrome') -> Optional[list]:
+
+    """
+    Выводит строки database.csv для английского слова и скачивает
+    его MP3-файл в папку audio_folder (если файла еще нет).
+
+    Вводные параметры:
+    - parsing: экземпляр класса Parsing
+    - en_word: английское слово
+    - level: уровень слова
+    - audio_folder: папка для MP3-файлов (по умолчанию None - без загрузки)
+    - os_: сокращенное название операционной системы
+    - browser: название браузера
+
+    Выводной параметр:
+    - список строк в формате CSV_COLUMNS (пустой - перевода нет;
+      None - Promt или Oxford недоступен, слово нужно повторить позже)
+    """
+
+    promt_data = parsing.receive_promt_data(
+        en_word=en_word,
+        pos_list=POS_LIST,
+        os_=os_,
+        browser=browser
+    )
+
+    if promt_data[0].get('ru_word') is None:
+        # Отсутствие перевода запоминается Parsing только
+        # после ответа Promt; иначе словарь был недоступен
+        if parsing.get_cached_promt_data(en_word, POS_LIST) is MISSING:
+            return None
+        return []
+
+    word_list = parsing.merge_word_data(
+        promt_data=promt_data,
+        oxford_data=parsing.receive_oxford_data(
+            en_word=en_word,
+            os_=os_,
+            browser=browser
+        )
+    )
+
+    mp3_url = word_list[0].get('mp_3_url')
+    if not mp3_url and parsing.get_cached_oxford_data(en_word) is MISSING:
+        # Отсутствие ссылки запоминается Parsing только после
+        # ответов всех страниц Oxford; иначе словарь был недоступен
+        return None
+
+    if audio_folder and mp3_url:
+        mp3_path = os.path.join(
+            audio_folder,
+            get_mp3_name(en_word, word_list[0].get('en_trans'))
+        )
+        if not os.path.exists(mp3_path):
+            parsing.write_mp3(
+                url=mp3_url,
+                file_path=mp3_path,
+                os_=os_,
+                browser=browser,
+                attempts=3,
+                error_timeout=10
+            )
+
+    return [
+        [en_word, word_dict.get('pos_name'), level,
+         word_dict.get('mp_3_url') or '', word_dict.get('ru_word'),
+         word_dict.get('en_trans') or '', word_dict.get('en_example') or '',
+         word_dict.get('ru_example') or '']
+        for word_dict in word_list
+    ]
+
+
+def iter_word_futures(executor: ThreadPoolExecutor,
+                      pending_words: Iterator[tuple[str, str]],
+                      future_dict: dict, window: int, parsing: Parsing,
+                      audio_folder: Optional[str]) -> Iterator[tuple]:
+
+    """
+    Передает слова в пул потоков так, чтобы одновременно в очереди
+    было не больше window слов, и выводит результаты по мере готовности.
+
+    Вводные параметры:
+    - executor: пул потоков
+    - pending_words: итератор кортежей (en_word, level)
+    - future_dict: словарь {future: en_word} незавершенных задач
+    - window: максимальное кол-во незавершенных задач
+    - parsing: экземпляр класса Parsing
+    - audio_folder: папка для MP3-файлов
+
+    Выводной параметр:
+    - итератор кортежей (en_word, результат scrape_word)
+    """
+
+    while True:
+        while len(future_dict) < window:
+            next_word = next(pending_words, None)
+            if next_word is None:
+                break
+
+            future = executor.submit(
+                scrape_word,
+                parsing=parsing,
+                en_word=next_word[0],
+                level=next_word[1],
+                audio_folder=audio_folder
+            )
+            future_dict[future] = next_word[0]
+
+        if not future_dict:
+            return
+
+        done, _ = wait(future_dict, return_when=FIRST_COMPLETED)
+        for future in done:
+            en_word = future_dict.pop(future)
+            try:
+                yield en_word, future.result()
+            except Exception as e:
+                print(f'Ошибка при обработке {en_word}: {e}')
+                yield en_word, None
+
+
+def build_vocabulary(parsing: Parsing, word_list: list[tuple[str, str]],
+                     output_path: str,
+                     checkpoint_path: Optional[str] = None,
+                     audio_folder: Optional[str] = None,
+                     workers: int = 4) -> dict:
+
+    """
+    Обрабатывает слова в workers потоках и дописывает результаты
+    в CSV-файл. Слова, обработанные предыдущими запусками, пропускаются.
+
+    Вводные параметры:
+    - parsing: экземпляр класса Parsing
+    - word_list: список кортежей (en_word, level)
+    - output_path: путь к CSV-файлу с результатами
+    - checkpoint_path: путь к файлу контрольной точки
+                       (по умолчанию output_path + '.done')
+    - audio_folder: папка для MP3-файлов (по умолчанию None - без загрузки)
+    - workers: кол-во потоков (по умолчанию 4)
+
+    Выводной параметр:
+    - словарь с итогами:
+        -- added: кол-во слов, записанных в CSV-файл
+        -- rows: кол-во записанных строк
+        -- missing: кол-во слов без перевода
+        -- failed: кол-во слов, которые нужно повторить
+        -- skipped: кол-во слов, обработанных ранее
+    """
+
+    if checkpoint_path is None:
+        checkpoint_path = output_path + '.done'
+    if audio_folder:
+        os.makedirs(audio_folder, exist_ok=True)
+
+    done_words = read_checkpoint(output_path, checkpoint_path)
+    pending_words = [
+        (en_word, level) for en_word, level in word_list
+        if en_word not in done_words
+    ]
+    result_dict = {'added': 0, 'rows': 0, 'missing': 0, 'failed': 0,
+                   'skipped': len(word_list) - len(pending_words)}
+
+    is_new_file = not os.path.exists(output_path) or \
+        os.path.getsize(output_path) == 0
+
+    with open(output_path, 'a', newline='', encoding='utf-8') as output, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers,
+                               thread_name_prefix='builder') as executor:
+
+        if is_new_file:
+            output.write(get_csv_text([CSV_COLUMNS]))
+
+        future_dict = {}
+        try:
+            for en_word, row_list in iter_word_futures(
+                    executor=executor,
+                    pending_words=iter(pending_words),
+                    future_dict=future_dict,
+                    window=workers * 2,
+                    parsing=parsing,
+                    audio_folder=audio_folder):
+
+                if row_list is None:
+                    result_dict['failed'] += 1
+                    continue
+
+                if row_list:
+                    output.write(get_csv_text(row_list))
+                    output.flush()
+                    result_dict['added'] += 1
+                    result_dict['rows'] += len(row_list)
+                else:
+                    result_dict['missing'] += 1
+
+                checkpoint.write(en_word + '\n')
+                checkpoint.flush()
+        finally:
+            for future in future_dict:
+                future.cancel()
+
+    return result_dict
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Пакетное пополнение словаря database.csv'
+    )
+    parser.add_argument(
+        'words',
+        help='файл со словами (слово и уровень через запятую в строке)'
+    )
+    parser.add_argument(
+        '--output',
+        required=True,
+        help='CSV-файл с результатами (дописывается при повторном запуске)'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=None,
+        help='файл контрольной точки (по умолчанию <output>.done)'
+    )
+    parser.add_argument(
+        '--audio-folder',
+        default=None,
+        help='папка для MP3-файлов (по умолчанию MP3-файлы не скачиваются)'
+    )
+    parser.add_argument(
+        '--cache',
+        default=None,
+        help='файл SQLite с кэшем результатов парсинга'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='кол-во потоков'
+    )
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=2.0,
+        help='кол-во запросов в секунду к одному сайту'
+    )
+    parser.add_argument(
+        '--burst',
+        type=float,
+        default=5.0,
+        help='допустимый всплеск запросов к одному сайту'
+    )
+    args = parser.parse_args()
+
+    builder_parsing = Parsing(
+        cache_path=args.cache,
+        limiter=RateLimiter(rate=args.rate, capacity=args.burst)
+    )
+
+    try:
+        build_result = build_vocabulary(
+            parsing=builder_parsing,
+            word_list=read_word_list(args.words),
+            output_path=args.output,
+            checkpoint_path=args.checkpoint,
+            audio_folder=args.audio_folder,
+            workers=args.workers
+        )
+    finally:
+        builder_parsing.close()
+
+    print(f'ДОБАВЛЕНО: {build_result["added"]} ({build_result["rows"]} строк), '
+          f'БЕЗ ПЕРЕВОДА: {build_result["missing"]}, '
+          f'ОШИБОК: {build_result["failed"]}, '
+          f'ПРОПУЩЕНО: {build_result["skipped"]}')
@@ -1,16 +1,58 @@
+import os
 import random
+import threading
 
 from telebot import TeleBot, custom_filters, types
 from telebot.storage import StateMemoryStorage
 
 from database.repository import DBRepository
+from database.vocabulary import VocabularyStore
+from tgbot.audio import audio_index
+from cache import MISSING
 from tgbot.functionality import Command, Functionality, States
+from tgbot.jobs import TransientJobError, WordJobWorker
+from tgbot.lookup import WordLookup
 from tgbot.parsing import Parsing
-
-parsing = Parsing()
+from tgbot.prefetch import AudioPrefetcher
+from tgbot.ratelimit import RateLimiter
+
+PARSING_CACHE_PATH = os.getenv(
+    key='PARSING_CACHE_PATH',
+    default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'data', 'parsing_cache.sqlite3'
+    )
+)
+
+PARSING_RATE_LIMIT = float(os.getenv(key='PARSING_RATE_LIMIT', default='2'))
+PARSING_BURST = float(os.getenv(key='PARSING_BURST', default='5'))
+WORD_JOB_WORKERS = int(os.getenv(key='WORD_JOB_WORKERS', default='2'))
+DB_CACHE_ENTRIES = int(os.getenv(key='DB_CACHE_ENTRIES', default='1024'))
+DB_CACHE_TTL = float(os.getenv(key='DB_CACHE_TTL', default='600'))
+DB_CACHE_MAX_BYTES = int(os.getenv(key='DB_CACHE_MAX_BYTES', default='67108864'))
+
+parsing = Parsing(
+    cache_path=PARSING_CACHE_PATH,
+    limiter=RateLimiter(rate=PARSING_RATE_LIMIT, capacity=PARSING_BURST)
+)
+word_lookup = WordLookup(parsing=parsing)
+audio_prefetcher = AudioPrefetcher(parsing=parsing)
+word_jobs = WordJobWorker(workers=WORD_JOB_WORKERS)
 functionality = Functionality()
+vocabulary = VocabularyStore(
+    max_decks=DB_CACHE_ENTRIES,
+    deck_ttl=DB_CACHE_TTL,
+    max_bytes=DB_CACHE_MAX_BYTES
+)
 POS_LIST = ['noun', 'verb', 'adjective']
 
+# Запросы перевода слов, не найденных в Promt:
+# {(ID чата, ID сообщения с запросом): английское слово}.
+# Перевод принимается только ответом на сообщение с запросом,
+# поэтому ответы на карточки не принимаются за перевод
+translation_prompts: dict[tuple[int, int], str] = {}
+translation_prompts_lock = threading.Lock()
+
 
 def start_game_handler(bot: TeleBot, repository: DBRepository) -> None:
 
@@ -54,16 +96,13 @@ def start_game_handler(bot: TeleBot, repository: DBRepository) -> None:
                 user_id=user_id
             )
 
-        user_database = repository.get_user_words(
+        result = vocabulary.get_user_card(
             user_id=user_id,
             pos_name=random.choice(POS_LIST)
         )
 
-        result = functionality.get_random_words(
-            pos_database=user_database
-        )
-
         if result is None:
+            audio_prefetcher.cancel(chat_id)
             bot.send_message(
                 chat_id=chat_id,
                 text="В вашей базе данных недостаточно слов для тренировки. Добавьте больше слов с помощью команды 'Добавить слово ➕'."
@@ -79,6 +118,13 @@ def start_game_handler(bot: TeleBot, repository: DBRepository) -> None:
             ru_example
         ) = result
 
+        # Произношение ищется, пока пользователь выбирает перевод
+        audio_prefetcher.prefetch(
+            owner_id=chat_id,
+            en_word=target_word,
+            transcription=transcription
+        )
+
         global buttons
         buttons, markup = functionality.setup_buttons(
             target_word=target_word,
@@ -139,7 +185,6 @@ def delete_word_handler(bot: TeleBot, repository: DBRepository) -> None:
         cid = message.chat.id
         user_id = message.from_user.id
         user_en_word = message.text.lower()
-        user_database = repository.get_user_words(user_id=user_id)
 
         if user_en_word not in functionality.get_cmd_names():
             check_letters_bool = functionality.check_word_letters(
@@ -158,16 +203,12 @@ def delete_word_handler(bot: TeleBot, repository: DBRepository) -> None:
                 )
 
             else:
-                repository.remove_user_word(
+                removed_count = repository.remove_user_word(
                     user_id=user_id,
                     en_word=user_en_word
                 )
 
-                new_user_database = repository.get_user_words(
-                    user_id=user_id
-                )
-
-                if len(new_user_database) == len(user_database):
+                if not removed_count:
                     bot.send_message(
                         chat_id=cid,
                         text='Введенное слово отсутсвует в базе данных пользователя'
@@ -179,13 +220,13 @@ def delete_word_handler(bot: TeleBot, repository: DBRepository) -> None:
                         text=f'Слово "{user_en_word}" удалено'
                     )
 
-                    unique_words = repository.get_unique_user_words(
+                    words_count = vocabulary.count_user_words(
                         user_id=user_id
                     )
 
                     bot.send_message(
                         chat_id=cid,
-                        text=f'Текущее количество английских слов - {len(unique_words)} шт.'
+                        text=f'Текущее количество английских слов - {words_count} шт.'
                     )
 
         else:
@@ -235,67 +276,37 @@ def add_word_handler(bot: TeleBot, repository: DBRepository) -> None:
                 )
 
                 if check_letters_bool:
-                    user_database = repository.get_user_words(
-                        user_id=user_id
+                    word_exists = vocabulary.has_user_word(
+                        user_id=user_id,
+                        en_word=user_en_word
                     )
 
-                    existing_words = repository.get_unique_user_words(
-                        user_id=user_id
-                    )
-
-                    if user_en_word in existing_words:
+                    if word_exists:
                         bot.send_message(
                             chat_id=cid,
                             text='Английское слово уже существует'
                         )
 
                     else:
-                        new_word_info = parsing.get_word_info(
-                            en_word=user_en_word,
-                            pos_list=POS_LIST,
-                            os_='win',
-                            browser='chrome'
+                        job_id = repository.add_word_job(
+                            user_id=user_id,
+                            chat_id=cid,
+                            en_word=user_en_word
                         )
 
-                        if new_word_info[0].get('ru_word') is None:
-                            data_dict = new_word_info.pop()
-                            data_dict['ru_word'] = ''
-
-                            repository.add_user_word(
-                                user_id=user_id,
-                                data_dict=data_dict
-                            )
-
-                            send_msg = bot.send_message(
+                        if job_id is None:
+                            bot.send_message(
                                 chat_id=cid,
-                                text="Введите перевод английского слова:"
-                            )
-
-                            bot.register_next_step_handler(
-                                message=send_msg,
-                                callback=add_ru_word_callback
+                                text='Английское слово уже добавляется'
                             )
 
                         else:
-                            for word_dict in new_word_info:
-                                repository.add_user_word(
-                                    user_id=user_id,
-                                    data_dict=word_dict
-                                )
-
-                            new_user_database = repository.get_user_words(
-                                user_id=user_id
-                            )
-
-                            if len(user_database) != len(new_user_database):
-                                unique_words = repository.get_unique_user_words(
-                                    user_id=user_id
-                                )
+                            word_jobs.wake()
 
-                                bot.send_message(
-                                    chat_id=cid,
-                                    text=f'Текущее количество английских слов - {len(unique_words)} шт.'
-                                )
+                            bot.send_message(
+                                chat_id=cid,
+                                text=f'Слово {user_en_word} добавляется. Я сообщу, когда найду перевод.'
+                            )
 
                 else:
                     bot.send_message(
@@ -321,74 +332,149 @@ def add_word_handler(bot: TeleBot, repository: DBRepository) -> None:
                     f'Команда {user_en_word} в расчет не берется.'])
             )
 
-    def add_ru_word_callback(message):
-        cid = message.chat.id
-        user_id = message.from_user.id
-        user_ru_word = message.text.lower()
+    def process_word_job(job: dict) -> None:
+        cid = job['chat_id']
+        user_id = job['user_id']
+        en_word = job['en_word']
 
-        user_database = repository.get_user_words(
-            user_id=user_id
+        new_word_info = word_lookup.get_word_info(
+            en_word=en_word,
+            pos_list=POS_LIST,
+            os_='win',
+            browser='chrome'
         )
 
-        last_en_word = user_database[-1].get('en_word')
-
-        data_dict = {
-            'en_word': last_en_word,
-            'en_trans': '',
-            'mp_3_url': '',
-            'pos_name': 'unidentified',
-            'ru_word': user_ru_word,
-            'en_example': '',
-            'ru_example': ''
-        }
+        if new_word_info[0].get('ru_word') is None:
+            # Отсутствие перевода запоминается в кэше Parsing только
+            # после ответа Promt; иначе словарь был недоступен
+            if parsing.get_cached_promt_data(en_word, POS_LIST) is MISSING:
+                raise TransientJobError(f'Promt недоступен: {en_word}')
 
-        check_letters_bool = functionality.check_word_letters(
-            word=user_ru_word,
-            eng_bool=False
-        )
+            data_dict = new_word_info.pop()
+            data_dict['ru_word'] = ''
 
-        if check_letters_bool:
             repository.add_user_word(
                 user_id=user_id,
                 data_dict=data_dict
             )
 
-            unique_words = repository.get_unique_user_words(
+            prompt_msg = bot.send_message(
+                chat_id=cid,
+                text=f'Перевод слова {en_word} не найден. Ответьте на это сообщение переводом английского слова:',
+                reply_markup=types.ForceReply(
+                    input_field_placeholder=f'Перевод слова {en_word}'
+                )
+            )
+
+            with translation_prompts_lock:
+                translation_prompts[(cid, prompt_msg.message_id)] = en_word
+
+        else:
+            changed_pairs = 0
+            for word_dict in new_word_info:
+                add_result = repository.add_user_word(
+                    user_id=user_id,
+                    data_dict=word_dict
+                )
+                changed_pairs += add_result.get('added') + \
+                    add_result.get('reactivated')
+
+            words_count = vocabulary.count_user_words(
                 user_id=user_id
             )
 
             bot.send_message(
                 chat_id=cid,
-                text=f'Текущее количество английских слов - {len(unique_words)} шт.'
+                text=f'Слово {en_word} добавлено. Текущее количество английских слов - {words_count} шт.'
+                if changed_pairs else
+                f'Английское слово {en_word} уже существует'
             )
 
-        else:
-            repository.delete_user_word_pair(
-                user_id=message.from_user.id,
-                en_word=last_en_word
-            )
+    def notify_word_job_failure(job: dict) -> None:
+        bot.send_message(
+            chat_id=job['chat_id'],
+            text=functionality.show_hint(*[
+                f"Не удалось найти перевод слова {job['en_word']}.",
+                '',
+                'Пожалуйста, повторите попытку позже нажатием на кнопку',
+                f'{Command.ADD_WORD.lower()}'])
+        )
 
-            repository.delete_word(
-                data_dict=data_dict
-            )
+    word_jobs.set_handler(
+        handler=process_word_job,
+        failure_handler=notify_word_job_failure
+    )
+
+    def is_translation_reply(message) -> bool:
+        reply_msg = message.reply_to_message
+        if reply_msg is None:
+            return False
+
+        with translation_prompts_lock:
+            return (message.chat.id, reply_msg.message_id) in \
+                translation_prompts
+
+    @bot.message_handler(func=is_translation_reply, content_types=['text'])
+    def add_ru_word(message):
+        cid = message.chat.id
+        user_id = message.from_user.id
+        user_ru_word = message.text.lower()
+        prompt_key = (cid, message.reply_to_message.message_id)
 
+        check_letters_bool = functionality.check_word_letters(
+            word=user_ru_word,
+            eng_bool=False
+        )
+
+        if not check_letters_bool:
             bot.send_message(
                 chat_id=cid,
                 text=functionality.show_hint(*[
                     'В этом случае я принимаю только русские буквы.',
                     '',
-                    'Пожалуйста, повторите попытку нажатием на кнопку',
-                    f'{Command.ADD_WORD.lower()}'])
+                    'Пожалуйста, ответьте на сообщение с запросом',
+                    'перевода еще раз'])
             )
+            return
 
+        with translation_prompts_lock:
+            last_en_word = translation_prompts.pop(prompt_key, None)
 
-def reply_handler(bot: TeleBot) -> None:
+        if last_en_word is None:
+            return
+
+        repository.add_user_word(
+            user_id=user_id,
+            data_dict={
+                'en_word': last_en_word,
+                'en_trans': '',
+                'mp_3_url': '',
+                'pos_name': 'unidentified',
+                'ru_word': user_ru_word,
+                'en_example': '',
+                'ru_example': ''
+            }
+        )
+
+        words_count = vocabulary.count_user_words(
+            user_id=user_id
+        )
+
+        bot.send_message(
+            chat_id=cid,
+            text=f'Текущее количество английских слов - {words_count} шт.'
+        )
+
+
+def reply_handler(bot: TeleBot, repository: DBRepository) -> None:
 
     """
     Формирует отклик на выбор английского слова пользователем чат-бота Telegram.
 
     - bot: объект класса TeleBot, позволяющий выполнять
            функционал чат-бота Telegram (написание сообщения и др.).
+    - repository: экземпляр класса DBRepository. Необходим для
+                  хранения ID MP3-файлов, загруженных в Telegram.
     """
 
     @bot.message_handler(func=lambda message: True, content_types=['text'])
@@ -430,7 +516,9 @@ def reply_handler(bot: TeleBot) -> None:
                 bot=bot,
                 data=data,
                 hint=hint,
-                message=msg
+                message=msg,
+                repository=repository,
+                prefetcher=audio_prefetcher
             )
 
             functionality.get_example(
@@ -476,13 +564,34 @@ def connect_telebot(repository: DBRepository, token: str) -> None:
     )
 
     reply_handler(
-        bot=bot
+        bot=bot,
+        repository=repository
     )
 
     bot.add_custom_filter(
         custom_filter=custom_filters.StateFilter(bot)
     )
 
+    vocabulary.load(
+        repository=repository
+    )
+
+    word_lookup.set_repository(
+        repository=repository
+    )
+
+    word_jobs.set_repository(
+        repository=repository
+    )
+
+    audio_prefetcher.set_repository(
+        repository=repository
+    )
+
+    word_jobs.start()
+
+    audio_index.build()
+
     bot.infinity_polling(
         skip_pending=True
     )
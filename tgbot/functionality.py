@@ -6,9 +6,13 @@ from typing import Optional
 
 import telebot
 from telebot import TeleBot, types
+from telebot.apihelper import ApiTelegramException
 from telebot.asyncio_handler_backends import State, StatesGroup
 
-from filefinder import find_folder
+from database.repository import DBRepository
+from tgbot.audio import get_mp3_name
+from tgbot.parsing import Parsing
+from tgbot.prefetch import AudioPrefetcher, resolve_audio
 
 
 class Command:
@@ -123,62 +127,174 @@ class Functionality:
                 )
 
     def get_mp3_audio(self, bot: TeleBot, data: dict, hint: str,
-                    message: telebot.types.Message) -> None:
+                    message: telebot.types.Message,
+                    repository: Optional[DBRepository] = None,
+                    prefetcher: Optional[AudioPrefetcher] = None) -> None:
 
         """
-        Запускает MP3-файл в чате Telegram.
+        Запускает MP3-файл в чате Telegram. Файл ищется заранее
+        через prefetcher (при показе карточки), и ответ не ждет
+        загрузки: найденный файл отправляется сразу или по завершении
+        поиска. Без prefetcher файл ищется в индексе audio_index
+        и при необходимости скачивается из Oxford.
+
+        Вводные параметры:
+        - bot: объект класса TeleBot
+        - data: словарь с данными, фиксируемыми в памяти бота.
+        - hint: строка, отражающая ответ чат-бота на выбор одного
+               из четырех вариантов слов.
+        - message: объект класса Message, позволяющий определить
+                  ID чата пользователя Telegram.
+        - repository: экземпляр класса DBRepository для хранения ID файлов
+                      (по умолчанию None - файл загружается каждый раз)
+        - prefetcher: экземпляр класса AudioPrefetcher
+                      (по умолчанию None - файл ищется сейчас)
         """
 
         if 'Допущена ошибка!' not in hint:
             word = data['target_word']
             transcription = data['transcription']
 
-            safe_word = re.sub(r'[<>:"/\\|?*]', '', word)
-            safe_transcription = re.sub(r'[<>:"/\\|?*]', '', transcription) if transcription else ""
-
-            if safe_transcription:
-                mp3_name = f"{safe_word} {safe_transcription}.mp3"
-            else:
-                mp3_name = f"{safe_word}.mp3"
-
-            mp3_path = os.path.join(
-                find_folder('eng_audio_files_mp3'),
-                mp3_name
-            )
-
-            if not os.path.exists(mp3_path):
-                from tgbot.parsing import Parsing
-                parsing = Parsing()
-                
-                oxford_data = parsing.receive_oxford_data(
-                    en_word=word,
-                    os_='win',
-                    browser='chrome'
+            def send(audio_dict: dict) -> None:
+                self.send_mp3_audio(
+                    bot=bot,
+                    chat_id=message.chat.id,
+                    word=word,
+                    transcription=transcription,
+                    audio_dict=audio_dict,
+                    repository=repository
                 )
-                
-                if oxford_data.get('mp_3_url'):
-                    parsing.write_user_mp3(
-                        en_word=word,
-                        mp_3_url=oxford_data.get('mp_3_url'),
-                        transcription=transcription,
-                        os_='win',
-                        browser='chrome'
-                    )
 
             try:
-                if os.path.exists(mp3_path):
-                    bot.send_audio(
-                        chat_id=message.chat.id,
-                        audio=open(mp3_path, 'rb'),
-                        title=f"{word}",
-                        performer="Oxford Dictionary"
+                if prefetcher is not None:
+                    prefetcher.when_ready(
+                        owner_id=message.chat.id,
+                        en_word=word,
+                        transcription=transcription,
+                        callback=send
                     )
-                    print(f'MP3 файл отправлен: {mp3_path}')
                 else:
-                    print(f'Аудиофайл не найден: {mp3_path}')
+                    send(resolve_audio(
+                        parsing=Parsing(),
+                        en_word=word,
+                        transcription=transcription,
+                        repository=repository
+                    ))
             except Exception as e:
                 print(f'Ошибка при отправке аудиофайла: {e}')
 
+    def send_mp3_audio(self, bot: TeleBot, chat_id: int, word: str,
+                       transcription: Optional[str], audio_dict: dict,
+                       repository: Optional[DBRepository] = None) -> None:
+
+        """
+        Отправляет найденный MP3-файл в чат Telegram. Файл, ранее
+        загруженный в Telegram, отправляется по сохраненному ID без
+        повторной загрузки. Иначе файл загружается, а его ID сохраняется.
+
+        Вводные параметры:
+        - bot: объект класса TeleBot
+        - chat_id: ID чата Telegram
+        - word: английское слово
+        - transcription: транскрипция английского слова
+        - audio_dict: результат resolve_audio
+        - repository: экземпляр класса DBRepository для хранения ID файлов
+                      (по умолчанию None)
+        """
+
+        mp3_path = audio_dict.get('mp3_path')
+        file_id = audio_dict.get('file_id')
+
+        try:
+            if file_id:
+                if self.send_audio_by_id(bot=bot,
+                                         chat_id=chat_id,
+                                         file_id=file_id,
+                                         title=word):
+                    return
+                if repository is not None:
+                    repository.delete_audio_file_id(
+                        os.path.basename(mp3_path)
+                    )
+
+            file_id = None
+            if mp3_path is not None:
+                file_id = self.upload_audio(
+                    bot=bot,
+                    chat_id=chat_id,
+                    mp3_path=mp3_path,
+                    title=word
+                )
+
+            if file_id is None:
+                print(f'Аудиофайл не найден: {get_mp3_name(word, transcription)}')
+            elif repository is not None:
+                repository.add_audio_file_id(
+                    file_name=os.path.basename(mp3_path),
+                    file_id=file_id
+                )
+        except Exception as e:
+            print(f'Ошибка при отправке аудиофайла: {e}')
+
+    def send_audio_by_id(self, bot: TeleBot, chat_id: int,
+                         file_id: str, title: str) -> bool:
+
+        """
+        Отправляет в чат MP3-файл, ранее загруженный в Telegram.
+
+        Вводные параметры:
+        - bot: объект класса TeleBot
+        - chat_id: ID чата Telegram
+        - file_id: ID файла в Telegram
+        - title: название аудиозаписи
+
+        Выводной параметр:
+        - bool: True - файл отправлен, False - Telegram не принял ID файла
+        """
+
+        try:
+            bot.send_audio(
+                chat_id=chat_id,
+                audio=file_id,
+                title=title,
+                performer="Oxford Dictionary"
+            )
+        except ApiTelegramException as e:
+            if e.error_code == 400:
+                return False
+            raise
+        return True
+
+    def upload_audio(self, bot: TeleBot, chat_id: int,
+                     mp3_path: str, title: str) -> Optional[str]:
+
+        """
+        Загружает MP3-файл в чат Telegram.
+
+        Вводные параметры:
+        - bot: объект класса TeleBot
+        - chat_id: ID чата Telegram
+        - mp3_path: путь к MP3-файлу
+        - title: название аудиозаписи
+
+        Выводной параметр:
+        - ID загруженного файла в Telegram (None при отсутствии MP3-файла)
+        """
+
+        if not os.path.exists(mp3_path):
+            return None
+
+        with open(mp3_path, 'rb') as audio_file:
+            sent_message = bot.send_audio(
+                chat_id=chat_id,
+                audio=audio_file,
+                title=title,
+                performer="Oxford Dictionary"
+            )
+        print(f'MP3 файл отправлен: {mp3_path}')
+
+        return sent_message.audio.file_id
+
     def check_word_letters(self, word: str, eng_bool: bool = True) -> bool:
 
         """
@@ -0,0 +1,256 @@
+"""
+Фоновое заполнение данных слов, добавленных пользователями.
+
+Команда "Добавить слово" только ставит задачу в таблицу word_jobs
+и сразу отвечает пользователю. Перевод, транскрипцию, примеры
+и MP3-файл ищут обработчики WordJobWorker в отдельных потоках.
+Задачи хранятся в БД, поэтому переживают перезапуск чат-бота.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from database.repository import DBRepository
+from tgbot.ratelimit import get_backoff_delay
+
+
+class TransientJobError(Exception):
+
+    """
+    Временная ошибка выполнения задачи (онлайн-словарь недоступен
+    и т.п.). Задача будет повторена позже.
+    """
+
+
+class WordJobWorker:
+
+    def __init__(self, workers: int = 2, poll_interval: float = 1.0,
+                 max_attempts: int = 5, retry_delay: float = 30.0,
+                 max_retry_delay: float = 600.0,
+                 stale_timeout: float = 600.0,
+                 stale_check_interval: float = 60.0,
+                 repository: Optional[DBRepository] = None) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - workers: кол-во потоков-обработчиков (по умолчанию 2)
+        - poll_interval: пауза между проверками очереди в секундах
+                         (по умолчанию 1.0)
+        - max_attempts: кол-во попыток выполнения задачи (по умолчанию 5)
+        - retry_delay: пауза после первой неудачной попытки в секундах
+                       (по умолчанию 30.0)
+        - max_retry_delay: максимальная пауза между попытками в секундах
+                           (по умолчанию 600.0)
+        - stale_timeout: время в секундах, после которого выполняемая
+                         задача считается прерванной (по умолчанию 600.0)
+        - stale_check_interval: пауза между поисками прерванных задач
+                                в секундах (по умолчанию 60.0)
+        - repository: экземпляр класса DBRepository (по умолчанию None)
+        """
+
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.stale_timeout = stale_timeout
+        self.stale_check_interval = stale_check_interval
+        self.repository = repository
+
+        self.handler: Optional[Callable[[dict], None]] = None
+        self.failure_handler: Optional[Callable[[dict], None]] = None
+
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._reset_lock = threading.Lock()
+        self._next_reset_at = 0.0
+
+    def set_repository(self, repository: DBRepository) -> None:
+
+        """
+        Подключает репозиторий с таблицей word_jobs.
+
+        Вводный параметр:
+        - repository: экземпляр класса DBRepository
+        """
+
+        self.repository = repository
+
+    def set_handler(self, handler: Callable[[dict], None],
+                    failure_handler: Optional[Callable[[dict], None]] = None
+                    ) -> None:
+
+        """
+        Задает обработчики задач.
+
+        Вводные параметры:
+        - handler: функция выполнения задачи; получает словарь из
+                   DBRepository.claim_word_job. Для повторной попытки
+                   функция вызывает исключение
+        - failure_handler: функция, вызываемая после исчерпания попыток
+                           (по умолчанию None)
+        """
+
+        self.handler = handler
+        self.failure_handler = failure_handler
+
+    def start(self) -> None:
+
+        """
+        Возвращает в очередь задачи в состоянии running, не обновлявшиеся
+        дольше stale_timeout, и запускает потоки-обработчики.
+        """
+
+        if self._threads:
+            return
+
+        # Задачи в состоянии running могут выполняться другим запущенным
+        # экземпляром чат-бота, поэтому прерванными считаются только
+        # задачи старше stale_timeout
+        self.reset_stale_jobs(timeout=self.stale_timeout)
+        self._next_reset_at = time.monotonic() + self.stale_check_interval
+
+        self._stop_event.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self.run,
+                name=f'word-job-worker-{number}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+
+        """
+        Останавливает потоки-обработчики после выполнения текущих задач.
+
+        Вводный параметр:
+        - timeout: время ожидания каждого потока в секундах
+                   (по умолчанию None - без ограничения)
+        """
+
+        self._stop_event.set()
+        self._wake_event.set()
+
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+
+        """
+        Сообщает обработчикам о новой задаче, не дожидаясь
+        очередной проверки очереди.
+        """
+
+        self._wake_event.set()
+
+    def reset_stale_jobs(self, timeout: float) -> int:
+
+        """
+        Возвращает в очередь задачи, находящиеся в состоянии running
+        дольше timeout секунд.
+
+        Вводный параметр:
+        - timeout: время в секундах, после которого задача
+                   считается прерванной
+
+        Выводной параметр:
+        - кол-во возвращенных в очередь задач
+        """
+
+        reset_count = self.repository.reset_stale_word_jobs(timeout=timeout)
+        if reset_count:
+            print(f'Возвращено в очередь задач: {reset_count}')
+        return reset_count
+
+    def check_stale_jobs(self) -> None:
+
+        """
+        Раз в stale_check_interval секунд возвращает в очередь задачи,
+        зависшие дольше stale_timeout секунд. Проверку выполняет
+        один из потоков-обработчиков.
+        """
+
+        now = time.monotonic()
+        with self._reset_lock:
+            if now < self._next_reset_at:
+                return
+            self._next_reset_at = now + self.stale_check_interval
+
+        self.reset_stale_jobs(timeout=self.stale_timeout)
+
+    def run(self) -> None:
+
+        """
+        Цикл потока-обработчика: выполняет задачи, пока они есть,
+        затем ждет новую задачу не дольше poll_interval секунд.
+        Периодически возвращает в очередь зависшие задачи.
+        """
+
+        while not self._stop_event.is_set():
+            try:
+                self.check_stale_jobs()
+                has_job = self.process_next()
+            except Exception as e:
+                print(f'Ошибка чтения очереди word_jobs: {e}')
+                has_job = False
+
+            if not has_job:
+                self._wake_event.wait(self.poll_interval)
+                self._wake_event.clear()
+
+    def process_next(self) -> bool:
+
+        """
+        Забирает из очереди и выполняет одну задачу. Неудачная попытка
+        повторяется с экспоненциально растущей паузой; после max_attempts
+        попыток задача помечается как неудавшаяся.
+
+        Выводной параметр:
+        - bool: True - задача была взята в работу, False - очередь пуста
+        """
+
+        job = self.repository.claim_word_job()
+        if job is None:
+            return False
+
+        try:
+            self.handler(job)
+
+        except Exception as error:
+            error_text = f'{type(error).__name__}: {error}'
+
+            if job['attempts'] < self.max_attempts:
+                print(f"Задача {job['id']} будет повторена: {error_text}")
+                self.repository.retry_word_job(
+                    job_id=job['id'],
+                    delay=get_backoff_delay(
+                        attempt=job['attempts'] - 1,
+                        base=self.retry_delay,
+                        max_delay=self.max_retry_delay,
+                        random_func=lambda low, high:
+                        random.uniform(high / 2, high)
+                    ),
+                    error=error_text
+                )
+
+            else:
+                print(f"Задача {job['id']} не выполнена: {error_text}")
+                self.repository.fail_word_job(
+                    job_id=job['id'],
+                    error=error_text
+                )
+                if self.failure_handler is not None:
+                    self.failure_handler(job)
+
+        else:
+            self.repository.complete_word_job(
+                job_id=job['id']
+            )
+
+        return True
@@ -0,0 +1,108 @@
+"""
+Многоуровневый поиск перевода английского слова.
+
+1. Таблица words: слово уже добавлено разработчиком
+   или другим пользователем.
+2. Кэш результатов парсинга на диске (см. Parsing.cache).
+3. Онлайн-словари Promt и Oxford.
+"""
+
+import threading
+from typing import Optional
+
+from database.repository import DBRepository
+from tgbot.parsing import Parsing
+
+
+class WordLookup:
+
+    def __init__(self, parsing: Parsing,
+                 repository: Optional[DBRepository] = None) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - parsing: экземпляр класса Parsing
+        - repository: экземпляр класса DBRepository
+                      (по умолчанию None - таблица words не используется)
+        """
+
+        self.parsing = parsing
+        self.repository = repository
+
+        self._lock = threading.Lock()
+        self.database_hits = 0
+        self.parsing_lookups = 0
+
+    def set_repository(self, repository: DBRepository) -> None:
+
+        """
+        Подключает репозиторий для поиска слов в таблице words.
+
+        Вводный параметр:
+        - repository: экземпляр класса DBRepository
+        """
+
+        self.repository = repository
+
+    def get_word_info(self, en_word: str, pos_list: list,
+                      os_: str, browser: str) -> list[dict]:
+
+        """
+        Выводит обобщающую информацию об английском слове
+        в формате Parsing.get_word_info.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - pos_list: список учитываемых частей речи
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - список словарей с данными английского слова
+        """
+
+        if self.repository is not None:
+            word_list = [
+                word_dict
+                for word_dict in self.repository.get_word_info(en_word)
+                if word_dict.get('pos_name') in pos_list
+            ]
+
+            if word_list:
+                with self._lock:
+                    self.database_hits += 1
+                return word_list
+
+        with self._lock:
+            self.parsing_lookups += 1
+
+        return self.parsing.get_word_info(
+            en_word=en_word,
+            pos_list=pos_list,
+            os_=os_,
+            browser=browser
+        )
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели поиска.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- database: кол-во слов, найденных в таблице words
+            -- parsing: кол-во слов, переданных в Parsing
+            -- cache_hits: кол-во результатов Parsing, взятых из кэша
+            -- cache_misses: кол-во промахов кэша Parsing
+            -- promt: кол-во обращений к Promt по сети
+            -- oxford: кол-во обращений к Oxford по сети
+        """
+
+        with self._lock:
+            lookup_stats = {
+                'database': self.database_hits,
+                'parsing': self.parsing_lookups
+            }
+
+        lookup_stats.update(self.parsing.get_lookup_stats())
+        return lookup_stats
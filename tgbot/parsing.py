@@ -1,21 +1,234 @@
 import os
 import re
+import tempfile
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, UnicodeDammit
 from fake_headers import Headers
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
 
-from filefinder import find_folder
+from cache import DiskCache, LRUCache, MISSING
+from tgbot.audio import audio_index
+from tgbot.ratelimit import RateLimiter
+
+PROMT_URL = 'https://www.online-translator.com/translation/english-russian/'
+OXFORD_URL = 'https://www.oxfordlearnersdictionaries.com/definition/english/'
+
+MAX_MP3_SIZE = 50 * 1024 * 1024
+MP3_CHUNK_SIZE = 64 * 1024
+MP3_CONTENT_TYPES = ('audio/', 'application/octet-stream',
+                     'binary/octet-stream')
+
+
+def is_mp3_header(header: bytes) -> bool:
+
+    """
+    Проверяет начало файла: тег ID3 или синхрослово MPEG-кадра.
+
+    Вводный параметр:
+    - header: первые байты файла
+
+    Выводной параметр:
+    - bool: True - начало похоже на MP3-файл, False - наоборот
+    """
+
+    if header.startswith(b'ID3'):
+        return True
+    return len(header) >= 2 and header[0] == 0xFF and \
+        header[1] & 0xE0 == 0xE0
+
+
+def check_mp3_headers(headers: dict, max_size: int) -> bool:
+
+    """
+    Проверяет заголовки ответа на запрос MP3-файла:
+    тип содержимого и объем (при их наличии).
+
+    Вводные параметры:
+    - headers: заголовки ответа
+    - max_size: максимальный объем файла в байтах
+
+    Выводной параметр:
+    - bool: True - загрузку можно продолжать, False - наоборот
+    """
+
+    content_type = (headers.get('Content-Type') or '').lower()
+    if content_type and not content_type.startswith(MP3_CONTENT_TYPES):
+        return False
+
+    content_length = headers.get('Content-Length') or ''
+    return not (content_length.isdigit() and int(content_length) > max_size)
+
+
+def get_class_xpath(tag: str, class_name: str) -> etree.XPath:
+
+    """
+    Выводит XPath-выражение для поиска потомков с заданным классом
+    (аналог find_all(tag, attrs={'class': class_name}) в BeautifulSoup).
+
+    Вводные параметры:
+    - tag: название тега
+    - class_name: название класса
+
+    Выводной параметр:
+    - скомпилированное XPath-выражение
+    """
+
+    if ' ' in class_name:
+        condition = f"normalize-space(@class)='{class_name}'"
+    else:
+        condition = (
+            f"contains(concat(' ', normalize-space(@class), ' '), "
+            f"' {class_name} ')"
+        )
+    return etree.XPath(f'.//{tag}[{condition}]')
+
+
+PROMT_RESULT_XPATH = get_class_xpath('div', 'cforms_result')
+PROMT_ITEM_XPATH = get_class_xpath('div', 'translation-item')
+PROMT_POS_XPATH = get_class_xpath('span', 'ref_psp')
+PROMT_WORD_XPATH = get_class_xpath('span', 'result_only sayWord')
+PROMT_EN_EXAMPLE_XPATH = get_class_xpath('div', 'samSource')
+PROMT_RU_EXAMPLE_XPATH = get_class_xpath('div', 'samTranslation')
+PROMT_TRANS_XPATH = get_class_xpath('span', 'transcription')
+OXFORD_WEBTOP_XPATH = get_class_xpath('div', 'webtop')
+OXFORD_PRON_XPATH = get_class_xpath('div', 'pron-uk')
+
+
+def get_html_tree(content: bytes) -> Optional[html.HtmlElement]:
+
+    """
+    Разбирает HTML-страницу средствами lxml. Кодировка страницы
+    определяется так же, как в BeautifulSoup.
+
+    Вводный параметр:
+    - content: содержимое страницы
+
+    Выводной параметр:
+    - корневой элемент страницы (None - страница пустая)
+    """
+
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    try:
+        return html.document_fromstring(markup)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def get_first_text(element: html.HtmlElement,
+                   xpath: etree.XPath) -> Optional[str]:
+
+    """
+    Выводит текст первого найденного потомка
+    (аналог find(...).text в BeautifulSoup).
+
+    Вводные параметры:
+    - element: элемент, среди потомков которого ищем
+    - xpath: XPath-выражение поиска
+
+    Выводной параметр:
+    - текст элемента (None - элемент не найден)
+    """
+
+    found = xpath(element)
+    return found[0].text_content() if found else None
 
 
 class Parsing:
 
+    def __init__(self, cache_path: Optional[str] = None,
+                 cache_ttl: Optional[float] = 30 * 24 * 60 * 60,
+                 negative_ttl: Optional[float] = 24 * 60 * 60,
+                 negative_entries: int = 4096,
+                 promt_url: str = PROMT_URL,
+                 oxford_url: str = OXFORD_URL,
+                 pool_size: int = 10,
+                 header_pool_size: int = 20,
+                 max_workers: int = 8,
+                 max_mp3_size: int = MAX_MP3_SIZE,
+                 limiter: Optional[RateLimiter] = None) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - cache_path: путь к файлу SQLite с результатами парсинга
+                      (по умолчанию None - результаты не кэшируются)
+        - cache_ttl: время жизни результата в секундах (по умолчанию 30 суток)
+        - negative_ttl: время жизни отметки об отсутствии слова в словаре
+                        в секундах (по умолчанию 1 сутки)
+        - negative_entries: максимальное кол-во таких отметок
+                            (по умолчанию 4096)
+        - promt_url: адрес страницы перевода онлайн-словаря Promt
+        - oxford_url: адрес страницы слова онлайн-словаря Oxford
+        - pool_size: максимальное кол-во открытых соединений
+                     с одним сайтом (по умолчанию 10)
+        - header_pool_size: кол-во заранее созданных заголовков
+                            для каждой пары ОС и браузера (по умолчанию 20)
+        - max_workers: кол-во потоков для параллельных запросов
+                       (по умолчанию 8)
+        - max_mp3_size: максимальный объем MP3-файла в байтах
+                        (по умолчанию 50 МБ - ограничение Telegram)
+        - limiter: ограничение частоты запросов к сайтам
+                   (по умолчанию None - без ограничения)
+        """
+
+        self.cache = DiskCache(cache_path, ttl=cache_ttl) \
+            if cache_path else None
+        self.negative_cache = LRUCache(
+            max_entries=negative_entries,
+            ttl=negative_ttl
+        )
+        self.network_lookups = {'promt': 0, 'oxford': 0}
+
+        self.promt_url = promt_url
+        self.oxford_url = oxford_url
+        self.pool_size = pool_size
+        self.header_pool_size = header_pool_size
+        self.max_workers = max_workers
+        self.max_mp3_size = max_mp3_size
+        self.limiter = limiter
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sessions: dict[str, requests.Session] = {}
+        self._header_pool: dict[tuple, list] = {}
+        self._header_index = 0
+
+    def get_lookup_stats(self) -> dict:
+
+        """
+        Выводит показатели обращений к онлайн-словарям.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- cache_hits: кол-во результатов, взятых из кэша
+            -- cache_misses: кол-во промахов кэша
+            -- negative_hits: кол-во повторных запросов слов,
+                              отсутствующих в словарях
+            -- promt: кол-во обращений к Promt по сети
+            -- oxford: кол-во обращений к Oxford по сети
+        """
+
+        cache_stats = self.cache.get_stats() if self.cache else {}
+
+        return {
+            'cache_hits': cache_stats.get('hits', 0),
+            'cache_misses': cache_stats.get('misses', 0),
+            'negative_hits': self.negative_cache.hits,
+            **self.network_lookups
+        }
+
     def get_headers(self, os_: str, browser: str) -> dict:
 
         """
-        Выводит фейковые заголовки пакета fake_headers.
+        Выводит фейковые заголовки пакета fake_headers. Заголовки
+        создаются один раз для каждой пары ОС и браузера
+        и выдаются по кругу.
 
         Вводные параметры:
         - os_: сокращенное название операционной системы
@@ -25,14 +238,106 @@ class Parsing:
         - словарь-заголовок для работы с HTTP запросами
         """
 
-        return Headers(os=os_, browser=browser).generate()
+        with self._lock:
+            header_list = self._header_pool.get((os_, browser))
+            if header_list is None:
+                header_list = [
+                    Headers(os=os_, browser=browser).generate()
+                    for _ in range(self.header_pool_size)
+                ]
+                self._header_pool[(os_, browser)] = header_list
 
-    def get_promt_soup(self, promt_url: str, en_word: str,
+            self._header_index += 1
+            return dict(header_list[self._header_index % len(header_list)])
+
+    def get_session(self, url: str) -> requests.Session:
+
+        """
+        Выводит HTTP-сессию для сайта из URL-ссылки. Сессия хранит
+        до pool_size открытых соединений, которые переиспользуются
+        следующими запросами к тому же сайту.
+
+        Вводный параметр:
+        - url: URL-ссылка
+
+        Выводной параметр:
+        - объект класса requests.Session
+        """
+
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+
+        return session
+
+    def wait_for_limit(self, url: str) -> None:
+
+        """
+        Дожидается разрешения limiter на запрос к сайту
+        (при наличии limiter).
+
+        Вводный параметр:
+        - url: URL-ссылка запроса
+        """
+
+        if self.limiter is not None:
+            self.limiter.acquire(url)
+
+    def get_executor(self) -> ThreadPoolExecutor:
+
+        """
+        Выводит пул потоков для параллельных запросов
+        (создается при первом обращении).
+
+        Выводной параметр:
+        - объект класса ThreadPoolExecutor
+        """
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='parsing'
+                )
+            return self._executor
+
+    def close(self) -> None:
+
+        """
+        Закрывает HTTP-сессии, их соединения, пул потоков
+        и файл кэша.
+        """
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        for session in sessions:
+            session.close()
+
+        if self.cache is not None:
+            self.cache.close()
+
+    def get_promt_page(self, promt_url: str, en_word: str,
                        os_: str, browser: str, attempts: int,
-                       error_timeout: int) -> Optional[BeautifulSoup]:
+                       error_timeout: int) -> Optional[bytes]:
 
         """
-        Выводит экземпляр класса BeautifulSoup.
+        Выводит содержимое страницы перевода Promt.
 
         Вводные параметры:
         - promt_url: ссылка на сайт онлайн-словаря Promt
@@ -43,22 +348,24 @@ class Parsing:
         - error_timeout: кол-во секунд ожидания в случае неудачной попытки
 
         Выводной параметр:
-        - soup: экземпляр класса BeautifulSoup (в случае удачного GET-запроса)
+        - содержимое страницы (в случае удачного GET-запроса,
+          None - при ответе 429 или 5xx)
         """
 
         attempt_count = 0
         for _ in list(range(1, attempts + 1)):
             if attempts >= attempt_count:
                 try:
-                    resp = requests.get(
+                    self.wait_for_limit(promt_url)
+                    resp = self.get_session(promt_url).get(
                         url=promt_url + en_word,
                         timeout=10,
                         headers=self.get_headers(os_, browser)
                     )
-                    return BeautifulSoup(
-                        markup=resp.content,
-                        features="lxml"
-                    )
+                    if resp.status_code == 429 or resp.status_code >= 500:
+                        print(f'HTTP {resp.status_code}: {promt_url + en_word}')
+                        return None
+                    return resp.content
                 except (requests.exceptions.ConnectTimeout,
                         requests.exceptions.ReadTimeout,
                         requests.exceptions.ConnectionError):
@@ -68,6 +375,42 @@ class Parsing:
             else:
                 return None
 
+    def get_promt_soup(self, promt_url: str, en_word: str,
+                       os_: str, browser: str, attempts: int,
+                       error_timeout: int) -> Optional[BeautifulSoup]:
+
+        """
+        Выводит экземпляр класса BeautifulSoup.
+
+        Вводные параметры:
+        - promt_url: ссылка на сайт онлайн-словаря Promt
+        - en_word: английское слово, которое хотим перевести в Promt
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+        - attempts: кол-во попыток реализации get-запроса по URL-ссылке
+        - error_timeout: кол-во секунд ожидания в случае неудачной попытки
+
+        Выводной параметр:
+        - soup: экземпляр класса BeautifulSoup (в случае удачного GET-запроса,
+                None - при ответе 429 или 5xx)
+        """
+
+        content = self.get_promt_page(
+            promt_url=promt_url,
+            en_word=en_word,
+            os_=os_,
+            browser=browser,
+            attempts=attempts,
+            error_timeout=error_timeout
+        )
+
+        if content is None:
+            return None
+        return BeautifulSoup(
+            markup=content,
+            features="lxml"
+        )
+
     def parse_promt(self, soup: BeautifulSoup) -> dict:
 
         """
@@ -121,6 +464,54 @@ class Parsing:
 
         return pos_dict
 
+    def extract_promt(self, content: bytes) -> dict:
+
+        """
+        Быстрый аналог parse_promt: страница Promt разбирается
+        lxml без построения дерева BeautifulSoup, а нужные элементы
+        выбираются скомпилированными XPath-выражениями.
+
+        Вводный параметр:
+        - content: содержимое страницы Promt
+
+        Выводной параметр:
+        - pos_dict: словарь в формате parse_promt
+        """
+
+        tree = get_html_tree(content)
+        if tree is None:
+            return {}
+
+        pos_dict = {}
+        for item in PROMT_RESULT_XPATH(tree):
+            item_list = PROMT_ITEM_XPATH(item)
+            if not item_list:
+                continue
+
+            pos = get_first_text(item, PROMT_POS_XPATH)
+            trans = get_first_text(item, PROMT_TRANS_XPATH)
+
+            for item2 in item_list:
+                word = get_first_text(item2, PROMT_WORD_XPATH)
+                if pos is None or word is None:
+                    raise AttributeError(
+                        "'NoneType' object has no attribute 'text'"
+                    )
+
+                en_example = get_first_text(item2, PROMT_EN_EXAMPLE_XPATH)
+                ru_example = get_first_text(item2, PROMT_RU_EXAMPLE_XPATH)
+                if en_example is None or ru_example is None:
+                    en_example, ru_example = None, None
+
+                pos_dict.setdefault(pos, []).append({
+                    'word': word,
+                    'transcription': trans,
+                    'en_example': en_example,
+                    'ru_example': ru_example
+                })
+
+        return pos_dict
+
     def receive_promt_data(self, en_word: str, pos_list: list,
                            os_: str, browser: str,
                            attempts: int = 3,
@@ -128,6 +519,10 @@ class Parsing:
 
         """
         Выводит перевод английского слова в разрезе отдельных частей речи.
+        Найденный перевод сохраняется в кэш (при его наличии),
+        и повторный запрос к Promt не выполняется. Отсутствие перевода
+        в ответе Promt запоминается на negative_ttl секунд; ошибки
+        соединения не запоминаются.
 
         Вводные параметры:
         - en_word: английское слово, которое хотим перевести в Promt
@@ -142,8 +537,14 @@ class Parsing:
         отдельных частей речи (в случае удачной реализации GET-запроса)
         """
 
-        soup = self.get_promt_soup(
-            promt_url='https://www.online-translator.com/translation/english-russian/',
+        cached_data = self.get_cached_promt_data(en_word, pos_list)
+        if cached_data is not MISSING:
+            return cached_data
+
+        self.count_network_lookup('promt')
+
+        content = self.get_promt_page(
+            promt_url=self.promt_url,
             en_word=en_word,
             os_=os_,
             browser=browser,
@@ -151,17 +552,62 @@ class Parsing:
             error_timeout=error_timeout
         )
 
-        if not soup:
-            dict_translation = None
-        else:
-            dict_translation = {en_word: self.parse_promt(soup)}
+        return self.store_promt_data(
+            en_word=en_word,
+            pos_list=pos_list,
+            pos_dict=self.extract_promt(content)
+            if content is not None else None
+        )
+
+    def get_cached_promt_data(self, en_word: str, pos_list: list) -> Any:
+
+        """
+        Выводит перевод английского слова из кэша.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - pos_list: список учитываемых частей речи
+
+        Выводной параметр:
+        - данные в формате receive_promt_data (MISSING - слова нет в кэше)
+        """
+
+        if self.cache is not None:
+            cached_data = self.cache.get(
+                f"promt:{en_word}:{','.join(pos_list)}"
+            )
+            if cached_data is not MISSING:
+                return cached_data
+
+        if self.negative_cache.get(('promt', en_word, tuple(pos_list)),
+                                   False):
+            return self.get_unidentified_data(en_word)
+
+        return MISSING
+
+    def store_promt_data(self, en_word: str, pos_list: list,
+                         pos_dict: Optional[dict]) -> list[dict]:
+
+        """
+        Отбирает перевод английского слова по частям речи и сохраняет
+        его в кэш. Отсутствие перевода в ответе Promt сохраняется
+        в кэш отсутствующих слов.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - pos_list: список учитываемых частей речи
+        - pos_dict: результат extract_promt (None - ответ Promt не получен)
+
+        Выводной параметр:
+        - данные в формате receive_promt_data
+        """
 
         word_data = []
         for pos in pos_list:
 
             try:
-                dict_pos = dict_translation[en_word][pos][0]
-            except KeyError:
+                dict_pos = pos_dict[pos][0]
+            except (KeyError, TypeError):
                 dict_pos = {}
 
             if dict_pos:
@@ -175,23 +621,66 @@ class Parsing:
                 })
 
         if word_data:
+            if self.cache is not None:
+                self.cache.set(
+                    f"promt:{en_word}:{','.join(pos_list)}",
+                    word_data
+                )
             return word_data
         else:
-            return [{
-                'en_word': en_word,
-                'en_trans': '',
-                'ru_word': None,
-                'pos_name': 'unidentified',
-                'en_example': 'No example',
-                'ru_example': 'Пример отсутствует',
-            }]
+            if pos_dict is not None:
+                self.negative_cache.set(
+                    ('promt', en_word, tuple(pos_list)),
+                    True
+                )
+            return self.get_unidentified_data(en_word)
+
+    def count_network_lookup(self, source: str) -> None:
+
+        """
+        Учитывает обращение к онлайн-словарю по сети.
+
+        Вводный параметр:
+        - source: название словаря (promt или oxford)
+        """
+
+        with self._lock:
+            self.network_lookups[source] += 1
+
+    def get_unidentified_data(self, en_word: str) -> list[dict]:
+
+        """
+        Выводит данные английского слова, перевод которого не найден.
+
+        Вводный параметр:
+        - en_word: английское слово
+
+        Выводной параметр:
+        - список из одного словаря с частью речи unidentified
+        """
+
+        return [{
+            'en_word': en_word,
+            'en_trans': '',
+            'ru_word': None,
+            'pos_name': 'unidentified',
+            'en_example': 'No example',
+            'ru_example': 'Пример отсутствует',
+        }]
 
     def receive_oxford_data(self, en_word: str, os_: str,
                             browser: str) -> dict:
 
         """
         Выводит ссылку на MP3-файл с произношением
-        английского слова. Ссылка парсится из онлайн-словаря Oxford.
+        английского слова. Ссылка парсится из онлайн-словаря Oxford:
+        страницы слова запрашиваются по очереди в порядке
+        get_oxford_url_list, и следующая страница запрашивается только
+        если на предыдущей ссылки нет. Так слово, найденное на основной
+        странице, стоит одного запроса.
+        Найденная ссылка сохраняется в кэш (при его наличии).
+        Если все страницы слова ответили 2xx или 404 без ссылки,
+        отсутствие ссылки запоминается на negative_ttl секунд.
 
         Вводные параметры:
         - en_word: английское слово, которое хотим найти
@@ -203,56 +692,209 @@ class Parsing:
         - словарь, содержащий ссылку на MP3-файл
         """
 
-        oxford_url = f'https://www.oxfordlearnersdictionaries.com/definition/english/{en_word}'
+        cached_data = self.get_cached_oxford_data(en_word)
+        if cached_data is not MISSING:
+            return cached_data
+
+        self.count_network_lookup('oxford')
+
+        is_missing = True
+        for url in self.get_oxford_url_list(en_word):
+            mp_3_url, is_url_missing = self.receive_oxford_url(
+                url, os_, browser
+            )
+
+            if mp_3_url:
+                return self.store_oxford_data(en_word, mp_3_url)
 
-        oxford_url_list = [
+            is_missing = is_missing and is_url_missing
+
+        return self.store_oxford_data(en_word, None, is_missing)
+
+    def get_oxford_url_list(self, en_word: str) -> list[str]:
+
+        """
+        Выводит ссылки на варианты страницы слова в онлайн-словаре Oxford.
+
+        Вводный параметр:
+        - en_word: английское слово
+
+        Выводной параметр:
+        - список ссылок
+        """
+
+        oxford_url = f'{self.oxford_url}{en_word}'
+
+        return [
             oxford_url,
             oxford_url + "_1",
             oxford_url + "_2",
             oxford_url + "_3"
         ]
 
-        for url in oxford_url_list:
-            headers = self.get_headers(os_, browser)
-            resp = requests.get(url, headers=headers)
+    def get_cached_oxford_data(self, en_word: str) -> Any:
 
-            if 200 <= int(resp.status_code) < 300:
-                soup = BeautifulSoup(
-                    markup=resp.content,
-                    features="lxml"
-                )
+        """
+        Выводит ссылку на MP3-файл английского слова из кэша.
+
+        Вводный параметр:
+        - en_word: английское слово
+
+        Выводной параметр:
+        - данные в формате receive_oxford_data (MISSING - слова нет в кэше)
+        """
+
+        if self.cache is not None:
+            cached_data = self.cache.get(f"oxford:{en_word}")
+            if cached_data is not MISSING:
+                return cached_data
+
+        if self.negative_cache.get(('oxford', en_word), False):
+            return {"mp_3_url": ''}
 
-                for item in soup.findAll(name="div", attrs={"class": "webtop"}):
-                    try:
-                        mp3_find = item.find(
-                            name='div',
-                            attrs={'class': 'pron-uk'}
-                        )
+        return MISSING
 
-                        mp_3_url = re.search(
-                            pattern=r"mp3=(.+mp3.)",
-                            string=str(mp3_find)
-                        ).group(1)
+    def store_oxford_data(self, en_word: str, mp_3_url: Optional[str],
+                          is_missing: bool = False) -> dict:
 
-                        mp_3_url = mp_3_url. \
-                            replace('"', '')
+        """
+        Сохраняет найденную ссылку на MP3-файл в кэш,
+        а подтвержденное отсутствие ссылки - в кэш отсутствующих слов.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - mp_3_url: ссылка на MP3-файл (None - ссылка не найдена)
+        - is_missing: True - все страницы слова ответили 2xx или 404
+                      (по умолчанию False)
 
-                        if mp_3_url:
-                            return {"mp_3_url": mp_3_url}
+        Выводной параметр:
+        - данные в формате receive_oxford_data
+        """
 
-                    except AttributeError:
-                        pass
+        if mp_3_url:
+            if self.cache is not None:
+                self.cache.set(f"oxford:{en_word}", {"mp_3_url": mp_3_url})
+            return {"mp_3_url": mp_3_url}
 
+        if is_missing:
+            self.negative_cache.set(('oxford', en_word), True)
         return {"mp_3_url": ''}
 
+    def receive_oxford_url(self, url: str, os_: str,
+                           browser: str) -> tuple:
+
+        """
+        Парсит ссылку на MP3-файл с одной страницы онлайн-словаря Oxford.
+
+        Вводные параметры:
+        - url: ссылка на страницу слова
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - кортеж (ссылка на MP3-файл или None, True - страница ответила
+          2xx или 404, False - ошибка соединения или другой ответ)
+        """
+
+        self.wait_for_limit(url)
+
+        try:
+            resp = self.get_session(url).get(
+                url,
+                headers=self.get_headers(os_, browser),
+                timeout=10
+            )
+        except requests.exceptions.RequestException:
+            print(f'requests.exceptions: {url}')
+            return None, False
+
+        if not 200 <= int(resp.status_code) < 300:
+            return None, int(resp.status_code) == 404
+
+        return self.extract_oxford(resp.content), True
+
+    def parse_oxford(self, soup: BeautifulSoup) -> Optional[str]:
+
+        """
+        Парсит страницу онлайн-словаря Oxford.
+
+        Вводный параметр:
+        - soup: экземпляр класса BeautifulSoup
+
+        Выводной параметр:
+        - ссылка на MP3-файл с британским произношением (None - не найдена)
+        """
+
+        for item in soup.findAll(name="div", attrs={"class": "webtop"}):
+            try:
+                mp3_find = item.find(
+                    name='div',
+                    attrs={'class': 'pron-uk'}
+                )
+
+                mp_3_url = re.search(
+                    pattern=r"mp3=(.+mp3.)",
+                    string=str(mp3_find)
+                ).group(1)
+
+                mp_3_url = mp_3_url. \
+                    replace('"', '')
+
+                if mp_3_url:
+                    return mp_3_url
+
+            except AttributeError:
+                pass
+
+        return None
+
+    def extract_oxford(self, content: bytes) -> Optional[str]:
+
+        """
+        Быстрый аналог parse_oxford на lxml и XPath.
+
+        Вводный параметр:
+        - content: содержимое страницы Oxford
+
+        Выводной параметр:
+        - ссылка на MP3-файл с британским произношением (None - не найдена)
+        """
+
+        tree = get_html_tree(content)
+        if tree is None:
+            return None
+
+        for item in OXFORD_WEBTOP_XPATH(tree):
+            pron_list = OXFORD_PRON_XPATH(item)
+            if not pron_list:
+                continue
+
+            match = re.search(
+                pattern=r"mp3=(.+mp3.)",
+                string=etree.tostring(
+                    pron_list[0],
+                    encoding='unicode',
+                    with_tail=False
+                )
+            )
+
+            if match:
+                mp_3_url = match.group(1).replace('"', '')
+                if mp_3_url:
+                    return mp_3_url
+
+        return None
+
     def write_mp3(self, url: str, file_path: str,
                   os_: str, browser: str,
                   attempts: int,
-                  error_timeout: int) -> bool:
+                  error_timeout: int,
+                  cancel_event: Optional[threading.Event] = None) -> bool:
 
         """
-        Читает MP3-файл по URL-ссылке и
-        записывает его по заданному пути.
+        Читает MP3-файл по URL-ссылке частями во временный файл
+        и переносит его по заданному пути. Загрузка прерывается, если
+        ответ не похож на MP3-файл или превышает max_mp3_size байт.
 
         Вводные параметры:
         - url: URL-ссылка на MP3-файл
@@ -261,69 +903,136 @@ class Parsing:
         - browser: название браузера
         - attempts: кол-во попыток реализации get-запроса по URL-ссылке
         - error_timeout: кол-во секунд ожидания в случае неудачной попытки
+        - cancel_event: событие отмены загрузки (по умолчанию None)
 
         Выводной параметр:
         - bool: True - MP3-файл записан, False - наоборот
         """
 
-        attempt_count = 0
-        for _ in list(range(1, attempts + 1)):
-            if attempts >= attempt_count:
-                try:
-                    resp = requests.get(
-                        url=url,
-                        headers=self.get_headers(os_, browser),
-                        timeout=10
-                    )
+        for _ in range(attempts):
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+
+            try:
+                self.wait_for_limit(url)
+                with self.get_session(url).get(
+                    url=url,
+                    headers=self.get_headers(os_, browser),
+                    timeout=10,
+                    stream=True
+                ) as resp:
                     resp.raise_for_status()
-                    with open(file_path, "wb") as file:
-                        file.write(resp.content)
-                    return True
-                except (requests.exceptions.ConnectTimeout,
-                        requests.exceptions.ReadTimeout,
-                        requests.exceptions.ConnectionError):
-                    print(f'requests.exceptions: {url}')
-                    time.sleep(error_timeout)
-            else:
+                    return self.stream_mp3(
+                        resp=resp,
+                        file_path=file_path,
+                        cancel_event=cancel_event
+                    )
+            except requests.exceptions.HTTPError as e:
+                print(f'HTTP {e.response.status_code}: {url}')
                 return False
+            except (requests.exceptions.ConnectTimeout,
+                    requests.exceptions.ReadTimeout,
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError):
+                print(f'requests.exceptions: {url}')
+                time.sleep(error_timeout)
+
+        return False
+
+    def stream_mp3(self, resp: requests.Response, file_path: str,
+                   cancel_event: Optional[threading.Event] = None) -> bool:
+
+        """
+        Записывает тело ответа во временный файл рядом с file_path
+        и переносит его на место через os.replace. При ошибке
+        временный файл удаляется, а file_path не изменяется.
+
+        Вводные параметры:
+        - resp: ответ на GET-запрос с stream=True
+        - file_path: путь, по которому хотим записать файл
+        - cancel_event: событие отмены загрузки (по умолчанию None)
+
+        Выводной параметр:
+        - bool: True - MP3-файл записан, False - наоборот
+        """
+
+        if not check_mp3_headers(resp.headers, self.max_mp3_size):
+            print(f'Ответ не является MP3-файлом: {resp.url}')
+            return False
+
+        file_descriptor, tmp_path = tempfile.mkstemp(
+            suffix='.part',
+            dir=os.path.dirname(os.path.abspath(file_path))
+        )
+
+        success = False
+        try:
+            size, header = 0, b''
+            with os.fdopen(file_descriptor, 'wb') as file:
+                for chunk in resp.iter_content(chunk_size=MP3_CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return False
+
+                    header = (header + chunk[:4])[:4]
+                    size += len(chunk)
+                    if size > self.max_mp3_size or \
+                            (len(header) == 4 and not is_mp3_header(header)):
+                        print(f'Ответ не является MP3-файлом: {resp.url}')
+                        return False
+
+                    file.write(chunk)
+
+            if not is_mp3_header(header):
+                return False
+
+            os.replace(tmp_path, file_path)
+            success = True
+            return True
+        finally:
+            if not success:
+                self.remove_file(tmp_path)
 
     def write_user_mp3(self, en_word: str, mp_3_url: str,
                     transcription: str, os_: str,
-                    browser: str) -> str:
+                    browser: str,
+                    downloaded_path: Optional[str] = None,
+                    cancel_event: Optional[threading.Event] = None) -> str:
 
         """
-        1. Задает название MP3-файла с учетом наличия
-        транскрипции у заданного английского слова.
+        1. Ищет MP3-файл слова в индексе audio_index.
         2. Создает путь, по которому будет записан MP3-файл
         3. Реализовывает запись файла через метод write_mp3
             (если он не существует внутри папки eng_audio_files_mp3)
+            и регистрирует его в индексе. Заранее скачанный файл
+            downloaded_path переносится на место без повторной загрузки.
+            Загрузку можно прервать событием cancel_event.
 
         Возвращает путь к файлу
         """
 
         if mp_3_url:
-            if transcription:
-                mp3_name = f"{en_word} {transcription}.mp3"
-            else:
-                mp3_name = f"{en_word}.mp3"
-            
-            mp3_name = re.sub(r'[<>:"/\\|?*]', '', mp3_name)
-            
-            mp3_path = os.path.join(
-                find_folder('eng_audio_files_mp3'),
-                mp3_name
-            )
+            mp3_path = audio_index.find(en_word, transcription)
 
-            if not os.path.exists(mp3_path):
-                success = self.write_mp3(
-                    url=mp_3_url,
-                    file_path=mp3_path,
-                    os_=os_,
-                    browser=browser,
-                    attempts=3,
-                    error_timeout=10
-                )
+            if mp3_path is None:
+                mp3_path = audio_index.get_new_path(en_word, transcription)
+                if mp3_path is None:
+                    return None
+
+                if downloaded_path:
+                    os.replace(downloaded_path, mp3_path)
+                    success = True
+                else:
+                    success = self.write_mp3(
+                        url=mp_3_url,
+                        file_path=mp3_path,
+                        os_=os_,
+                        browser=browser,
+                        attempts=3,
+                        error_timeout=10,
+                        cancel_event=cancel_event
+                    )
                 if success:
+                    audio_index.add(en_word, transcription, mp3_path)
                     print(f'Аудиофайл сохранен: {mp3_path}')
                     return mp3_path
                 else:
@@ -334,14 +1043,101 @@ class Parsing:
                 return mp3_path
         return None
 
+    def download_mp3(self, en_word: str, mp_3_url: str,
+                     os_: str, browser: str) -> Optional[str]:
+
+        """
+        Скачивает MP3-файл во временный файл папки eng_audio_files_mp3
+        до того, как станет известна транскрипция слова (от нее зависит
+        название файла). Если файл слова уже есть, ничего не скачивается.
+
+        Вводные параметры:
+        - en_word: английское слово
+        - mp_3_url: URL-ссылка на MP3-файл
+        - os_: сокращенное название операционной системы
+        - browser: название браузера
+
+        Выводной параметр:
+        - путь к временному файлу (None - файл не скачан)
+        """
+
+        folder_path = audio_index.folder_path
+        if folder_path is None or audio_index.find(en_word) is not None:
+            return None
+
+        file_descriptor, tmp_path = tempfile.mkstemp(
+            suffix='.part',
+            dir=folder_path
+        )
+        os.close(file_descriptor)
+
+        success = self.write_mp3(
+            url=mp_3_url,
+            file_path=tmp_path,
+            os_=os_,
+            browser=browser,
+            attempts=3,
+            error_timeout=10
+        )
+        if success:
+            return tmp_path
+
+        self.remove_file(tmp_path)
+        return None
+
+    def remove_file(self, file_path: Optional[str]) -> None:
+
+        """
+        Удаляет файл (при его наличии).
+
+        Вводный параметр:
+        - file_path: путь к файлу
+        """
+
+        if file_path:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def merge_word_data(self, promt_data: list[dict],
+                        oxford_data: dict) -> list[dict]:
+
+        """
+        Объединяет перевод из Promt и ссылку на MP3-файл из Oxford.
+
+        Вводные параметры:
+        - promt_data: результат receive_promt_data
+        - oxford_data: результат receive_oxford_data
+
+        Выводной параметр:
+        - список словарей с данными английского слова
+        """
+
+        word_list = []
+        for idx, word_dict in enumerate(promt_data):
+            if word_dict not in word_list:
+                word_list.append(word_dict)
+                word_list[idx].update(oxford_data)
+
+        if len(word_list) > 1:
+            for idx, word_dict in enumerate(word_list):
+                if word_dict.get('ru_word') is None:
+                    word_list.pop(idx)
+
+        return word_list
+
     def get_word_info(self, en_word: str, pos_list: list,
                     os_: str, browser: str) -> list[dict]:
 
         """
         Выводит обобщающую информацию об английском слове.
+        Promt и Oxford запрашиваются параллельно, а MP3-файл
+        начинает скачиваться сразу после получения ссылки из Oxford.
         """
 
-        promt_data = self.receive_promt_data(
+        promt_future = self.get_executor().submit(
+            self.receive_promt_data,
             en_word=en_word,
             pos_list=pos_list,
             os_=os_,
@@ -354,29 +1150,43 @@ class Parsing:
             browser=browser
         )
 
-        word_list = []
-        for idx, word_dict in enumerate(promt_data):
-            if word_dict not in word_list:
-                word_list.append(word_dict)
-                word_list[idx].update(oxford_data)
+        mp3_future = None
+        if oxford_data.get('mp_3_url'):
+            mp3_future = self.get_executor().submit(
+                self.download_mp3,
+                en_word=en_word,
+                mp_3_url=oxford_data.get('mp_3_url'),
+                os_=os_,
+                browser=browser
+            )
 
-        if len(word_list) > 1:
-            for idx, word_dict in enumerate(word_list):
-                if word_dict.get('ru_word') is None:
-                    word_list.pop(idx)
+        downloaded_path = None
+        try:
+            word_list = self.merge_word_data(
+                promt_data=promt_future.result(),
+                oxford_data=oxford_data
+            )
 
-        audio_downloaded = False
-        for word_dict in word_list:
-            if word_dict.get('mp_3_url') and not audio_downloaded:
-                mp3_path = self.write_user_mp3(
-                    en_word=word_dict.get('en_word'),
-                    mp_3_url=word_dict.get('mp_3_url'),
-                    transcription=word_dict.get('en_trans'),
-                    os_=os_,
-                    browser=browser
-                )
-                if mp3_path:
-                    audio_downloaded = True
-                break
+            if mp3_future is not None:
+                downloaded_path = mp3_future.result()
+
+            audio_downloaded = False
+            for word_dict in word_list:
+                if word_dict.get('mp_3_url') and not audio_downloaded:
+                    mp3_path = self.write_user_mp3(
+                        en_word=word_dict.get('en_word'),
+                        mp_3_url=word_dict.get('mp_3_url'),
+                        transcription=word_dict.get('en_trans'),
+                        os_=os_,
+                        browser=browser,
+                        downloaded_path=downloaded_path
+                    )
+                    if mp3_path:
+                        audio_downloaded = True
+                    break
+        finally:
+            if mp3_future is not None and downloaded_path is None:
+                downloaded_path = mp3_future.result()
+            self.remove_file(downloaded_path)
 
         return word_list
@@ -0,0 +1,320 @@
+"""
+Упреждающий поиск MP3-файла слова, показанного на карточке.
+
+Пока пользователь выбирает перевод, произношение загаданного слова
+ищется в фоне: ID файла в Telegram, файл в папке eng_audio_files_mp3
+или загрузка из Oxford. Ответ на правильный выбор не ждет сети:
+готовый результат отправляется сразу, а еще не найденный - как только
+будет найден.
+
+Одно и то же слово ищется один раз для всех чатов. Поиск отменяется,
+когда чат переходит к следующей карточке, если результат больше
+никому не нужен.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from database.repository import DBRepository
+from tgbot.audio import audio_index
+from tgbot.parsing import Parsing
+
+
+def resolve_audio(parsing: Parsing, en_word: str,
+                  transcription: Optional[str],
+                  repository: Optional[DBRepository] = None,
+                  cancel_event: Optional[threading.Event] = None) -> dict:
+
+    """
+    Ищет MP3-файл английского слова: сначала в индексе audio_index,
+    затем в Oxford с загрузкой файла в папку eng_audio_files_mp3.
+
+    Вводные параметры:
+    - parsing: экземпляр класса Parsing
+    - en_word: английское слово
+    - transcription: транскрипция английского слова
+    - repository: экземпляр класса DBRepository для поиска ID файла
+                  в Telegram (по умолчанию None)
+    - cancel_event: событие отмены поиска (по умолчанию None)
+
+    Выводной параметр:
+    - словарь с ключами:
+        -- mp3_path: путь к MP3-файлу (None - файл не найден)
+        -- file_id: ID файла в Telegram (None - файл не загружался)
+    """
+
+    mp3_path = audio_index.find(en_word, transcription)
+
+    if mp3_path is None:
+        oxford_data = parsing.receive_oxford_data(
+            en_word=en_word,
+            os_='win',
+            browser='chrome'
+        )
+
+        if oxford_data.get('mp_3_url') and \
+                not (cancel_event is not None and cancel_event.is_set()):
+            mp3_path = parsing.write_user_mp3(
+                en_word=en_word,
+                mp_3_url=oxford_data.get('mp_3_url'),
+                transcription=transcription,
+                os_='win',
+                browser='chrome',
+                cancel_event=cancel_event
+            )
+
+    file_id = None
+    if mp3_path is not None and repository is not None:
+        file_id = repository.get_audio_file_id(os.path.basename(mp3_path))
+
+    return {'mp3_path': mp3_path, 'file_id': file_id}
+
+
+class AudioPrefetcher:
+
+    def __init__(self, parsing: Parsing,
+                 repository: Optional[DBRepository] = None,
+                 max_workers: int = 4) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - parsing: экземпляр класса Parsing
+        - repository: экземпляр класса DBRepository
+                      (по умолчанию None - ID файлов не используются)
+        - max_workers: кол-во потоков поиска (по умолчанию 4)
+        """
+
+        self.parsing = parsing
+        self.repository = repository
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # {(слово, транскрипция): {'future', 'cancel_event',
+        #                          'owners', 'callbacks'}}
+        self._entries: dict[tuple, dict] = {}
+        # {ID чата: (слово, транскрипция)}
+        self._owner_keys: dict[int, tuple] = {}
+        self.started = 0
+        self.deduplicated = 0
+        self.cancelled = 0
+
+    def set_repository(self, repository: DBRepository) -> None:
+
+        """
+        Подключает репозиторий для поиска ID файлов в Telegram.
+
+        Вводный параметр:
+        - repository: экземпляр класса DBRepository
+        """
+
+        self.repository = repository
+
+    def get_executor(self) -> ThreadPoolExecutor:
+
+        """
+        Выводит пул потоков поиска (создается при первом обращении).
+
+        Выводной параметр:
+        - объект класса ThreadPoolExecutor
+        """
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='prefetch'
+            )
+        return self._executor
+
+    def prefetch(self, owner_id: int, en_word: str,
+                 transcription: Optional[str]) -> Future:
+
+        """
+        Начинает поиск MP3-файла слова новой карточки чата. Поиск
+        слова предыдущей карточки чата отменяется, если он больше
+        никому не нужен.
+
+        Вводные параметры:
+        - owner_id: ID чата
+        - en_word: английское слово
+        - transcription: транскрипция английского слова
+
+        Выводной параметр:
+        - объект Future с результатом resolve_audio
+        """
+
+        key = (en_word, transcription)
+
+        with self._lock:
+            if self._owner_keys.get(owner_id) != key:
+                self.release(owner_id)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self.start_entry(key)
+            elif owner_id not in entry['owners']:
+                self.deduplicated += 1
+
+            entry['owners'].add(owner_id)
+            self._owner_keys[owner_id] = key
+
+            return entry['future']
+
+    def when_ready(self, owner_id: int, en_word: str,
+                   transcription: Optional[str],
+                   callback: Callable[[dict], None]) -> None:
+
+        """
+        Передает результат поиска в callback: сразу, если он готов,
+        иначе - из потока поиска по его завершении. Если поиск
+        не начинался (например, после перезапуска чат-бота),
+        он начинается сейчас. Поиск с ожидающим callback не отменяется.
+
+        Вводные параметры:
+        - owner_id: ID чата
+        - en_word: английское слово
+        - transcription: транскрипция английского слова
+        - callback: функция, получающая результат resolve_audio
+        """
+
+        key = (en_word, transcription)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self.start_entry(key)
+            entry['callbacks'] += 1
+
+        def on_done(future: Future) -> None:
+            try:
+                if not future.cancelled() and future.exception() is None:
+                    callback(future.result())
+                else:
+                    callback({'mp3_path': None, 'file_id': None})
+            finally:
+                with self._lock:
+                    entry['callbacks'] -= 1
+                    self.drop_entry(key, entry)
+
+        entry['future'].add_done_callback(on_done)
+
+    def cancel(self, owner_id: int) -> None:
+
+        """
+        Отменяет поиск для чата (например, при удалении слова).
+
+        Вводный параметр:
+        - owner_id: ID чата
+        """
+
+        with self._lock:
+            self.release(owner_id)
+
+    def start_entry(self, key: tuple) -> dict:
+
+        """
+        Запускает поиск слова. Вызывается под self._lock.
+
+        Вводный параметр:
+        - key: кортеж (слово, транскрипция)
+
+        Выводной параметр:
+        - словарь с данными поиска
+        """
+
+        cancel_event = threading.Event()
+        entry = {
+            'future': self.get_executor().submit(
+                resolve_audio,
+                parsing=self.parsing,
+                en_word=key[0],
+                transcription=key[1],
+                repository=self.repository,
+                cancel_event=cancel_event
+            ),
+            'cancel_event': cancel_event,
+            'owners': set(),
+            'callbacks': 0
+        }
+        self._entries[key] = entry
+        self.started += 1
+        return entry
+
+    def release(self, owner_id: int) -> None:
+
+        """
+        Отвязывает чат от поиска слова его карточки.
+        Вызывается под self._lock.
+
+        Вводный параметр:
+        - owner_id: ID чата
+        """
+
+        key = self._owner_keys.pop(owner_id, None)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+
+        entry['owners'].discard(owner_id)
+        self.drop_entry(key, entry)
+
+    def drop_entry(self, key: tuple, entry: dict) -> None:
+
+        """
+        Удаляет поиск, который больше никому не нужен, и отменяет его,
+        если он еще не завершен. Вызывается под self._lock.
+
+        Вводные параметры:
+        - key: кортеж (слово, транскрипция)
+        - entry: словарь с данными поиска
+        """
+
+        if entry['owners'] or entry['callbacks'] or \
+                self._entries.get(key) is not entry:
+            return
+
+        del self._entries[key]
+        if not entry['future'].done():
+            entry['cancel_event'].set()
+            entry['future'].cancel()
+            self.cancelled += 1
+
+    def get_stats(self) -> dict:
+
+        """
+        Выводит показатели упреждающего поиска.
+
+        Выводной параметр:
+        - словарь с показателями:
+            -- started: кол-во начатых поисков
+            -- deduplicated: кол-во запросов, присоединенных
+                             к уже начатому поиску
+            -- cancelled: кол-во отмененных поисков
+            -- active: кол-во хранимых поисков
+        """
+
+        with self._lock:
+            return {
+                'started': self.started,
+                'deduplicated': self.deduplicated,
+                'cancelled': self.cancelled,
+                'active': len(self._entries)
+            }
+
+    def close(self) -> None:
+
+        """
+        Отменяет все поиски и останавливает пул потоков.
+        """
+
+        with self._lock:
+            for entry in self._entries.values():
+                entry['cancel_event'].set()
+            self._entries.clear()
+            self._owner_keys.clear()
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,181 @@
+"""
+Ограничение частоты запросов к онлайн-словарям.
+
+Для каждого сайта заводится свое "ведро с токенами": запрос забирает
+токен, а токены пополняются с заданной скоростью до емкости ведра.
+Если токенов нет, запрос ждет - в потоке через time.sleep,
+в цикле событий через asyncio.sleep.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+
+def get_backoff_delay(attempt: int, base: float = 1.0,
+                      max_delay: float = 30.0,
+                      random_func: Callable[[float, float], float] =
+                      random.uniform) -> float:
+
+    """
+    Выводит паузу перед повторной попыткой: экспоненциальный рост
+    с полным случайным разбросом (full jitter).
+
+    Вводные параметры:
+    - attempt: номер неудачной попытки, начиная с 0
+    - base: пауза после первой неудачной попытки в секундах (по умолчанию 1.0)
+    - max_delay: максимальная пауза в секундах (по умолчанию 30.0)
+    - random_func: функция выбора случайного числа из отрезка
+                   (по умолчанию random.uniform)
+
+    Выводной параметр:
+    - пауза в секундах
+    """
+
+    return random_func(0, min(max_delay, base * 2 ** attempt))
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - rate: кол-во запросов в секунду
+        - capacity: емкость ведра - допустимый всплеск запросов
+                    (по умолчанию max(1, rate))
+        - clock: источник времени (по умолчанию time.monotonic)
+        """
+
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+
+        """
+        Забирает токены из ведра. Если токенов не хватает, они берутся
+        в долг, и запрос должен подождать, пока долг не будет погашен.
+
+        Вводный параметр:
+        - tokens: кол-во токенов (по умолчанию 1.0)
+
+        Выводной параметр:
+        - время ожидания в секундах (0.0 - ждать не нужно)
+        """
+
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+
+        """
+        Забирает токены, при необходимости приостанавливая поток.
+
+        Вводный параметр:
+        - tokens: кол-во токенов (по умолчанию 1.0)
+        """
+
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+
+        """
+        Забирает токены, не блокируя цикл событий.
+
+        Вводный параметр:
+        - tokens: кол-во токенов (по умолчанию 1.0)
+        """
+
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 host_rates: Optional[dict] = None) -> None:
+
+        """
+        Инициируемые параметры класса:
+        - rate: кол-во запросов в секунду к одному сайту
+        - capacity: допустимый всплеск запросов к одному сайту
+                    (по умолчанию max(1, rate))
+        - host_rates: словарь {сайт: (rate, capacity)} с отдельными
+                      ограничениями для сайтов (по умолчанию None)
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+        self.host_rates = host_rates or {}
+
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def get_bucket(self, url: str) -> TokenBucket:
+
+        """
+        Выводит ведро с токенами для сайта из URL-ссылки.
+
+        Вводный параметр:
+        - url: URL-ссылка
+
+        Выводной параметр:
+        - объект класса TokenBucket
+        """
+
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, capacity = self.host_rates.get(
+                    host, (self.rate, self.capacity)
+                )
+                bucket = TokenBucket(rate=rate, capacity=capacity)
+                self._buckets[host] = bucket
+
+        return bucket
+
+    def acquire(self, url: str) -> None:
+
+        """
+        Дожидается разрешения на запрос к сайту (в потоке).
+
+        Вводный параметр:
+        - url: URL-ссылка запроса
+        """
+
+        self.get_bucket(url).acquire()
+
+    async def acquire_async(self, url: str) -> None:
+
+        """
+        Дожидается разрешения на запрос к сайту (в цикле событий).
+
+        Вводный параметр:
+        - url: URL-ссылка запроса
+        """
+
+        await self.get_bucket(url).acquire_async()
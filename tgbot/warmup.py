@@ -0,0 +1,148 @@
+"""
+Предварительная загрузка MP3-файлов в Telegram.
+
+Все файлы папки eng_audio_files_mp3 отправляются в служебный чат,
+а полученные ID файлов сохраняются в таблицу audio_files. После этого
+чат-бот отправляет произношение по ID без загрузки файлов.
+
+Запуск:
+    python -m tgbot.warmup --chat-id <ID служебного чата>
+"""
+
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+
+from database.repository import DBRepository
+from tgbot.audio import audio_index
+from tgbot.functionality import Functionality
+
+functionality = Functionality()
+
+
+def warm_up_audio(bot: TeleBot, repository: DBRepository, chat_id: int,
+                  folder_path: str = None, delay: float = 1.0,
+                  max_retries: int = 5) -> dict:
+
+    """
+    Загружает в служебный чат MP3-файлы, ID которых еще не сохранены.
+
+    Вводные параметры:
+    - bot: объект класса TeleBot
+    - repository: экземпляр класса DBRepository
+    - chat_id: ID служебного чата Telegram
+    - folder_path: путь к папке с MP3-файлами
+                   (по умолчанию папка eng_audio_files_mp3)
+    - delay: пауза между загрузками в секундах (по умолчанию 1.0)
+    - max_retries: кол-во повторных попыток при ответе 429 (по умолчанию 5)
+
+    Выводной параметр:
+    - словарь с итогами загрузки:
+        -- uploaded: кол-во загруженных файлов
+        -- skipped: кол-во файлов, ID которых уже сохранены
+        -- failed: кол-во файлов, загрузить которые не удалось
+    """
+
+    if folder_path is None:
+        folder_path = audio_index.folder_path
+
+    stored_names = repository.get_audio_file_names()
+    result_dict = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+
+    for file_name in sorted(os.listdir(folder_path)):
+        if not file_name.endswith('.mp3'):
+            continue
+
+        if file_name in stored_names:
+            result_dict['skipped'] += 1
+            continue
+
+        file_id = None
+        for _ in range(max_retries + 1):
+            try:
+                file_id = functionality.upload_audio(
+                    bot=bot,
+                    chat_id=chat_id,
+                    mp3_path=os.path.join(folder_path, file_name),
+                    title=os.path.splitext(file_name)[0]
+                )
+                break
+            except ApiTelegramException as e:
+                if e.error_code != 429:
+                    print(f'Ошибка при загрузке {file_name}: {e}')
+                    break
+                retry_after = e.result_json.get('parameters', {}). \
+                    get('retry_after', 5)
+                time.sleep(retry_after)
+
+        if file_id:
+            repository.add_audio_file_id(
+                file_name=file_name,
+                file_id=file_id
+            )
+            result_dict['uploaded'] += 1
+        else:
+            result_dict['failed'] += 1
+
+        time.sleep(delay)
+
+    return result_dict
+
+
+if __name__ == '__main__':
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description='Загрузка MP3-файлов в служебный чат Telegram'
+    )
+    parser.add_argument(
+        '--chat-id',
+        type=int,
+        default=None,
+        help='ID служебного чата (по умолчанию AUDIO_STORAGE_CHAT_ID)'
+    )
+    parser.add_argument(
+        '--folder',
+        default=None,
+        help='папка с MP3-файлами (по умолчанию eng_audio_files_mp3)'
+    )
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=1.0,
+        help='пауза между загрузками в секундах'
+    )
+    args = parser.parse_args()
+
+    if args.chat_id is None:
+        env_chat_id = os.getenv(key='AUDIO_STORAGE_CHAT_ID', default='')
+        if not env_chat_id.strip():
+            parser.error('не задан ID служебного чата')
+        try:
+            args.chat_id = int(env_chat_id)
+        except ValueError:
+            parser.error(f'некорректный AUDIO_STORAGE_CHAT_ID: {env_chat_id}')
+
+    warmup_repository = DBRepository(
+        dbname=os.getenv(key='DB_NAME'),
+        user=os.getenv(key='DB_USER'),
+        password=os.getenv(key='DB_PASSWORD'),
+        host=os.getenv(key='HOST', default='localhost'),
+        port=os.getenv(key='PORT', default='5432')
+    )
+
+    warmup_result = warm_up_audio(
+        bot=TeleBot(token=os.getenv(key='TG_TOKEN')),
+        repository=warmup_repository,
+        chat_id=args.chat_id,
+        folder_path=args.folder,
+        delay=args.delay
+    )
+
+    print(f'ЗАГРУЖЕНО: {warmup_result["uploaded"]}, '
+          f'ПРОПУЩЕНО: {warmup_result["skipped"]}, '
+          f'ОШИБОК: {warmup_result["failed"]}')